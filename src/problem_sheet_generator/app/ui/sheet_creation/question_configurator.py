@@ -1,9 +1,14 @@
 from dataclasses import dataclass, field
+from pathlib import Path
+from tempfile import gettempdir
 from tkinter import Tk, Widget, messagebox
 from re import search
+from webbrowser import open as open_in_browser
 from ttkbootstrap import Button, Checkbutton, Entry, IntVar, Label, Labelframe, StringVar
-from problem_sheet_generator.app.ui import QuestionSelector
+from problem_sheet_generator.app.ui import QuestionSelector, QuestionConfig
 from problem_sheet_generator.core.sheet_generator import SheetGenerator
+from problem_sheet_generator.core.sheet_session import SheetSession
+from problem_sheet_generator.core.preview_sheet import PreviewSheet
 
 
 @dataclass
@@ -17,6 +22,13 @@ class SheetConfig():
     date: str = ""
     margin_left: str = "2.5cm"
     margin_right: str = "2.5cm"
+    cohort: str = ""
+    output_dir: str = "output"
+    # Output file names are made from this format, where {name} is the sheet's filename, {date}
+    # the time of the run (a datetime) and {run} a short id that is unique to the run. Without
+    # {run} two runs on the same day publish to the same names and the later one replaces the
+    # files of the other.
+    filename_format: str = "{name}_{date:%Y-%m-%d}_{run}"
 
     _generate_tex_int: int = field(default=1, repr=False)
 
@@ -37,6 +49,11 @@ class QuestionConfigurator():
         self._root = root
 
         self._selector = selector
+        self._selector.set_reroll_command(self._reroll_question)
+
+        # Keeps the generated questions between generations, so editing the selection only
+        # generates and compiles what changed.
+        self._session: SheetSession | None = None
 
         self._config_frame = Labelframe(root, text = "Configuration")
         self._config_frame.pack(side = "top", anchor = "nw")
@@ -70,9 +87,8 @@ class QuestionConfigurator():
             self._generation_label.update_idletasks()
             return
 
-        selected_questions = list(selected_questions_dict.values())
-        generator: SheetGenerator = SheetGenerator(self._config)
-        generator.generate(selected_questions, bool(self._config.generate_tex_int))
+        self._update_session(list(selected_questions_dict.values()))
+        self._session.compile(bool(self._config.generate_tex_int))
 
         self._root.focus()
 
@@ -80,6 +96,48 @@ class QuestionConfigurator():
         self._generation_label.update_idletasks()
         return
 
+    def _update_session(self, selected_questions: list[QuestionConfig]) -> None:
+        """
+        Brings the session's questions in line with the selection, starting a session if there
+        isn't one yet.
+        """
+        if self._session is None:
+            self._session = SheetSession(SheetGenerator(self._config))
+        self._session.update(selected_questions)
+
+    def _reroll_question(self, config: QuestionConfig, index: int) -> None:
+        if self._session is None or not self._session.records_for(config.id):
+            messagebox.showwarning("Warning", "Generate the sheet before rerolling its questions.")
+            return
+
+        self._generation_label.config(text = "Rerolling...")
+        self._generation_label.update_idletasks()
+
+        # The sheet is brought up to date first in case the count changed since it was generated.
+        self._session.update(list(self._selector.selected_questions.values()))
+        if index < len(self._session.records_for(config.id)):
+            self._session.reroll(config, index)
+        self._session.compile(bool(self._config.generate_tex_int))
+
+        self._generation_label.config(text = "Question rerolled!")
+        self._generation_label.update_idletasks()
+
+    def _preview_sheets(self) -> None:
+        selected_questions_dict = self._selector.selected_questions
+        if not selected_questions_dict:
+            msg = "No questions have been selected."
+            messagebox.showwarning("Warning", msg)
+            return
+
+        # Previews are rendered in the browser from the session's questions, so nothing is compiled
+        # and generating afterwards compiles the questions that were previewed.
+        self._update_session(list(selected_questions_dict.values()))
+        preview = PreviewSheet(self._config.problem_title, self._config.author, self._config.date)
+
+        path = Path(gettempdir()) / f"{self._config.problem_filename}_preview.html"
+        path.write_text(preview.html(self._session.records), encoding = "utf-8")
+        open_in_browser(path.as_uri())
+
     def build(self) -> None:
         validate_filename = self._root.register(self._validate_filename)
         self._build_entry(
@@ -151,6 +209,13 @@ class QuestionConfigurator():
         )
         self._generate_button.grid(row = 4, column = 0, pady = 4)
 
+        self._preview_button = Button(
+            self._config_frame,
+            text = "Preview",
+            command = self._preview_sheets
+        )
+        self._preview_button.grid(row = 3, column = 0, pady = 4)
+
         self._generation_label = Label(self._config_frame, anchor = "w", justify = "left", width = 20)
         self._generation_label.grid(row = 4, column = 1)
 
@@ -1,8 +1,9 @@
 from dataclasses import dataclass, field
+from typing import Callable
 from uuid import uuid4
-from tkinter import Event, messagebox, Tk
-from ttkbootstrap import Button, Entry, Frame, Scrollbar, Treeview
-from problem_sheet_generator.core.question import TOPIC_REGISTRY, TOPIC_DISPLAY_REGISTRY, Question
+from tkinter import Event, Menu, messagebox, Tk
+from ttkbootstrap import Button, Entry, Frame, Scrollbar, StringVar, Treeview
+from problem_sheet_generator.app.ui.sheet_creation.topic_index import TopicIndex
 
 @dataclass(slots = True)
 class QuestionConfig():
@@ -31,21 +32,33 @@ class QuestionSelector():
         "title": "Question Topics",
         "tree_id": "questions_tree",
         "button_label": "add",
-        "has_count_column": False
+        "has_count_column": False,
+        "has_search": True
     }
 
     SELECTED_TREE_CONFIG: dict[str, str | bool] = {
         "title": "Selected Questions",
         "tree_id": "selected_questions_tree",
         "button_label": "remove",
-        "has_count_column": True
+        "has_count_column": True,
+        "has_search": False
     }
 
+    # The iid of the empty child given to unpopulated items so that Tk shows them as openable.
+    PLACEHOLDER_SUFFIX: str = "__placeholder"
+
     def __init__(self, root: Tk):
         self._root = root
         self._selector_frame = Frame(root)
         self._selector_frame.pack(side = "top", anchor = "nw")
         self._selected_questions: dict[str, QuestionConfig] = {}
+        self._reroll_command: Callable[[QuestionConfig, int], None] | None = None
+
+        # The structure of the Question Topics tree, so selecting doesn't need to query Tk.
+        self._index: TopicIndex = TopicIndex()
+        # The items of the Question Topics tree whose children have been inserted, "" being the
+        # root.
+        self._populated: set[str] = set()
 
     @property
     def question_tree(self) -> Treeview:
@@ -67,30 +80,78 @@ class QuestionSelector():
     def selected_questions(self) -> dict[str, QuestionConfig]:
             return self._selected_questions
 
+    def set_reroll_command(self, command: Callable[[QuestionConfig, int], None]) -> None:
+        """
+        Sets the function called with a selected question and the index of one of its questions
+        when "Reroll" is chosen from the Selected Questions context menu.
+        """
+        self._reroll_command = command
+
     def build(self) -> None:
         self._question_tree: Treeview = self._build_tree(self.QUESTION_TREE_CONFIG)
         self._selected_tree: Treeview = self._build_tree(self.SELECTED_TREE_CONFIG)
 
         self._populate_question_tree(self._question_tree)
 
-    @staticmethod
-    def _populate_question_tree(tree: Treeview) -> None:
+    def _populate_question_tree(self, tree: Treeview) -> None:
         """
-        Fills the Question Topics tree with the questions, topics and subtopics that have been
-        registered in the topic registry.
+        Fills the Question Topics tree with the question types that have been registered in the
+        topic registry. Their topics and subtopics are only inserted when they are opened, so
+        startup doesn't depend on the size of the registry.
         """
-        question_types: list[Question] = sorted(list(TOPIC_REGISTRY.keys()))
-        for name in question_types:
-            tree.insert("", "end", iid = name, text = TOPIC_DISPLAY_REGISTRY[name])
+        self._populate_children(tree, "")
+        tree.bind("<<TreeviewOpen>>", self._on_question_tree_open)
+
+    def _populate_children(self, tree: Treeview, item_id: str) -> None:
+        """
+        Inserts the children of item_id if they haven't been inserted yet. Children that have
+        children of their own get a placeholder child until they are opened.
+        """
+        if item_id in self._populated:
+            return
+        self._populated.add(item_id)
+
+        placeholder = f"{item_id}{self.PLACEHOLDER_SUFFIX}"
+        if item_id and tree.exists(placeholder):
+            tree.delete(placeholder)
 
-            topics = TOPIC_REGISTRY[name].keys()
-            for topic in topics:
-                tree.insert(name, "end", iid = topic, text = TOPIC_DISPLAY_REGISTRY[topic])
+        for child in self._index.children(item_id):
+            tree.insert(item_id, "end", iid = child, text = self._index.text(child))
+            if self._index.children(child):
+                tree.insert(child, "end", iid = f"{child}{self.PLACEHOLDER_SUFFIX}")
 
-                subtopics = TOPIC_REGISTRY[name][topic]
-                for subtopic in subtopics:
-                    tree.insert(topic, "end", iid = f"{topic}_{subtopic}", text = TOPIC_DISPLAY_REGISTRY[subtopic])
+    def _on_question_tree_open(self, event: Event) -> None:
+        self._populate_children(self._question_tree, self._question_tree.focus())
 
+    def _filter_question_tree(self, *args) -> None:
+        """
+        Shows only the items of the Question Topics tree whose text has a word starting with the
+        search text, with their parents opened and their children left as they are. An empty
+        search shows every item again.
+        """
+        tree = self._question_tree
+        matches = self._index.search(self._search_var.get())
+        searching = bool(self._search_var.get().strip())
+
+        matched: set[str] = set(matches)
+        shown: set[str] = set(matches)
+        for item_id in matches:
+            parents = self._index.parents(item_id)
+            shown.update(parents)
+            for parent in reversed(parents):
+                self._populate_children(tree, parent)
+                tree.item(parent, open = True)
+
+        # Detached items keep their children, so only the populated levels need rearranging.
+        for parent in list(self._populated):
+            under_match = bool(parent) and not matched.isdisjoint(self._index.path(parent))
+            position = 0
+            for child in self._index.children(parent):
+                if not searching or under_match or child in shown:
+                    tree.move(child, parent, position)
+                    position += 1
+                else:
+                    tree.detach(child)
 
     def _build_tree(self, config: dict[str, str | bool]) -> Treeview:
         """
@@ -106,6 +167,11 @@ class QuestionSelector():
 
         columns = ("count",) if config["has_count_column"] else None
         tree = Treeview(tree_frame, columns = columns, show = "tree headings")
+        if config["has_search"]:
+            self._search_var = StringVar()
+            self._search_var.trace_add("write", self._filter_question_tree)
+            Entry(tree_frame, textvariable = self._search_var).pack(side = "top", fill = "x")
+
         tree.heading("#0", text = config["title"])
         tree.column("#0", width = 220 if config["has_count_column"] else 270)
 
@@ -114,6 +180,7 @@ class QuestionSelector():
             tree.column("count", width = 60, anchor = "center", stretch = False)
 
             tree.bind("<Double-1>", self._edit_count)
+            tree.bind("<Button-3>", self._show_reroll_menu)
 
         tree.pack(side = "left")
 
@@ -201,62 +268,43 @@ class QuestionSelector():
 
         return "break"
 
-    def _get_all_parents(
-            self, tree: Treeview, item_id: str, parents: list[str] | None = None
-    ) -> list[str]:
+    def _show_reroll_menu(self, event: Event) -> None:
         """
-        Returns the chain of parent items from item_id up to the root item.
+        Shows a context menu with an entry for rerolling each question generated for the row.
         """
-        if parents is None:
-            parents: list[str] = []
-
-        parent = tree.parent(item_id)
+        row_id = self._selected_tree.identify_row(event.y)
+        if not row_id or row_id not in self._selected_questions or self._reroll_command is None:
+            return
 
-        if not parent:
-            return parents
+        config = self._selected_questions[row_id]
+        menu = Menu(self._selected_tree, tearoff = False)
+        for i in range(config.num_questions):
+            menu.add_command(
+                label = f"Reroll question {i + 1}",
+                command = lambda index = i: self._reroll_command(config, index)
+            )
+        menu.tk_popup(event.x_root, event.y_root)
 
-        parents.append(parent)
-        return self._get_all_parents(tree, parent, parents)
+    def _get_all_parents(self, item_id: str) -> list[str]:
+        """
+        Returns the chain of parent items from item_id up to the root item.
+        """
+        return self._index.parents(item_id)
 
-    def _get_subtree_ids(
-            self, tree: Treeview, item_id: str, children: list[str] | None = None
-    ) -> list[str]:
+    def _get_subtree_ids(self, item_id: str) -> list[str]:
         """
         Returns the full list of item ids in the subtree with item_id acting as the root node.
         """
-        if children is None:
-            children: list[str] = []
+        return self._index.subtree(item_id)
 
-        children.append(item_id)
-
-        item_children = list(tree.get_children(item_id))
-
-        if not item_children:
-            return children
-
-        for child in item_children:
-            self._get_subtree_ids(tree, child, children)
-
-        return children
-
-    def _count_leaves(self, tree: Treeview, item_id: str, num_children: int = 0) -> int:
+    def _count_leaves(self, item_id: str) -> int:
         """
         Counts the number of question subtopics in the subtree of item_id.
         """
-        item_children = list(tree.get_children(item_id))
-
-        if not item_children:
-            num_children += 1
-            return num_children
-
-        for child in item_children:
-            num_children = self._count_leaves(tree, child, num_children)
-
-        return num_children
+        return self._index.leaf_count(item_id)
 
     def _copy_item(
             self,
-            src_tree: Treeview,
             dest_tree: Treeview,
             item_id: str,
             parent_id: str,
@@ -264,27 +312,11 @@ class QuestionSelector():
             config_id: str
     ) -> None:
         """
-        Copies item_id from the source tree to the destination tree.
+        Copies item_id from the Question Topics tree to the destination tree.
         """
-        if item_id in dest_tree.get_children(parent_id):
-            return
-
-        text = src_tree.item(item_id)["text"]
+        text = self._index.text(item_id)
         dest_tree.insert(parent_id, "end", iid = config_id, text = text, values = "-", open = item_open)
 
-    def _copy_subtree(
-            self, src_tree: Treeview, dest_tree: Treeview, item_id: str, parent_id: str = "",
-    ) -> None:
-        """
-        Copies the full subtree with item_id as the root node from the source tree to the
-        destination tree.
-        """
-        self._copy_item(src_tree, dest_tree, item_id, parent_id, False)
-
-        item_children = src_tree.get_children(item_id)
-        for child_id in item_children:
-            self._copy_subtree(src_tree, dest_tree, child_id, item_id)
-
     def _add(self) -> None:
         """
         Adds the selected items from the Question Topics tree to the Selected Topics tree, and
@@ -295,21 +327,11 @@ class QuestionSelector():
             return
 
         for item_id in selection:
+            if item_id not in self._index:
+                continue
 
-            parents = reversed(self._get_all_parents(self._question_tree, item_id))
-
-            topics = [None, None, None]
-            if parents:
-                i = 0
-                for parent in parents:
-                    topics[i] = parent
-                    i += 1
-                topics[i] = item_id
-            else:
-                topics[0] = item_id
-
-            config = QuestionConfig(topics)
-            self._copy_item(self._question_tree, self._selected_tree, item_id, "", False, config.id)
+            config = QuestionConfig(self._index.topics(item_id))
+            self._copy_item(self._selected_tree, item_id, "", False, config.id)
             self._selected_questions[config.id] = config
             self._selected_tree.set(config.id, "count", 1)
 
@@ -321,9 +343,9 @@ class QuestionSelector():
         if not selection:
             return
 
-        for item_id in selection:
-            if item_id not in self._selected_questions:
-                continue
+        removed = [item_id for item_id in selection if item_id in self._selected_questions]
+        for item_id in removed:
+            self._selected_questions.pop(item_id)
 
-            self._selected_tree.delete(item_id)
-            self._selected_questions.pop(item_id)
\ No newline at end of file
+        if removed:
+            self._selected_tree.delete(*removed)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+from bisect import bisect_left
+from problem_sheet_generator.core.question import TOPIC_REGISTRY, TOPIC_DISPLAY_REGISTRY
+
+
+class TopicIndex():
+    """
+    The structure of the Question Topics tree, built once from the topic registry so that
+    looking up parents, children, paths and leaf counts doesn't need a round trip to Tk.
+
+    Items are identified by their tree iids: question types and topics by their names, and
+    subtopics by "{topic}_{subtopic}", which keeps subtopics with the same name in different
+    topics apart. The parent of a question type is "".
+
+    Items can be searched by the start of any word of their text, using a sorted index of the
+    text from each word onwards, so a search is a binary search rather than a scan.
+
+    Parameters
+    ==========
+    topic_registry: dict, optional
+        Maps question types to their topics and each topic to its subtopics.
+
+    display_registry: dict, optional
+        Maps question types, topics and subtopics to the text shown for them.
+    """
+
+    def __init__(
+            self,
+            topic_registry: dict[str, dict[str, list[str]]] = TOPIC_REGISTRY,
+            display_registry: dict[str, str] = TOPIC_DISPLAY_REGISTRY
+    ):
+        self._parent: dict[str, str] = {}
+        self._children: dict[str, list[str]] = {"": []}
+        self._text: dict[str, str] = {}
+        self._path: dict[str, tuple[str, ...]] = {}
+        self._leaf_count: dict[str, int] = {}
+
+        for name in sorted(topic_registry):
+            self._insert(name, "", display_registry[name])
+
+            for topic, subtopics in topic_registry[name].items():
+                self._insert(topic, name, display_registry[topic])
+
+                for subtopic in subtopics:
+                    self._insert(f"{topic}_{subtopic}", topic, display_registry[subtopic])
+
+        # Every item is indexed by its lowercased text from the start of each word, so "line int"
+        # and "integ" both find "Line Integrals".
+        self._order: dict[str, int] = {iid: i for i, iid in enumerate(self._path)}
+        self._prefixes: list[tuple[str, str]] = sorted(
+            (" ".join(words[i:]), iid)
+            for iid, text in self._text.items()
+            for words in [text.lower().split()]
+            for i in range(len(words))
+        )
+
+        # Children are always indexed after their parents, so counting in reverse finishes every
+        # subtree before its root.
+        for iid in reversed(self._path):
+            children = self._children[iid]
+            self._leaf_count[iid] = sum(self._leaf_count[child] for child in children) if children else 1
+
+    def _insert(self, iid: str, parent: str, text: str) -> None:
+        self._parent[iid] = parent
+        self._children[parent].append(iid)
+        self._children[iid] = []
+        self._text[iid] = text
+        self._path[iid] = (*self._path.get(parent, ()), iid)
+
+    def __contains__(self, iid: str) -> bool:
+        return iid in self._path
+
+    def __len__(self) -> int:
+        return len(self._path)
+
+    @property
+    def roots(self) -> list[str]:
+        return list(self._children[""])
+
+    def parent(self, iid: str) -> str:
+        return self._parent[iid]
+
+    def parents(self, iid: str) -> list[str]:
+        """
+        Returns the chain of parent items from iid up to the question type.
+        """
+        return list(reversed(self._path[iid][:-1]))
+
+    def children(self, iid: str) -> list[str]:
+        return list(self._children[iid])
+
+    def text(self, iid: str) -> str:
+        return self._text[iid]
+
+    def path(self, iid: str) -> tuple[str, ...]:
+        """
+        Returns the items from the question type down to iid.
+        """
+        return self._path[iid]
+
+    def topics(self, iid: str) -> list[str | None]:
+        """
+        Returns the question type, topic and subtopic selected by choosing iid, with None for
+        those left to be chosen at random, in the form QuestionConfig takes.
+        """
+        path = self._path[iid]
+        return [*path, *[None]*(3 - len(path))]
+
+    def subtree(self, iid: str) -> list[str]:
+        """
+        Returns the items of the subtree rooted at iid, parents before their children.
+        """
+        items: list[str] = []
+        stack = [iid]
+        while stack:
+            item = stack.pop()
+            items.append(item)
+            stack.extend(reversed(self._children[item]))
+        return items
+
+    def search(self, query: str) -> list[str]:
+        """
+        Returns the items with a word in their text starting with query, ignoring case and extra
+        spaces, in the order they appear in the tree.
+        """
+        query = " ".join(query.lower().split())
+        if not query:
+            return []
+
+        matches: set[str] = set()
+        for i in range(bisect_left(self._prefixes, (query, "")), len(self._prefixes)):
+            text, iid = self._prefixes[i]
+            if not text.startswith(query):
+                break
+            matches.add(iid)
+        return sorted(matches, key = self._order.__getitem__)
+
+    def leaf_count(self, iid: str) -> int:
+        """
+        Returns the number of subtopics in the subtree rooted at iid.
+        """
+        return self._leaf_count[iid]
@@ -1,17 +1,67 @@
+from argparse import ArgumentParser, ArgumentTypeError
 from logging import info
 from problem_sheet_generator.app.ui import SheetConfig
 from problem_sheet_generator.app.ui import QuestionConfig
+from problem_sheet_generator.core.artefact_store import ArtefactStore
 from problem_sheet_generator.core.sheet_generator import SheetGenerator
-from problem_sheet_generator.core.question import KEYWORD_REGISTRY, QUESTION_REGISTRY
+from problem_sheet_generator.core.question import KEYWORD_REGISTRY, QUESTION_REGISTRY, TOPIC_REGISTRY
 from problem_sheet_generator.utilities import configure_log
 
+
+def question_config(spec: str) -> QuestionConfig:
+    """
+    Parses a question given on the command line as "topic[/subtopic][:count]", for example
+    "line_integral/vector_field:2". A subtopic that isn't given is chosen at random for each
+    question.
+    """
+    topics, _, count = spec.partition(":")
+    topic, _, subtopic = topics.partition("/")
+
+    question_type = next((name for name, type_topics in TOPIC_REGISTRY.items() if topic in type_topics), None)
+    if question_type is None:
+        all_topics = sorted(name for type_topics in TOPIC_REGISTRY.values() for name in type_topics)
+        msg = f"{topic} is not a question topic. The topic should be one of {all_topics}."
+        raise ArgumentTypeError(msg)
+
+    if subtopic and subtopic not in TOPIC_REGISTRY[question_type][topic]:
+        msg = (f"{subtopic} is not a subtopic of {topic}. The subtopic should be one of "
+               f"{TOPIC_REGISTRY[question_type][topic]}.")
+        raise ArgumentTypeError(msg)
+
+    if count and not (count.isdigit() and int(count) > 0):
+        msg = f"The number of questions should be a positive integer, not {count}."
+        raise ArgumentTypeError(msg)
+
+    # The selector names subtopics after their topic, so the config does too.
+    return QuestionConfig([question_type, topic, f"{topic}_{subtopic}" if subtopic else None], int(count or 1))
+
+
 # Use this code to bypass GUI.
-# TODO: Need to manually create QuestionConfig and pass appropriate arguments to generate() before this code can be used.
 if __name__ == "__main__":
     configure_log()
 
+    parser = ArgumentParser(description = "Generate problem sheets without the GUI.")
+    parser.add_argument("--question", type = question_config, action = "append", required = True,
+                        dest = "questions", metavar = "TOPIC[/SUBTOPIC][:COUNT]",
+                        help = "Questions to put on the sheet. Can be given more than once.")
+    parser.add_argument("--seed", type = int, help = "Seed the sheet so it can be reproduced and reused.")
+    parser.add_argument("--rebuild", action = "store_true",
+                        help = "Build the sheets even if they are in the artefact store.")
+    parser.add_argument("--max-store-age", type = float,
+                        help = "Remove stored sheets that haven't been used in this many days.")
+    parser.add_argument("--max-store-size", type = float,
+                        help = "Remove the least recently used stored sheets above this many megabytes.")
+    args = parser.parse_args()
+
     info(f"Question registry: {QUESTION_REGISTRY}")
     info(f"Keyword registry: {KEYWORD_REGISTRY}")
 
-    sheet_generator = SheetGenerator(SheetConfig())
-    sheet_generator.generate()
\ No newline at end of file
+    config = SheetConfig()
+    store = ArtefactStore(f"{config.output_dir}/.artefacts")
+    store.collect_garbage(
+        args.max_store_age*86400 if args.max_store_age is not None else None,
+        int(args.max_store_size*2**20) if args.max_store_size is not None else None
+    )
+
+    sheet_generator = SheetGenerator(config, seed = args.seed, store = store)
+    sheet_generator.generate(args.questions, rebuild = args.rebuild)
@@ -0,0 +1,157 @@
+from __future__ import annotations
+from json import dump, load
+from logging import info
+from os import replace
+from pathlib import Path
+
+
+class AdaptiveSampler():
+    """
+    Adjusts the weight tables used by random_weighted_coefficients from acceptance statistics.
+
+    Every coefficient draw made through the sampler is recorded as pending, together with the
+    categories it fell into (the number of non-zero coefficients, their values and their
+    indices). When the candidate question built from the draws is accepted or rejected, each
+    category's counts are updated. Weight tables are then scaled per category by its smoothed
+    acceptance rate relative to the table's overall rate, clamped to [min_factor, max_factor]
+    times the hardcoded weights so that no option is ever removed and variety is preserved.
+
+    Statistics are kept per bucket, such as "line_integral/vector_field/3", since different
+    subtopics and dimensions favour different parameters.
+
+    Parameters
+    ==========
+    path: str | Path, optional
+        JSON file the statistics are loaded from and saved to. If None then the statistics only
+        last as long as the object.
+
+    min_factor: float, optional
+        The smallest multiple of a hardcoded weight that a learned weight can take.
+
+    max_factor: float, optional
+        The largest multiple of a hardcoded weight that a learned weight can take.
+    """
+
+    VERSION: int = 1
+
+    def __init__(self, path: str | Path | None = None, min_factor: float = 0.5, max_factor: float = 2.0):
+        if not 0 < min_factor <= 1 <= max_factor:
+            msg = ("The weight bounds must satisfy 0 < min_factor <= 1 <= max_factor, not "
+                   f"min_factor = {min_factor} and max_factor = {max_factor}.")
+            raise ValueError(msg)
+        self._min_factor = min_factor
+        self._max_factor = max_factor
+
+        self._path: Path | None = Path(path) if path is not None else None
+        self._stats: dict[str, dict[str, list[int]]] = {}
+        self._pending: list[tuple[str, int]] = []
+
+        if self._path is not None and self._path.exists():
+            self._load()
+
+    @property
+    def stats(self) -> dict[str, dict[str, list[int]]]:
+        return self._stats
+
+    def update_stats(self, stats: dict[str, dict[str, list[int]]]) -> None:
+        """
+        Replaces the statistics with ones learned by a copy of the sampler, for example one that
+        was sent to a worker process.
+        """
+        self._stats = stats
+        self._pending.clear()
+
+    def _load(self) -> None:
+        with open(self._path) as file:
+            data = load(file)
+        if data.get("version") == self.VERSION:
+            self._stats = data["stats"]
+            info(f"Loaded adaptive sampling statistics for {len(self._stats)} tables from {self._path}")
+
+    def save(self) -> None:
+        if self._path is None:
+            return
+
+        temp_path = self._path.with_suffix(self._path.suffix + ".tmp")
+        with open(temp_path, "w") as file:
+            dump({"version": self.VERSION, "stats": self._stats}, file)
+        replace(temp_path, self._path)
+
+    def _table_stats(self, key: str, size: int) -> dict[str, list[int]]:
+        table = self._stats.get(key)
+        if table is None or len(table["drawn"]) != size:
+            table = {"drawn": [0]*size, "accepted": [0]*size}
+            self._stats[key] = table
+        return table
+
+    def _learned_weights(self, key: str, base: list[float]) -> list[float]:
+        table = self._table_stats(key, len(base))
+        drawn, accepted = table["drawn"], table["accepted"]
+
+        # Laplace smoothing stops categories with few draws from swinging to either bound.
+        mean_rate = (sum(accepted) + 1)/(sum(drawn) + 2)
+        weights = []
+        for weight, num_drawn, num_accepted in zip(base, drawn, accepted):
+            factor = ((num_accepted + 1)/(num_drawn + 2))/mean_rate
+            weights.append(weight*min(max(factor, self._min_factor), self._max_factor))
+        return weights
+
+    def weight_tables(
+            self,
+            bucket: str,
+            name: str,
+            non_zero_coeff_weights: list[float],
+            coeff_value_weights: list[float],
+            index_weights: list[float]
+    ) -> tuple[list[float]]:
+        """
+        Returns learned versions of the three weight tables passed to random_weighted_coefficients
+        for the named generator in the bucket. New lists are always returned, so they can be
+        mutated by the caller.
+        """
+        return (
+            self._learned_weights(f"{bucket}/{name}/non_zero", non_zero_coeff_weights),
+            self._learned_weights(f"{bucket}/{name}/value", coeff_value_weights),
+            self._learned_weights(f"{bucket}/{name}/index", index_weights)
+        )
+
+    def observe(
+            self,
+            bucket: str,
+            name: str,
+            coeffs: list[int],
+            non_zero_coeffs_range: tuple[int],
+            coeff_value_range: tuple[int]
+    ) -> None:
+        """
+        Records the categories of a draw from random_weighted_coefficients as pending until the
+        candidate it was used in is accepted or rejected.
+        """
+        values = [value for value in range(coeff_value_range[0], coeff_value_range[1] + 1) if value != 0]
+        non_zero = [(index, coeff) for index, coeff in enumerate(coeffs) if coeff != 0]
+
+        self._pending.append((f"{bucket}/{name}/non_zero", len(non_zero) - non_zero_coeffs_range[0]))
+        for index, coeff in non_zero:
+            self._pending.append((f"{bucket}/{name}/value", values.index(coeff)))
+            self._pending.append((f"{bucket}/{name}/index", index))
+
+    def _resolve(self, accepted: bool) -> None:
+        for key, category in self._pending:
+            table = self._stats.get(key)
+            if table is None or category >= len(table["drawn"]):
+                continue
+            table["drawn"][category] += 1
+            table["accepted"][category] += accepted
+        self._pending.clear()
+
+    def accept(self) -> None:
+        """
+        Credits every pending draw with an accepted candidate.
+        """
+        self._resolve(True)
+
+    def reject(self) -> None:
+        """
+        Records every pending draw as part of a rejected candidate.
+        """
+        self._resolve(False)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from problem_sheet_generator.app.ui import SheetConfig
+    from problem_sheet_generator.app.ui import QuestionConfig
+from dataclasses import asdict, dataclass
+from functools import cache
+from hashlib import blake2b
+from json import dumps, loads
+from logging import info
+from os import link, replace, utime
+from pathlib import Path
+from shutil import copy2, rmtree
+from tempfile import mkdtemp
+from time import time
+from problem_sheet_generator.core.question_worker import QuestionRecord
+from problem_sheet_generator.core.wire_format import encode_records, iter_record_fields
+
+PACKAGE_ROOT: Path = Path(__file__).resolve().parent.parent
+
+
+@cache
+def code_version() -> str:
+    """
+    A digest of the package's source files. Any change to the code that generates or typesets
+    questions gives a new version, so artefacts built by older code are never reused.
+    """
+    digest = blake2b(digest_size = 16)
+    for path in sorted(PACKAGE_ROOT.rglob("*.py")):
+        digest.update(path.relative_to(PACKAGE_ROOT).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def sheet_key(
+        config: SheetConfig,
+        selected_questions: list[QuestionConfig],
+        seed: int,
+        generate_tex: bool = True
+) -> str:
+    """
+    The content address of a sheet. A seeded sheet is fully determined by its config, the
+    questions selected, the seed and the code that generates it.
+    """
+    spec = {
+        "config": asdict(config),
+        "questions": [[list(question.topics), question.num_questions] for question in selected_questions],
+        "seed": seed,
+        "generate_tex": generate_tex,
+        "code_version": code_version()
+    }
+    return blake2b(dumps(spec, sort_keys = True).encode(), digest_size = 16).hexdigest()
+
+
+@dataclass
+class StoredSheet():
+    key: str
+    files: list[Path]
+    records: list[QuestionRecord]
+
+
+class ArtefactStore():
+    """
+    A content addressed store of built sheets. Each entry is a directory named by the sheet's key
+    (see sheet_key) holding the .tex and .pdf files and the question records in the wire format.
+
+    Entries are written to a temporary directory and renamed into place, so a reader never sees a
+    partly written entry. Looking up an entry marks it as used, and collect_garbage removes
+    entries by age and by least recent use.
+
+    Parameters
+    ==========
+    root: str | Path, optional
+        The directory the entries are kept in.
+    """
+
+    MANIFEST: str = "manifest.json"
+    RECORDS: str = "records.bin"
+
+    def __init__(self, root: str | Path = Path("output") / ".artefacts"):
+        self._root = Path(root)
+
+    def _entry(self, key: str) -> Path:
+        return self._root / key[:2] / key
+
+    def get(self, key: str) -> StoredSheet | None:
+        entry = self._entry(key)
+        manifest_path = entry / self.MANIFEST
+        try:
+            manifest = loads(manifest_path.read_text())
+            records = [QuestionRecord(**fields) for fields in iter_record_fields((entry / self.RECORDS).read_bytes())]
+        except (OSError, ValueError):
+            return None
+
+        files = [entry / name for name in manifest["files"]]
+        if not all(path.exists() for path in files):
+            return None
+
+        # The manifest's modification time is when the entry was last used.
+        utime(manifest_path)
+        return StoredSheet(key, files, records)
+
+    def put(self, key: str, files: dict[str, Path], records: list[QuestionRecord]) -> StoredSheet:
+        """
+        Stores the files of a sheet, copying each one to the entry under the name it is mapped
+        from, along with the sheet's question records.
+        """
+        entry = self._entry(key)
+        entry.parent.mkdir(parents = True, exist_ok = True)
+        temp_dir = Path(mkdtemp(prefix = f".{key}_", dir = entry.parent))
+        try:
+            for name, path in files.items():
+                copy2(path, temp_dir / name)
+            (temp_dir / self.RECORDS).write_bytes(encode_records(records))
+            (temp_dir / self.MANIFEST).write_text(dumps({"files": list(files), "created": time()}))
+
+            # An entry with the same key holds the same sheet, so it's replaced rather than merged.
+            if entry.exists():
+                rmtree(entry, ignore_errors = True)
+            replace(temp_dir, entry)
+        finally:
+            rmtree(temp_dir, ignore_errors = True)
+
+        return StoredSheet(key, [entry / name for name in files], records)
+
+    @staticmethod
+    def publish(path: Path, destination: Path) -> Path:
+        """
+        Publishes a stored file at the destination with an atomic rename. The file is hard linked
+        where the filesystem allows it, so publishing doesn't copy the file.
+        """
+        destination.parent.mkdir(parents = True, exist_ok = True)
+        temp_path = destination.with_name(f".{destination.name}.tmp")
+        temp_path.unlink(missing_ok = True)
+        try:
+            link(path, temp_path)
+        except OSError:
+            copy2(path, temp_path)
+        replace(temp_path, destination)
+        return destination
+
+    def remove(self, key: str) -> None:
+        rmtree(self._entry(key), ignore_errors = True)
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        """
+        Returns the last use time, size in bytes and directory of every entry.
+        """
+        entries = []
+        for manifest_path in self._root.glob(f"*/*/{self.MANIFEST}"):
+            entry = manifest_path.parent
+            size = sum(path.stat().st_size for path in entry.iterdir() if path.is_file())
+            entries.append((manifest_path.stat().st_mtime, size, entry))
+        return entries
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def collect_garbage(self, max_age: float | None = None, max_bytes: int | None = None) -> int:
+        """
+        Removes entries that haven't been used in max_age seconds, then the least recently used
+        entries until the store holds at most max_bytes. Returns the number of entries removed.
+        """
+        entries = sorted(self._entries())
+        removed = 0
+        now = time()
+
+        total = sum(size for _, size, _ in entries)
+        for last_used, size, entry in entries:
+            too_old = max_age is not None and now - last_used > max_age
+            too_big = max_bytes is not None and total > max_bytes
+            if not (too_old or too_big):
+                continue
+
+            rmtree(entry, ignore_errors = True)
+            total -= size
+            removed += 1
+
+        if removed:
+            info(f"Removed {removed} sheets from the artefact store {self._root}")
+        return removed
@@ -0,0 +1,220 @@
+from __future__ import annotations
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from logging import info
+from pathlib import Path
+from re import compile as compile_regex
+from os import replace
+from shutil import rmtree, which
+from subprocess import DEVNULL, PIPE, STDOUT, TimeoutExpired, run
+from tempfile import mkdtemp
+from threading import Lock, Thread
+from time import monotonic
+
+ENGINES: tuple[str] = ("pdflatex", "lualatex", "xelatex")
+INTERACTION_MODES: tuple[str] = ("batchmode", "nonstopmode", "scrollmode", "errorstopmode")
+
+# latexmk selects the engine with these flags.
+LATEXMK_ENGINE_FLAGS: dict[str, str] = {"pdflatex": "-pdf", "lualatex": "-pdflua", "xelatex": "-pdfxe"}
+
+# With -file-line-error TeX reports errors as "./name.tex:12: message", otherwise as "! message"
+# followed later by a "l.12 context" line.
+FILE_LINE_ERROR = compile_regex(r"^(?P<file>[^\s:][^:]*\.tex):(?P<line>\d+): (?P<message>.*)$")
+BANG_ERROR = compile_regex(r"^! (?P<message>.*)$")
+LINE_CONTEXT = compile_regex(r"^l\.(?P<line>\d+) ?(?P<context>.*)$")
+
+
+@dataclass(frozen = True)
+class LatexError():
+    message: str
+    line: int | None = None
+    file: str | None = None
+    context: str = ""
+
+    def __str__(self):
+        location = f"{self.file or 'line'} {self.line}: " if self.line is not None else ""
+        return f"{location}{self.message}{f' ({self.context})' if self.context else ''}"
+
+
+def _line_context(lines: list[str]) -> tuple[int | None, str]:
+    for text in lines:
+        if match := LINE_CONTEXT.match(text):
+            return int(match.group("line")), match.group("context")
+    return None, ""
+
+
+def parse_latex_log(log: str) -> list[LatexError]:
+    """
+    Extracts the errors from a TeX log file, with the line each one occurred on when the log
+    gives it.
+    """
+    errors: list[LatexError] = []
+    lines = log.splitlines()
+    for i, text in enumerate(lines):
+        if match := FILE_LINE_ERROR.match(text):
+            _, context = _line_context(lines[i + 1:i + 10])
+            errors.append(LatexError(match.group("message"), int(match.group("line")), match.group("file"), context))
+
+        elif match := BANG_ERROR.match(text):
+            line, context = _line_context(lines[i + 1:i + 10])
+            errors.append(LatexError(match.group("message"), line, context = context))
+
+    return errors
+
+
+@dataclass
+class CompileJob():
+    """
+    A LaTeX document to compile. The PDF is written to output_dir/name.pdf, along with the .tex
+    source if keep_tex is True.
+    """
+    name: str
+    source: str
+    output_dir: Path = Path("output")
+    keep_tex: bool = False
+    # If False then the job's temporary directory is removed in the background rather than
+    # before the result is returned.
+    clean: bool = True
+
+
+@dataclass
+class CompileResult():
+    job: CompileJob
+    success: bool
+    pdf_path: Path | None = None
+    errors: list[LatexError] = field(default_factory = list)
+    duration: float = 0.0
+
+
+class CompileService():
+    """
+    Compiles LaTeX documents with a bounded pool of workers.
+
+    Every job runs in its own hidden temporary directory inside the output directory, so jobs
+    with the same name can compile at the same time and a failed job only leaves behind its own
+    files, which are removed with the directory. Finished files are published into the output
+    directory with an atomic rename, so a reader never sees a half written PDF and concurrent
+    runs can't interleave their files. Errors are parsed from the job's .log file rather than
+    reported as a failed subprocess.
+
+    Parameters
+    ==========
+    workers: int, optional
+        The number of documents compiled at once.
+
+    engine: str, optional
+        The TeX engine, one of ENGINES.
+
+    interaction: str, optional
+        The TeX interaction mode, one of INTERACTION_MODES.
+
+    timeout: float, optional
+        The number of seconds a job may take before its compiler is killed.
+
+    use_latexmk: bool, optional
+        If True then latexmk is used when it is installed, so documents are rerun until their
+        references settle. Otherwise the engine is run once.
+    """
+
+    def __init__(
+            self,
+            workers: int = 2,
+            engine: str = "pdflatex",
+            interaction: str = "nonstopmode",
+            timeout: float = 60.0,
+            use_latexmk: bool = True
+    ):
+        if engine not in ENGINES:
+            msg = f"{engine} is not a supported TeX engine. The engine should be one of {list(ENGINES)}."
+            raise ValueError(msg)
+        if interaction not in INTERACTION_MODES:
+            msg = (f"{interaction} is not a TeX interaction mode. The interaction mode should be one of "
+                   f"{list(INTERACTION_MODES)}.")
+            raise ValueError(msg)
+
+        self._engine = engine
+        self._interaction = interaction
+        self._timeout = timeout
+        self._use_latexmk = use_latexmk
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix = "latex")
+
+    def _command(self, name: str) -> list[str]:
+        flags = [f"-interaction={self._interaction}", "-file-line-error", "-halt-on-error"]
+        if self._use_latexmk and which("latexmk"):
+            return ["latexmk", LATEXMK_ENGINE_FLAGS[self._engine], *flags, f"{name}.tex"]
+        return [self._engine, *flags, f"{name}.tex"]
+
+    def _run(self, job: CompileJob) -> CompileResult:
+        start = monotonic()
+        # The working directory is on the same filesystem as the output so publishing is a rename.
+        job.output_dir.mkdir(parents = True, exist_ok = True)
+        work_dir = Path(mkdtemp(prefix = f".{job.name}_", dir = job.output_dir))
+        try:
+            tex_path = work_dir / f"{job.name}.tex"
+            tex_path.write_text(job.source, encoding = "utf-8")
+
+            try:
+                process = run(self._command(job.name), cwd = work_dir, stdin = DEVNULL, stdout = PIPE,
+                              stderr = STDOUT, timeout = self._timeout)
+            except TimeoutExpired:
+                error = LatexError(f"Compilation timed out after {self._timeout} seconds.")
+                return CompileResult(job, False, errors = [error], duration = monotonic() - start)
+            except FileNotFoundError:
+                error = LatexError(f"{self._engine} was not found. Check that LaTeX is installed.")
+                return CompileResult(job, False, errors = [error], duration = monotonic() - start)
+
+            log_path = work_dir / f"{job.name}.log"
+            log = log_path.read_text(encoding = "utf-8", errors = "replace") if log_path.exists() else ""
+            errors = parse_latex_log(log)
+            pdf_path = work_dir / f"{job.name}.pdf"
+
+            if process.returncode != 0 or not pdf_path.exists():
+                if not errors:
+                    output = process.stdout.decode(errors = "replace").strip().splitlines()
+                    errors = [LatexError(output[-1] if output else f"Exited with status {process.returncode}.")]
+                return CompileResult(job, False, errors = errors, duration = monotonic() - start)
+
+            if job.keep_tex:
+                replace(tex_path, job.output_dir / f"{job.name}.tex")
+            published = job.output_dir / f"{job.name}.pdf"
+            replace(pdf_path, published)
+
+            info(f"Compiled {published} in {monotonic() - start:.2f}s")
+            return CompileResult(job, True, published, errors, monotonic() - start)
+
+        finally:
+            if job.clean:
+                rmtree(work_dir, ignore_errors = True)
+            else:
+                Thread(target = rmtree, args = (work_dir, True), daemon = True).start()
+
+    def submit(self, job: CompileJob) -> Future[CompileResult]:
+        return self._executor.submit(self._run, job)
+
+    def compile(self, job: CompileJob) -> CompileResult:
+        return self.submit(job).result()
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def __enter__(self) -> CompileService:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+_shared_compile_service: CompileService | None = None
+_shared_compile_service_lock = Lock()
+
+def shared_compile_service() -> CompileService:
+    """
+    The service used by sheet generators and fragment caches that aren't given one. It's created
+    the first time it's needed and shared from then on, so building a generator doesn't start a
+    pool of threads that is never shut down.
+    """
+    global _shared_compile_service
+    with _shared_compile_service_lock:
+        if _shared_compile_service is None:
+            _shared_compile_service = CompileService()
+        return _shared_compile_service
@@ -0,0 +1,88 @@
+from __future__ import annotations
+from hashlib import blake2b
+from logging import error
+from pathlib import Path
+from pylatex.utils import NoEscape
+from problem_sheet_generator.core.compile_service import (CompileJob, CompileResult, CompileService,
+                                                          shared_compile_service)
+
+FRAGMENT_TEMPLATE: str = r"""\documentclass[varwidth={width},border=1pt]{{standalone}}
+\usepackage[T1]{{fontenc}}
+\usepackage{{lmodern}}
+\usepackage{{textcomp}}
+\usepackage{{amsmath}}
+\begin{{document}}
+{latex}
+\end{{document}}
+"""
+
+# Raises the fragment so its top lines up with the top of the item label rather than its bottom.
+INCLUDE_TEMPLATE: str = r"\raisebox{{\dimexpr-\height+\ht\strutbox\relax}}{{\includegraphics{{{path}}}}}"
+
+
+class FragmentCache():
+    """
+    Compiles questions and answers once each as standalone PDF fragments and keeps them by a hash
+    of their source, so a sheet can be assembled by including the fragments in a thin wrapper
+    document. When one question of a sheet changes only its fragment and the wrapper are
+    compiled again.
+
+    Fragments are compiled through the compile service, so they are published atomically and a
+    fragment compiled by two sheets at once is never seen half written.
+
+    Parameters
+    ==========
+    root: str | Path, optional
+        The directory the fragments are kept in.
+
+    compile_service: CompileService, optional
+        The service fragments are compiled with. If None then the shared service is used (see
+        shared_compile_service).
+
+    width: str, optional
+        The widest a fragment can be, which should be the width of an item on the sheet.
+    """
+
+    def __init__(
+            self,
+            root: str | Path = Path("output") / ".fragments",
+            compile_service: CompileService | None = None,
+            width: str = "14cm"
+    ):
+        self._root = Path(root).resolve()
+        self._compile_service = compile_service if compile_service is not None else shared_compile_service()
+        self._width = width
+
+    def source(self, latex: str) -> str:
+        return FRAGMENT_TEMPLATE.format(width = self._width, latex = latex)
+
+    def key(self, latex: str) -> str:
+        return blake2b(self.source(latex).encode(), digest_size = 16).hexdigest()
+
+    def path(self, latex: str) -> Path:
+        return self._root / f"{self.key(latex)}.pdf"
+
+    def includes(self, items: list[str]) -> list[str]:
+        """
+        Returns the LaTeX that includes the fragment of each item, compiling the fragments that
+        aren't cached yet in parallel. An item whose fragment fails to compile is returned as it
+        is, so it is typeset in the wrapper document instead.
+        """
+        missing = {self.key(latex): latex for latex in items if not self.path(latex).exists()}
+        futures = [
+            self._compile_service.submit(CompileJob(key, self.source(latex), self._root))
+            for key, latex in missing.items()
+        ]
+        failed: set[str] = set()
+        for future in futures:
+            result: CompileResult = future.result()
+            if not result.success:
+                failed.add(result.job.name)
+                errors = "\n".join(f"    {e}" for e in result.errors)
+                error(f"LaTeX failed to compile the fragment {result.job.name}:\n{errors}")
+
+        return [
+            latex if self.key(latex) in failed
+            else NoEscape(INCLUDE_TEMPLATE.format(path = self.path(latex).as_posix()))
+            for latex in items
+        ]
@@ -0,0 +1,265 @@
+from __future__ import annotations
+from asyncio import (Semaphore, StreamReader, StreamWriter, gather, get_running_loop, start_server,
+                     start_unix_server, to_thread, wait, wait_for, wrap_future)
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+from json import dumps, loads
+from logging import error, info, warning
+from multiprocessing import get_context
+from os import cpu_count
+from random import Random
+from problem_sheet_generator.app.ui import QuestionConfig, SheetConfig
+from problem_sheet_generator.core.compile_service import CompileService
+from problem_sheet_generator.core.question import QUESTION_REGISTRY
+from problem_sheet_generator.core.question_worker import (QuestionRecord, QuestionTimeoutError, generate_encoded_record,
+                                                          generate_question_record)
+from problem_sheet_generator.core.sheet_generator import GenerationResult, SheetGenerator
+from problem_sheet_generator.utilities import validate_latex
+
+
+def _warm_worker() -> None:
+    """
+    Runs once in each worker process. Generating a question of every subtopic imports sympy,
+    builds the coordinate systems and fills the caches, so the first real request doesn't pay
+    for them.
+    """
+    for topic, cls in QUESTION_REGISTRY.items():
+        for subtopic in cls.subtopics:
+            try:
+                generate_question_record(topic, subtopic, 0)
+            except Exception as e:
+                warning(f"{type(e).__name__}: Warming up {topic}/{subtopic} failed. {e}")
+
+
+def _worker_ready() -> None:
+    """
+    Submitted to a new pool once for each worker, so waiting for these jobs waits for the
+    workers to start and warm up.
+    """
+
+
+class GenerationService():
+    """
+    A long lived local service that generates sheets for clients, so that the cost of starting
+    Python, importing sympy and warming caches is paid once rather than for every sheet.
+
+    Clients connect over a Unix socket or TCP and send one JSON object per line:
+
+        {"id": "...", "sheet": {SheetConfig fields}, "questions": [{"topics": [...],
+         "num_questions": 2}], "seed": 1, "compile": true}
+
+    The service replies with JSON lines for the request: a "progress" event after each question,
+    then a "done" event with the records and any compiled files, or an "error" event.
+
+    Questions are generated in a pool of warm worker processes. Every request runs up to
+    workers questions at once, and all of them wait in one first in first out queue for a
+    worker, so concurrent requests share the workers evenly and a large sheet can't starve a
+    small one.
+
+    A question that takes longer than the time limit can't be interrupted in the pool, so the
+    whole pool is replaced with a new one and the question is retried with a fresh seed. The
+    questions other requests had running in the old pool are retried in the new one.
+
+    Parameters
+    ==========
+    workers: int, optional
+        The number of worker processes. If None then the number of CPUs is used.
+
+    compile_service: CompileService, optional
+        The service sheets are compiled with. If None then a new one is used.
+
+    time_limit: float, optional
+        The number of seconds a question may take before its worker pool is replaced.
+    """
+
+    MAX_ATTEMPTS: int = 20
+
+    def __init__(
+            self,
+            workers: int | None = None,
+            compile_service: CompileService | None = None,
+            time_limit: float = 10.0
+    ):
+        if time_limit <= 0:
+            msg = f"time_limit should be a positive number of seconds, not {time_limit}."
+            raise ValueError(msg)
+        self._workers = workers or cpu_count() or 1
+        self._time_limit = time_limit
+        self._pool, self._pool_ready = self._new_pool()
+        self._compile_service = compile_service if compile_service is not None else CompileService()
+        self._slots = Semaphore(self._workers)
+        self._clients: set[StreamWriter] = set()
+
+    def _new_pool(self) -> tuple[ProcessPoolExecutor, list[Future]]:
+        """
+        Starts a pool of warm workers. Returns the pool and jobs that finish once its workers
+        are ready, so warming up doesn't count against the time limit of the first questions.
+        """
+        # Worker processes are spawned rather than forked since the compile threads are running.
+        pool = ProcessPoolExecutor(self._workers, mp_context = get_context("spawn"), initializer = _warm_worker)
+        return pool, [pool.submit(_worker_ready) for _ in range(self._workers)]
+
+    def _replace_pool(self, pool: ProcessPoolExecutor) -> None:
+        """
+        Kills the processes of the pool and starts a new one in its place, unless the pool has
+        been replaced already.
+        """
+        if pool is not self._pool:
+            return
+
+        self._pool, self._pool_ready = self._new_pool()
+        # ProcessPoolExecutor can't stop a running job, so its processes are killed directly.
+        for process in list(pool._processes.values()):
+            process.kill()
+        pool.shutdown(wait = False, cancel_futures = True)
+
+    async def _generate_record(self, topics: tuple[str], seed: int) -> QuestionRecord:
+        await wait([wrap_future(future) for future in self._pool_ready])
+
+        pool = self._pool
+        try:
+            encoded = await wait_for(
+                get_running_loop().run_in_executor(pool, generate_encoded_record, *topics, seed), self._time_limit
+            )
+        except TimeoutError:
+            self._replace_pool(pool)
+            msg = (f"Generating a {topics[1]} question with seed {seed} took longer than "
+                   f"{self._time_limit} seconds.")
+            raise QuestionTimeoutError(msg)
+        except BrokenProcessPool:
+            # A worker died, or the pool was replaced while the question was running.
+            self._replace_pool(pool)
+            raise
+        return QuestionRecord.from_bytes(encoded)
+
+    async def _generate_slot(
+            self,
+            generator: SheetGenerator,
+            topics: tuple[str],
+            rng: Random,
+            fingerprints: set[str]
+    ) -> QuestionRecord:
+        """
+        Generates a question for one place on a sheet in the worker pool, regenerating it while
+        it's a duplicate, has invalid LaTeX, times out or was running in a pool that was replaced.
+        """
+        for _ in range(self.MAX_ATTEMPTS):
+            async with self._slots:
+                try:
+                    record = await self._generate_record(topics, rng.getrandbits(64))
+                except QuestionTimeoutError as e:
+                    key = f"{topics[0]}/{topics[1]}"
+                    generator.stats.timeouts[key] = generator.stats.timeouts.get(key, 0) + 1
+                    warning(f"{type(e).__name__}: {e}")
+                    continue
+                except BrokenProcessPool:
+                    continue
+
+            if record.fingerprint in fingerprints:
+                generator.stats.duplicates_rejected += 1
+                continue
+            if validate_latex(record.question) or validate_latex(record.answer):
+                generator.stats.invalid_latex_rejected += 1
+                continue
+
+            fingerprints.add(record.fingerprint)
+            generator.stats.questions_generated += 1
+            return record
+
+        msg = f"Couldn't generate a distinct, valid {topics[1]} question in {self.MAX_ATTEMPTS} attempts."
+        raise RuntimeError(msg)
+
+    async def generate(self, request: dict, writer: StreamWriter | None = None) -> GenerationResult:
+        """
+        Generates, and compiles if the request asks for it, the sheet described by the request.
+        Progress events are written to the writer if one is given.
+        """
+        config = SheetConfig(**request.get("sheet", {}))
+        selected = [QuestionConfig(**question) for question in request["questions"]]
+        generator = SheetGenerator(config, compile_service = self._compile_service)
+
+        rng = Random(request.get("seed"))
+        places = [generator.resolve_topics(question) for question in selected for _ in range(question.num_questions)]
+        # Each place gets its own generator, so the sheet doesn't depend on the order the workers
+        # finish in.
+        place_rngs = [Random(rng.getrandbits(64)) for _ in places]
+        records: list[QuestionRecord | None] = [None]*len(places)
+        fingerprints: set[str] = set()
+        completed = 0
+
+        async def fill(indices: list[int]) -> None:
+            nonlocal completed
+            for index in indices:
+                records[index] = await self._generate_slot(generator, places[index], place_rngs[index], fingerprints)
+                completed += 1
+                if writer is not None:
+                    self._send(writer, {"id": request.get("id"), "event": "progress",
+                                        "completed": completed, "total": len(places)})
+                    await writer.drain()
+
+        start = get_running_loop().time()
+        await gather(*(fill(list(range(len(places)))[i::self._workers]) for i in range(self._workers)))
+
+        result = GenerationResult(generator.stats, records = records)
+        result.generation_time = get_running_loop().time() - start
+        if request.get("compile", True):
+            await to_thread(generator.compile, result, request.get("generate_tex", True))
+        return result
+
+    @staticmethod
+    def _send(writer: StreamWriter, message: dict) -> None:
+        writer.write((dumps(message) + "\n").encode())
+
+    async def _handle_client(self, reader: StreamReader, writer: StreamWriter) -> None:
+        self._clients.add(writer)
+        try:
+            await self._handle_requests(reader, writer)
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    async def _handle_requests(self, reader: StreamReader, writer: StreamWriter) -> None:
+        while line := await reader.readline():
+            request_id = None
+            try:
+                request = loads(line)
+                if not isinstance(request, dict):
+                    msg = f"A request should be a JSON object, not {type(request).__name__}."
+                    raise TypeError(msg)
+
+                request_id = request.get("id")
+                result = await self.generate(request, writer)
+                self._send(writer, {
+                    "id": request_id,
+                    "event": "done",
+                    "records": [asdict(record) for record in result.records],
+                    "output_files": [str(path) for path in result.output_files],
+                    "compiled": result.compiled,
+                    "stats": asdict(result.stats)
+                })
+            # Any failure only fails its own request, so the client's later requests still run.
+            except Exception as e:
+                error(f"{type(e).__name__}: Request {request_id} failed. {e}")
+                self._send(writer, {"id": request_id, "event": "error", "message": f"{type(e).__name__}: {e}"})
+            await writer.drain()
+
+    async def serve(self, path: str | None = None, host: str = "127.0.0.1", port: int = 8765) -> None:
+        """
+        Serves requests on the Unix socket at path, or on host and port if no path is given,
+        until cancelled.
+        """
+        server = (await start_unix_server(self._handle_client, path) if path is not None
+                  else await start_server(self._handle_client, host, port))
+        info(f"Generation service listening on {path if path is not None else f'{host}:{port}'}")
+        try:
+            await server.serve_forever()
+        finally:
+            # The server only finishes closing once every client has disconnected.
+            for writer in list(self._clients):
+                writer.close()
+            server.close()
+
+    def close(self) -> None:
+        self._pool.shutdown(cancel_futures = True)
+        self._compile_service.close()
@@ -0,0 +1,195 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict
+from fractions import Fraction
+from json import dumps
+from logging import info
+from pathlib import Path
+from random import Random
+from re import compile as compile_regex
+from typing import TextIO
+from xml.sax.saxutils import escape
+from problem_sheet_generator.core.question import QuestionGenerationError
+from problem_sheet_generator.core.question_worker import QuestionRecord, generate_encoded_record
+
+# Answers that are a plain integer or fraction, such as $-12$ or $- \frac{8}{3}$.
+RATIONAL_ANSWER = compile_regex(r"^\$(?P<sign>-?)\s*(?:(?P<integer>\d+)|\\frac\{(?P<p>\d+)\}\{(?P<q>\d+)\})\$$")
+INLINE_MATH = compile_regex(r"(?<!\\)\$(.+?)(?<!\\)\$")
+
+# A unique export gives up after this many repeated questions in a row, since the subtopic has
+# probably run out of distinct questions.
+MAX_DUPLICATES_IN_A_ROW: int = 20
+
+
+class QuestionExporter(ABC):
+    """
+    Writes question records to a file one at a time as they are produced, so exports of any size
+    only ever hold one record in memory.
+
+    Parameters
+    ==========
+    path: str | Path
+        The file the questions are written to. It is overwritten if it exists.
+    """
+
+    def __init__(self, path: str | Path):
+        self._path = Path(path)
+        self._path.parent.mkdir(parents = True, exist_ok = True)
+        self._file: TextIO = open(self._path, "w", encoding = "utf-8")
+        self._count = 0
+        self._write_header()
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def _write_header(self) -> None:
+        pass
+
+    def _write_footer(self) -> None:
+        pass
+
+    @abstractmethod
+    def _write_record(self, record: QuestionRecord) -> None:
+        pass
+
+    def write(self, record: QuestionRecord) -> None:
+        self._write_record(record)
+        self._count += 1
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._write_footer()
+        self._file.close()
+        info(f"Exported {self._count} questions to {self._path}")
+
+    def __enter__(self) -> QuestionExporter:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class JSONLinesExporter(QuestionExporter):
+    """
+    Writes each question as a JSON object on its own line.
+    """
+
+    def _write_record(self, record: QuestionRecord) -> None:
+        self._file.write(dumps(asdict(record)) + "\n")
+
+
+class MoodleXMLExporter(QuestionExporter):
+    """
+    Writes the questions as a Moodle XML quiz. Questions with an integer or fraction answer are
+    numerical questions, which Moodle marks automatically, and the rest are short answer
+    questions. Math is delimited with \\(...\\) for Moodle's MathJax filter.
+
+    Parameters
+    ==========
+    path: str | Path
+        The file the questions are written to. It is overwritten if it exists.
+
+    tolerance: float, optional
+        The absolute error accepted in answers to numerical questions.
+    """
+
+    def __init__(self, path: str | Path, tolerance: float = 0.01):
+        self._tolerance = tolerance
+        super().__init__(path)
+
+    def _write_header(self) -> None:
+        self._file.write('<?xml version="1.0" encoding="UTF-8"?>\n<quiz>\n')
+
+    def _write_footer(self) -> None:
+        self._file.write("</quiz>\n")
+
+    @staticmethod
+    def _numeric_answer(answer: str) -> Fraction | None:
+        match = RATIONAL_ANSWER.match(answer.strip())
+        if match is None:
+            return None
+
+        value = (Fraction(int(match.group("integer"))) if match.group("integer") is not None
+                 else Fraction(int(match.group("p")), int(match.group("q"))))
+        return -value if match.group("sign") else value
+
+    @staticmethod
+    def _text(latex: str) -> str:
+        return escape(INLINE_MATH.sub(r"\\(\1\\)", latex).replace(r"\$", "$"))
+
+    def _write_record(self, record: QuestionRecord) -> None:
+        value = self._numeric_answer(record.answer)
+        question_type = "numerical" if value is not None else "shortanswer"
+
+        answer = (f"<text>{float(value)!r}</text><tolerance>{self._tolerance}</tolerance>" if value is not None
+                  else f"<text>{self._text(record.answer)}</text>")
+
+        self._file.write(
+            f'  <question type="{question_type}">\n'
+            f"    <name><text>{escape(record.topic)} {escape(record.subtopic)} {record.fingerprint[:8]}</text></name>\n"
+            f'    <questiontext format="html"><text>{self._text(record.question)}</text></questiontext>\n'
+            f'    <answer fraction="100">{answer}</answer>\n'
+            "  </question>\n"
+        )
+
+
+def export_questions(
+        exporter: QuestionExporter,
+        topic: str,
+        subtopic: str,
+        count: int,
+        seed: int | None = None,
+        workers: int = 1,
+        unique: bool = False
+) -> int:
+    """
+    Generates count questions for the subtopic and streams them to the exporter in order as they
+    are produced.
+
+    Questions are generated in a pool of worker processes with at most a few per worker in
+    flight, so memory use doesn't grow with count. If unique is True then repeated questions are
+    skipped and replaced, which keeps a 16 byte fingerprint for every question exported.
+
+    Returns the number of questions written, which is always count.
+
+    Raises
+    ======
+    QuestionGenerationError
+        If unique is True and MAX_DUPLICATES_IN_A_ROW repeated questions are generated in a row.
+    """
+    rng = Random(seed)
+    seen: set[bytes] = set()
+    written = 0
+    duplicates = 0
+
+    with ProcessPoolExecutor(workers) as pool:
+        in_flight: deque[Future[bytes]] = deque()
+        while written < count:
+            # Only as many questions are submitted as are still needed, so a skipped repeat is
+            # replaced by submitting another.
+            while written + len(in_flight) < count and len(in_flight) < 4*workers:
+                in_flight.append(pool.submit(generate_encoded_record, topic, subtopic, rng.getrandbits(64)))
+
+            record = QuestionRecord.from_bytes(in_flight.popleft().result())
+            if unique:
+                fingerprint = bytes.fromhex(record.fingerprint)
+                if fingerprint in seen:
+                    duplicates += 1
+                    if duplicates >= MAX_DUPLICATES_IN_A_ROW:
+                        for future in in_flight:
+                            future.cancel()
+                        msg = (f"Couldn't generate {count} distinct {subtopic} questions, only "
+                               f"{written} were found before {duplicates} repeats in a row.")
+                        raise QuestionGenerationError(msg)
+                    continue
+                seen.add(fingerprint)
+                duplicates = 0
+
+            exporter.write(record)
+            written += 1
+
+    return written
@@ -0,0 +1,84 @@
+"""
+Cheap estimates of line integral answers, used to throw away candidate questions whose answers
+are hopelessly awkward before paying for a symbolic integration.
+
+For a polynomial field F and a polynomial curve r(t), a <= t <= b, the integrand F(r(t)).r'(t)
+is a polynomial in t. Its degree and leading coefficient follow from the degrees and leading
+coefficients of the field and curve components alone, and the leading term dominates the
+integral once the degree is moderately large. The leading term's contribution
+
+        L*(b^(D + 1) - a^(D + 1))/(D + 1)
+
+is therefore a good estimate of the size of the answer. The lower order terms can partially
+cancel it, so candidates are only rejected when the estimate is well past the point where
+awkward_number would reject the answer.
+
+Only the magnitude is predicted, not the denominator. The lcm of the exponents + 1 and the
+coefficient and limit denominators bounds the answer's denominator from above, but the true
+denominator is only a divisor of it and is often much smaller after cancellation. Such a bound can
+show that an answer's denominator is fine but never that it is awkward, so it can't be used to
+reject candidates and is left out.
+"""
+from fractions import Fraction
+from math import prod
+from problem_sheet_generator.core.mathematics.polynomial import Polynomial
+
+# awkward_number rejects any answer whose numerator has more than 3 digits, so an answer of
+# magnitude 1000 or more is always awkward. The estimate must pass this with a safety factor.
+AWKWARD_MAGNITUDE: int = 1000
+ESTIMATE_SAFETY_FACTOR: int = 5
+
+def estimate_vector_line_integral(
+        field_components: tuple[Polynomial],
+        curve_components: tuple[Polynomial],
+        limits: tuple[int]
+) -> Fraction | None:
+    """
+    Returns the leading term estimate of the line integral of a polynomial vector field along a
+    polynomial curve, or None if the leading terms cancel and no estimate can be made.
+
+    Parameters
+    ==========
+    field_components: tuple[Polynomial]
+        The field components, as polynomials in the coordinates.
+
+    curve_components: tuple[Polynomial]
+        The curve components, as univariate polynomials in the parameter.
+
+    limits: tuple[int]
+        The limits (a, b) of the parameter.
+    """
+    degrees = [comp.degree for comp in curve_components]
+    leads = [comp.terms[(degree,)] if degree >= 0 else Fraction(0)
+             for comp, degree in zip(curve_components, degrees)]
+
+    top_degree = -1
+    top_coeff = Fraction(0)
+    for field_comp, degree, lead in zip(field_components, degrees, leads):
+        # Constant curve components have r_i' = 0, so the field component doesn't contribute.
+        if degree <= 0:
+            continue
+
+        for exponents, coeff in field_comp.terms.items():
+            if any(power > 0 and degrees[j] < 0 for j, power in enumerate(exponents)):
+                continue
+
+            term_degree = sum(power*max(degrees[j], 0) for j, power in enumerate(exponents)) + degree - 1
+            term_coeff = coeff*prod(leads[j]**power for j, power in enumerate(exponents))*degree*lead
+
+            if term_degree > top_degree:
+                top_degree, top_coeff = term_degree, term_coeff
+            elif term_degree == top_degree:
+                top_coeff += term_coeff
+
+    if top_degree < 0 or top_coeff == 0:
+        return None
+
+    a, b = (Fraction(limit) for limit in limits)
+    return top_coeff*(b**(top_degree + 1) - a**(top_degree + 1))/(top_degree + 1)
+
+def answer_likely_awkward(estimate: Fraction | None) -> bool:
+    """
+    Returns True if an estimate is so large that the exact answer is almost certainly awkward.
+    """
+    return estimate is not None and abs(estimate) >= AWKWARD_MAGNITUDE*ESTIMATE_SAFETY_FACTOR
@@ -1,11 +1,15 @@
+from fractions import Fraction
 from logging import info
-from random import choice
-from sympy import Expr, Symbol, Polygon, Segment2D, factor_terms, latex
+from math import lcm
+from random import choice, randint
+from sympy import Expr, Poly, Symbol, S, Polygon, factor_terms, latex, srepr
 from sympy.abc import t, theta
 from sympy.vector import ParametricRegion, ImplicitRegion
 from problem_sheet_generator.core.regenerating import Regenerating
+from problem_sheet_generator.core.mathematics.polynomial import Polynomial
+from problem_sheet_generator.core.adaptive_sampling import AdaptiveSampler
 from problem_sheet_generator.utilities import (ParametricRegionLatexPrinter,
-                       generate_random_pairs, polynomial_from_coeffs, random_limits, random_weighted_coefficients)
+                       polynomial_from_coeffs, random_limits, random_triangle, random_weighted_coefficients)
 
 # TODO: Write docstrings.
 # TODO: Allow for curves to be geometric objects, e.g. triangles, circles etc.
@@ -23,6 +27,11 @@ class Curve(Regenerating):
         testing only. The length of this tuple should match the ambient_dim, and only one symbol
         should be used. The symbol used in the expressions will override any symbols passed in the
         parameter argument.
+
+    pythagorean_hodograph: bool, optional
+        If True then random curves are Pythagorean-hodograph curves, whose speed |r'(t)| is a
+        polynomial in the parameter, so integrals with respect to arc length stay polynomial.
+        Only supported for random parametric curves.
     """
 
     def __init__(
@@ -32,10 +41,19 @@ class Curve(Regenerating):
             linear_components: bool = False,
             force_closed: bool = False,
             components: tuple[Expr] = None,
-            limits: tuple[int] = None
+            limits: tuple[int] = None,
+            sampler: AdaptiveSampler | None = None,
+            bucket: str = "",
+            pythagorean_hodograph: bool = False
     ):
         self._parameter = parameter
 
+        self._pythagorean_hodograph = pythagorean_hodograph
+
+        # Optional source of learned weight tables for random generation, see AdaptiveSampler.
+        self._sampler = sampler
+        self._bucket = bucket
+
         if ambient_dim not in (2, 3):
                 msg = (f"Curve embedding into {ambient_dim}D space is not supported. "
                      "Ambient dimension should be 2 or 3.")
@@ -53,6 +71,11 @@ class Curve(Regenerating):
 
 
     def _regenerate(self) -> None:
+        self._vertices: tuple[tuple[int]] | None = None
+        self._component_polynomials: tuple[Polynomial] | None = None
+        self._canonical_form: tuple | None = None
+        self._speed: Polynomial | None = None
+
         if not self._manual_components:
             if not  self._manual_limits:
                 self._generate_random_curve()
@@ -93,20 +116,33 @@ class Curve(Regenerating):
                 (self._parameter,) + self._limits
             )
 
+        if self._vertices is not None:
+            # The sympy Polygon and its LaTeX are only needed for printing and verification, so
+            # they are built on demand by the region and region_latex properties.
+            self._region = None
+            self._region_latex = None
+            self._is_closed = True
+            info(f"Curve is the triangle with vertices {self._vertices}")
+            return
+
         printer: ParametricRegionLatexPrinter = ParametricRegionLatexPrinter()
         self._region_latex: str = printer.parametric_curve_print(self) if isinstance(self._region, ParametricRegion) else latex(self._region)
 
-        self._is_closed = (
-            self._region.definition.subs(
-                self._parameter,
-                self._region.limits[self._parameter][0]
-            )
-            ==
-            self._region.definition.subs(
-                self._parameter,
-                self._region.limits[self._parameter][1]
-            )
-        ) if isinstance(self._region, ParametricRegion) else self._force_closed
+        endpoints = self.endpoints()
+        if endpoints is not None:
+            self._is_closed = endpoints[0] == endpoints[1]
+        else:
+            self._is_closed = (
+                self._region.definition.subs(
+                    self._parameter,
+                    self._region.limits[self._parameter][0]
+                )
+                ==
+                self._region.definition.subs(
+                    self._parameter,
+                    self._region.limits[self._parameter][1]
+                )
+            ) if isinstance(self._region, ParametricRegion) else self._force_closed
 
         info((f"Curve is {self._region.definition if isinstance(self._region, ParametricRegion) else self._region} "
               f"with limits {self._limits}"))
@@ -118,10 +154,14 @@ class Curve(Regenerating):
 
     @property
     def region_latex(self) -> str:
+        if self._region_latex is None:
+            self._region_latex = latex(self.region)
         return self._region_latex
 
     @property
-    def region(self) -> ParametricRegion:
+    def region(self) -> ParametricRegion | Polygon:
+        if self._region is None and self._vertices is not None:
+            self._region = Polygon(*self._vertices)
         return self._region
 
     @property
@@ -132,40 +172,157 @@ class Curve(Regenerating):
     def parameter(self) -> Symbol:
         return self._parameter
 
+    @property
+    def vertices(self) -> tuple[tuple[int]] | None:
+        """
+        The integer vertices of the curve if it is a polygon, in anticlockwise order, otherwise
+        None.
+        """
+        return self._vertices
+
+    def component_polynomials(self) -> tuple[Polynomial] | None:
+        """
+        Returns the components of a parametric curve as exact polynomials in the parameter, or
+        None if the curve is a polygon or has a non-polynomial component. They are compiled once
+        per curve and cached.
+        """
+        if self._component_polynomials is None and self._vertices is None:
+            try:
+                self._component_polynomials = tuple(
+                    Polynomial.from_expr(comp, (self._parameter,)) for comp in self._region.definition
+                )
+            except ValueError:
+                return None
+        return self._component_polynomials
+
+    @property
+    def speed_polynomial(self) -> Polynomial | None:
+        """
+        The speed |r'(t)| as an exact polynomial in the parameter for Pythagorean-hodograph
+        curves, otherwise None.
+        """
+        return self._speed
+
+    def endpoints(self) -> tuple[tuple[Fraction]] | None:
+        """
+        Returns the exact start and end points of a polynomial curve with rational limits, or
+        None if they can't be evaluated exactly.
+        """
+        polys = self.component_polynomials()
+        if polys is None or not all(S(limit).is_Rational for limit in self._limits):
+            return None
+
+        start, end = (Fraction(int(S(limit).p), int(S(limit).q)) for limit in self._limits)
+        return (tuple(poly.evaluate((start,)) for poly in polys),
+                tuple(poly.evaluate((end,)) for poly in polys))
+
+    def canonical_form(self) -> tuple:
+        """
+        Returns a hashable description of the curve that is independent of how it is printed.
+
+        Polygons are described by their integer vertices, rotated so that the lexicographically
+        smallest vertex comes first (the orientation is kept). Parametric curves are described by
+        the (numerator, denominator) coefficients of each component in the parameter, together
+        with the limits.
+        """
+        if self._canonical_form is not None:
+            return self._canonical_form
+
+        if self._vertices is not None:
+            vertices = list(self._vertices)
+            start = vertices.index(min(vertices))
+            self._canonical_form = ("polygon", tuple(vertices[start:] + vertices[:start]))
+            return self._canonical_form
+
+        components = tuple(
+            tuple((int(coeff.p), int(coeff.q)) for coeff in Poly(S(comp), self._parameter).all_coeffs())
+            if S(comp).is_polynomial(self._parameter) else (srepr(comp),)
+            for comp in self._region.definition
+        )
+        self._canonical_form = ("parametric", components, tuple(
+            int(limit) if S(limit).is_Integer else srepr(limit) for limit in self._limits
+        ))
+        return self._canonical_form
+
     def _generate_random_curve(self) -> None:
         if self._force_closed:
-            self._region = self._generate_random_closed_curve()
+            self._vertices = self._generate_random_closed_curve()
             self._limits = None
         else:
             self._region: ParametricRegion = self._generate_random_parametric_curve(self._linear_components)
             self._limits = self._region.limits[self._parameter]
 
-    def _generate_random_closed_curve(self) -> ImplicitRegion | ParametricRegion | Polygon:
-        curve = Polygon(*generate_random_pairs(3, -2, 2))
-        while isinstance(curve, Segment2D):
-            curve = Polygon(*generate_random_pairs(3, -2, 2))
-
-        return curve
+    def _generate_random_closed_curve(self) -> tuple[tuple[int]]:
+        return random_triangle(-2, 2)
 
     def _generate_random_polynomial(self, linear_components: bool) -> Expr:
         max_index = 2 if linear_components else 4
         index_weights = [1, 1] if linear_components else [0.5, 0.5, 1, 1]
+        non_zero_coeff_weights = [0.6, 0.4]
+        coeff_value_weights = [0.01, 0.05, 0.05, 0.1, 0.4, 0.2, 0.1, 0.09]
+        if self._sampler is not None:
+            non_zero_coeff_weights, coeff_value_weights, index_weights = self._sampler.weight_tables(
+                self._bucket, "curve", non_zero_coeff_weights, coeff_value_weights, index_weights
+            )
+
         coeffs = random_weighted_coefficients(
             max_index = max_index,
             non_zero_coeffs_range = (1, 2),
             coeff_value_range = (-4, 4),
-            non_zero_coeff_weights = [0.6, 0.4],
-            coeff_value_weights = [0.01, 0.05, 0.05, 0.1, 0.4, 0.2, 0.1, 0.09],
+            non_zero_coeff_weights = non_zero_coeff_weights,
+            coeff_value_weights = coeff_value_weights,
             index_weights = index_weights
         )
+        if self._sampler is not None:
+            self._sampler.observe(self._bucket, "curve", coeffs, (1, 2), (-4, 4))
         return polynomial_from_coeffs(self.parameter, coeffs)
 
     def _generate_random_components(self, linear_components: bool) -> list[Expr]:
+        if self._pythagorean_hodograph:
+            return self._generate_pythagorean_hodograph_components(linear_components)
+
         return tuple([
             factor_terms(self._generate_random_polynomial(linear_components), sign = True)
             for _ in range(self._ambient_dim)
         ])
 
+    @staticmethod
+    def _random_hodograph_factor(degree: int) -> Polynomial:
+        return Polynomial({(power,): choice((-2, -1, 0, 0, 1, 1, 2)) for power in range(degree + 1)}, 1)
+
+    def _generate_pythagorean_hodograph_components(self, linear_components: bool) -> tuple[Expr]:
+        """
+        Generates a Pythagorean-hodograph curve from random integer polynomials. In 2D, for
+        polynomials u and v the hodograph r' = (u^2 - v^2, 2uv) has |r'| = u^2 + v^2. In 3D the
+        quaternion form with polynomials u, v, p and q gives
+
+            r' = (u^2 + v^2 - p^2 - q^2, 2(uq + vp), 2(vq - up)),    |r'| = u^2 + v^2 + p^2 + q^2.
+
+        The components are the antiderivatives of r' plus a random integer offset, scaled by the
+        lcm of their denominators so that they have integer coefficients. The scaled speed is
+        stored on the curve.
+        """
+        degree = 0 if linear_components else 1
+        num_factors = 2 if self._ambient_dim == 2 else 4
+
+        factors = [self._random_hodograph_factor(degree) for _ in range(num_factors)]
+        while all(factor.is_zero() for factor in factors):
+            factors = [self._random_hodograph_factor(degree) for _ in range(num_factors)]
+
+        if self._ambient_dim == 2:
+            u, v = factors
+            hodograph = (u*u - v*v, 2*u*v)
+        else:
+            u, v, p, q = factors
+            hodograph = (u*u + v*v - p*p - q*q, 2*(u*q + v*p), 2*(v*q - u*p))
+        speed = sum((factor*factor for factor in factors[1:]), factors[0]*factors[0])
+
+        components = [comp.integral(0) + Polynomial({(0,): randint(-2, 2)}, 1) for comp in hodograph]
+        scale = lcm(*(coeff.denominator for comp in components for coeff in comp.terms.values()))
+
+        self._speed = speed*scale
+        return tuple(factor_terms((comp*scale).to_expr((self._parameter,)), sign = True) for comp in components)
+
     def _generate_random_parametric_curve(self, linear_components: bool) -> ParametricRegion:
         return ParametricRegion(
             self._generate_random_components(linear_components),
@@ -173,4 +330,4 @@ class Curve(Regenerating):
         )
 
     def __repr__(self):
-        return f"{self._region}"
\ No newline at end of file
+        return f"{self.region}"
\ No newline at end of file
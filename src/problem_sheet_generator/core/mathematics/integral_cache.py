@@ -0,0 +1,162 @@
+from __future__ import annotations
+from collections import OrderedDict
+from functools import wraps
+from hashlib import blake2b
+from pathlib import Path
+from sqlite3 import Connection, connect
+from threading import Lock
+from typing import Callable
+from sympy import Expr, srepr, sympify
+
+
+class IntegralCache():
+    """
+    Least recently used cache of line integral results, with an optional on-disk tier.
+
+    Keys are canonical forms (see Field.canonical_form and Curve.canonical_form), so integrands
+    that are built or printed differently but are mathematically identical share an entry. The
+    disk tier is a SQLite table keyed by a digest of the canonical form, with values stored as
+    srepr strings, so it can be shared between runs.
+
+    Parameters
+    ==========
+    maxsize: int, optional
+        Maximum number of results held in memory. The least recently used result is evicted when
+        the cache is full.
+
+    path: str | Path, optional
+        Location of the SQLite database for the disk tier. If None then only the in-memory tier is
+        used.
+    """
+
+    def __init__(self, maxsize: int = 1024, path: str | Path | None = None):
+        if maxsize <= 0:
+            msg = f"The cache size should be a positive integer, not {maxsize}."
+            raise ValueError(msg)
+        self._maxsize = maxsize
+
+        self._entries: OrderedDict[tuple, Expr] = OrderedDict()
+        self._lock = Lock()
+
+        self._hits: int = 0
+        self._disk_hits: int = 0
+        self._misses: int = 0
+
+        self._connection: Connection | None = None
+        if path is not None:
+            self._connection = connect(path, check_same_thread = False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS integrals (key BLOB PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID"
+            )
+            self._connection.commit()
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def disk_hits(self) -> int:
+        return self._disk_hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self._hits + self._disk_hits + self._misses
+        return (self._hits + self._disk_hits)/lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _digest(key: tuple) -> bytes:
+        return blake2b(repr(key).encode(), digest_size = 16).digest()
+
+    def get(self, key: tuple) -> Expr | None:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+
+            if self._connection is not None:
+                row = self._connection.execute(
+                    "SELECT value FROM integrals WHERE key = ?", (self._digest(key),)
+                ).fetchone()
+                if row is not None:
+                    value = sympify(row[0])
+                    self._store(key, value)
+                    self._disk_hits += 1
+                    return value
+
+            self._misses += 1
+            return None
+
+    def put(self, key: tuple, value: Expr) -> None:
+        with self._lock:
+            self._store(key, value)
+            if self._connection is not None:
+                with self._connection:
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO integrals (key, value) VALUES (?, ?)",
+                        (self._digest(key), srepr(value))
+                    )
+
+    def _store(self, key: tuple, value: Expr) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last = False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._disk_hits = self._misses = 0
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __repr__(self):
+        return (f"IntegralCache(size={len(self)}/{self._maxsize}, hits={self._hits}, "
+                f"disk_hits={self._disk_hits}, misses={self._misses}, hit_rate={self.hit_rate:.2f})")
+
+
+_integral_cache: IntegralCache | None = IntegralCache()
+
+def get_integral_cache() -> IntegralCache | None:
+    return _integral_cache
+
+def set_integral_cache(cache: IntegralCache | None) -> None:
+    """
+    Replaces the cache used by memoized_integral. Passing None turns memoization off.
+    """
+    global _integral_cache
+    _integral_cache = cache
+
+def memoized_integral(method: Callable) -> Callable:
+    """
+    Decorator for Field methods that take a curve and return the value of an integral along it.
+    Results are looked up in the current integral cache using the canonical forms of the field
+    and the curve.
+    """
+    @wraps(method)
+    def wrap(field, curve):
+        cache = _integral_cache
+        if cache is None:
+            return method(field, curve)
+
+        key = (method.__name__, type(field).__name__, field.canonical_form(), curve.canonical_form())
+        value = cache.get(key)
+        if value is None:
+            value = method(field, curve)
+            cache.put(key, value)
+        return value
+    return wrap
@@ -0,0 +1,164 @@
+"""
+Answer-first construction of fields for line integral and Green's theorem questions.
+
+For a fixed curve, the line integral of a vector field is linear in the field's coefficients.
+Writing the field as a combination of basis monomials, each one placed in a single component,
+
+        F = c_1*m_1 + ... + c_n*m_n,
+
+the answer is c_1*I_1 + ... + c_n*I_n where I_k is the exact integral of m_k along the curve.
+Choosing a target answer T first and then solving this equation for small integer coefficients
+replaces the loop of generating fields until the answer happens to be nice. The equation is solved
+with at most two non-zero coefficients, which is a linear Diophantine equation in two unknowns
+after clearing denominators.
+"""
+from fractions import Fraction
+from math import gcd, lcm
+from random import randint, sample, shuffle
+from problem_sheet_generator.core.mathematics.polynomial import Polynomial
+from problem_sheet_generator.core.mathematics.polygon_integrals import polygon_integral
+
+# Largest |numerator| and denominator of the target answer for each question difficulty.
+ANSWER_BOUNDS: dict[str, tuple[int, int]] = {
+    "easy": (20, 4),
+    "medium": (100, 12),
+    "hard": (999, 99)
+}
+
+def random_target(answer_bounds: tuple[int, int], max_magnitude: Fraction | None = None) -> Fraction:
+    """
+    Returns a random non-zero rational whose numerator and denominator are within the bounds. If
+    max_magnitude is given then the target is also at most that size, which should be the
+    largest answer the basis can reach so that the target isn't hopeless.
+    """
+    max_numerator, max_denominator = answer_bounds
+    target = Fraction(0)
+    while target == 0 or abs(target.numerator) > max_numerator:
+        denominator = randint(1, max_denominator)
+        numerator_bound = max_numerator*denominator
+        if max_magnitude is not None:
+            numerator_bound = max(min(numerator_bound, int(max_magnitude*denominator)), 1)
+        target = Fraction(randint(-numerator_bound, numerator_bound), denominator)
+    return target
+
+def reachable_magnitude(values: list[Fraction], max_coeff: int = 4) -> Fraction:
+    """
+    Returns the largest answer size reachable with two terms of a basis.
+    """
+    largest = sorted((abs(value) for value in values), reverse = True)[:2]
+    return max_coeff*sum(largest, Fraction(0))
+
+def _extended_gcd(a: int, b: int) -> tuple[int, int, int]:
+    """
+    Returns (g, x, y) with a*x + b*y = g = gcd(a, b).
+    """
+    old_r, r, old_x, x, old_y, y = a, b, 1, 0, 0, 1
+    while r:
+        quotient = old_r//r
+        old_r, r = r, old_r - quotient*r
+        old_x, x = x, old_x - quotient*x
+        old_y, y = y, old_y - quotient*y
+    return (old_r, old_x, old_y) if old_r >= 0 else (-old_r, -old_x, -old_y)
+
+def solve_pair(a: Fraction, b: Fraction, target: Fraction, max_coeff: int) -> tuple[int, int] | None:
+    """
+    Returns integers (x, y) with a*x + b*y = target and |x|, |y| <= max_coeff, choosing the
+    solution with the smallest coefficients, or None if there isn't one.
+    """
+    scale = lcm(a.denominator, b.denominator, target.denominator)
+    A, B, C = int(a*scale), int(b*scale), int(target*scale)
+    if A == 0 or B == 0:
+        return None
+
+    g, x0, y0 = _extended_gcd(A, B)
+    if C % g:
+        return None
+
+    # Every solution is (x0*C/g + k*B/g, y0*C/g - k*A/g) for integer k.
+    x0, y0, step_x, step_y = x0*(C//g), y0*(C//g), B//g, A//g
+    centre = round(-x0/step_x)
+    best = None
+    for k in range(centre - 2*max_coeff - 1, centre + 2*max_coeff + 2):
+        x, y = x0 + k*step_x, y0 - k*step_y
+        if abs(x) <= max_coeff and abs(y) <= max_coeff and (best is None or max(abs(x), abs(y)) < max(map(abs, best))):
+            best = (x, y)
+    return best
+
+def solve_small_combination(
+        values: list[Fraction],
+        target: Fraction,
+        max_coeff: int = 4,
+        max_pairs: int = 200
+) -> dict[int, int] | None:
+    """
+    Returns {index: coefficient} with at most two non-zero integer coefficients, each at most
+    max_coeff in size, such that the combination of values equals the target. Single terms are
+    tried first, then up to max_pairs random pairs. Returns None if no solution was found.
+    """
+    candidates = [i for i, value in enumerate(values) if value != 0]
+    shuffle(candidates)
+
+    for i in candidates:
+        coeff = target/values[i]
+        if coeff.denominator == 1 and abs(coeff) <= max_coeff:
+            return {i: int(coeff)}
+
+    pairs = [(i, j) for n, i in enumerate(candidates) for j in candidates[n + 1:]]
+    for i, j in sample(pairs, min(max_pairs, len(pairs))):
+        solution = solve_pair(values[i], values[j], target, max_coeff)
+        if solution is not None:
+            return {index: coeff for index, coeff in zip((i, j), solution) if coeff != 0}
+
+    return None
+
+def line_integral_basis(
+        curve_components: tuple[Polynomial], limits: tuple[int], max_degree: int = 2
+) -> list[tuple[tuple[int, tuple[int]], Fraction]]:
+    """
+    Returns the basis of field monomials ((component, exponents), integral) for a polynomial
+    curve, where each monomial is a power of a single coordinate up to max_degree (or a
+    constant), matching the shape of randomly generated field components.
+    """
+    dimension = len(curve_components)
+    monomials = [(0,)*dimension] + [
+        tuple(power if j == var else 0 for j in range(dimension))
+        for var in range(dimension) for power in range(1, max_degree + 1)
+    ]
+
+    basis = []
+    for component, curve_comp in enumerate(curve_components):
+        derivative = curve_comp.derivative(0)
+        for exponents in monomials:
+            integrand = Polynomial({exponents: 1}, dimension).compose(curve_components)*derivative
+            basis.append(((component, exponents), integrand.definite_integral(*limits)))
+    return basis
+
+def circulation_basis(
+        vertices: tuple[tuple[int]], max_degree: int = 2
+) -> list[tuple[tuple[int, tuple[int]], Fraction]]:
+    """
+    Returns the basis of planar field monomials ((component, exponents), circulation) around a
+    polygon. Only powers of y in the first component and powers of x in the second have non-zero
+    curl, so only those are included.
+    """
+    basis = []
+    for component, var in ((0, 1), (1, 0)):
+        for power in range(1, max_degree + 1):
+            exponents = tuple(power if j == var else 0 for j in range(2))
+            field_comp = Polynomial({exponents: 1}, 2)
+            curl = field_comp.derivative(0) if component == 1 else -field_comp.derivative(1)
+            basis.append(((component, exponents), polygon_integral(curl, vertices)))
+    return basis
+
+def components_from_solution(
+        basis: list[tuple[tuple[int, tuple[int]], Fraction]], solution: dict[int, int], dimension: int
+) -> list[Polynomial]:
+    """
+    Returns the field components, as polynomials in the coordinates, of the combination of basis
+    monomials given by a solution of solve_small_combination.
+    """
+    components = [Polynomial({}, dimension) for _ in range(dimension)]
+    for index, coeff in solution.items():
+        (component, exponents), _ = basis[index]
+        components[component] = components[component] + Polynomial({exponents: coeff}, dimension)
+    return components
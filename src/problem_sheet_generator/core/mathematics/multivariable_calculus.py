@@ -1,12 +1,16 @@
 from abc import abstractmethod
+from fractions import Fraction
 from functools import reduce
 from logging import info
 from random import random
-from sympy import Expr, Symbol, S, factor_terms, latex
+from sympy import Expr, Poly, Rational, Symbol, S, factor_terms, latex, srepr
 from sympy.vector import (BaseScalar, CoordSys3D, ParametricRegion, Vector, VectorZero,
                           vector_integrate)
 from problem_sheet_generator.core.regenerating import Regenerating
+from problem_sheet_generator.core.adaptive_sampling import AdaptiveSampler
 from problem_sheet_generator.core.mathematics.geometry import Curve
+from problem_sheet_generator.core.mathematics.integral_cache import memoized_integral
+from problem_sheet_generator.core.mathematics.polynomial import Polynomial
 from problem_sheet_generator.utilities import (CleanVectorLatexPrinter,
                        polynomial_from_coeffs, random_weighted_coefficients, scalar_expr_from_expr)
 
@@ -17,10 +21,14 @@ class Field():
 
 
     @abstractmethod
-    def __init__(self, name: str, dimension: int):
+    def __init__(self, name: str, dimension: int, sampler: AdaptiveSampler | None = None, bucket: str = ""):
 
         self._name = name
 
+        # Optional source of learned weight tables for random generation, see AdaptiveSampler.
+        self._sampler = sampler
+        self._bucket = bucket
+
         if dimension not in (2, 3):
             msg = (f"{dimension} dimensional fields are not supported. "
                    "The dimension should be 2 or 3.")
@@ -80,28 +88,55 @@ class Field():
         if self._dimension == 3:
             index_weights += [0.5, 1, 1] # The weights for the z coefficient indices
 
+        non_zero_coeff_weights = [0.6, 0.3, 0.07, 0.03]
+        coeff_value_weights = [0.01, 0.05, 0.05, 0.1, 0.4, 0.2, 0.1, 0.09]
+        if self._sampler is not None:
+            non_zero_coeff_weights, coeff_value_weights, index_weights = self._sampler.weight_tables(
+                self._bucket, "field", non_zero_coeff_weights, coeff_value_weights, index_weights
+            )
+
         coeffs: list[int] = random_weighted_coefficients(
             max_index = 3*self._dimension,
             non_zero_coeffs_range = (1, 4),
             coeff_value_range = (-4, 4),
-            non_zero_coeff_weights = [0.6, 0.3, 0.07, 0.03],
-            coeff_value_weights = [0.01, 0.05, 0.05, 0.1, 0.4, 0.2, 0.1, 0.09],
+            non_zero_coeff_weights = non_zero_coeff_weights,
+            coeff_value_weights = coeff_value_weights,
             index_weights = index_weights
         )
+        if self._sampler is not None:
+            self._sampler.observe(self._bucket, "field", coeffs, (1, 4), (-4, 4))
         x_coeffs, y_coeffs, z_coeffs = (coeffs[0:3], coeffs[3:6],
                                         coeffs[6:9] if self._dimension == 3 else None)
 
         return self._generate_component_from_coeffs(x_coeffs, y_coeffs, z_coeffs)
 
+    @memoized_integral
     def calculate_line_integral(self, curve: Curve):
         """
         Calculates line integral of the (scalar or vector) field along the given curve.
 
         The line integral calculated for scalar fields is the line integral with respect to arc
-        length.
+        length. Results are memoized by the canonical forms of the field and curve.
         """
         return vector_integrate(self._field, curve.region)
 
+    def _canonical_terms(self, expr: Expr) -> tuple:
+        """
+        Returns the terms of a field component as a sorted tuple of (monomial exponents,
+        (numerator, denominator)) pairs, so that equal polynomials have equal canonical terms
+        however they were built or printed. Non-polynomial expressions fall back to their srepr.
+        """
+        scalars = self._C.base_scalars()[:self._dimension]
+        if not S(expr).is_polynomial(*scalars):
+            return (srepr(expr),)
+
+        poly = Poly(expr, *scalars)
+        return tuple(sorted((monom, (int(coeff.p), int(coeff.q))) for monom, coeff in poly.terms()))
+
+    @abstractmethod
+    def canonical_form(self) -> tuple:
+        pass
+
     def __repr__(self):
         return f"{self._name} = {self._field}"
 
@@ -114,9 +149,11 @@ class ScalarField(Regenerating, Field):
             self,
             name: str = "phi",
             dimension: int = 2,
-            manual_field_expr: Expr = None
+            manual_field_expr: Expr = None,
+            sampler: AdaptiveSampler | None = None,
+            bucket: str = ""
     ):
-        super().__init__(name, dimension)
+        super().__init__(name, dimension, sampler, bucket)
 
         self._name_latex = latex(Symbol(name))
         self._dimension = dimension
@@ -126,6 +163,9 @@ class ScalarField(Regenerating, Field):
         self._regenerate()
 
     def _regenerate(self):
+        self._canonical_form: tuple | None = None
+        self._polynomial: Polynomial | None = None
+
         if self._manual_field_expr:
             coord_scalars = ["x", "y", "z"]
             invalid_symbols = []
@@ -148,7 +188,58 @@ class ScalarField(Regenerating, Field):
         printer: CleanVectorLatexPrinter = CleanVectorLatexPrinter()
         self._field_latex: str = printer.scalar_field_print(self)
 
+    def canonical_form(self) -> tuple:
+        if self._canonical_form is None:
+            self._canonical_form = self._canonical_terms(self._field)
+        return self._canonical_form
+
+    def polynomial(self) -> Polynomial | None:
+        """
+        Returns the field as an exact polynomial in the coordinate scalars, or None if it isn't a
+        polynomial with rational coefficients. It is compiled once per field and cached.
+        """
+        if self._polynomial is None:
+            try:
+                self._polynomial = Polynomial.from_expr(self._field, self._C.base_scalars()[:self._dimension])
+            except ValueError:
+                return None
+        return self._polynomial
+
+    @memoized_integral
+    def calculate_line_integral(self, curve: Curve):
+        """
+        Calculates the line integral of the field with respect to arc length along the curve.
+
+        Along Pythagorean-hodograph curves the speed is a polynomial, so for polynomial fields the
+        integrand phi(r(t))|r'(t)| is a polynomial in t and is integrated exactly. Anything else
+        falls back to sympy.
+        """
+        polynomial = self.polynomial()
+        speed = curve.speed_polynomial
+        curve_polys = curve.component_polynomials()
+        if (polynomial is not None and speed is not None and curve_polys is not None
+                and len(curve_polys) == self._dimension and all(S(limit).is_Rational for limit in curve.limits)):
+            integrand = polynomial.compose(curve_polys)*speed
+            value: Fraction = integrand.definite_integral(
+                *(Fraction(int(S(limit).p), int(S(limit).q)) for limit in curve.limits)
+            )
+            return Rational(value.numerator, value.denominator)
+
+        return vector_integrate(self._field, curve.region)
+
+    @memoized_integral
     def line_integral_via_fund_thm(self, curve: Curve):
+        """
+        Calculates the line integral of the gradient of the field along the curve as the
+        difference of the field's values at the end points. Polynomial fields along polynomial
+        curves are evaluated exactly with Horner's scheme, anything else falls back to sympy.
+        """
+        polynomial = self.polynomial()
+        endpoints = curve.endpoints()
+        if polynomial is not None and endpoints is not None and len(endpoints[0]) == self._dimension:
+            value: Fraction = polynomial.evaluate(endpoints[1]) - polynomial.evaluate(endpoints[0])
+            return Rational(value.numerator, value.denominator)
+
         region: ParametricRegion = curve.region
 
         start_point = region.definition.subs(curve.parameter, curve.limits[0])
@@ -171,20 +262,37 @@ class VectorField(Regenerating, Field):
             name: str = "F",
             dimension: int = 2,
             component_coeffs: list[list[list[int]]] = None,
-            gen_by_sum: bool = None
+            gen_by_sum: bool = None,
+            manual_components: tuple[Expr] = None,
+            sampler: AdaptiveSampler | None = None,
+            bucket: str = ""
     ):
-        super().__init__(name, dimension)
+        super().__init__(name, dimension, sampler, bucket)
 
         self._name_latex = rf"\mathbf{{{latex(Symbol(name))}}}"
         self._dimension = dimension
 
         self._manual_coeffs = component_coeffs
         self._gen_by_sum = gen_by_sum
+        self._manual_components = manual_components
 
         self._regenerate()
 
     def _regenerate(self):
-        if self._manual_coeffs:
+        self._canonical_form: tuple | None = None
+
+        if self._manual_components:
+            if len(self._manual_components) != self._dimension:
+                msg = (f"{len(self._manual_components)} components were given for a "
+                       f"{self._dimension} dimensional vector field.")
+                raise ValueError(msg)
+
+            self._components: list[Expr] = [
+                factor_terms(scalar_expr_from_expr(S(comp), self._C), sign = True)
+                for comp in self._manual_components
+            ]
+
+        elif self._manual_coeffs:
             self._components: list[Expr] = [
                 factor_terms(self._generate_component_from_coeffs(self._manual_coeffs[i][0],
                                                                   self._manual_coeffs[i][1],
@@ -211,3 +319,20 @@ class VectorField(Regenerating, Field):
 
         printer: CleanVectorLatexPrinter = CleanVectorLatexPrinter()
         self._field_latex: str = printer.vector_field_print(self)
+
+    def canonical_form(self) -> tuple:
+        if self._canonical_form is None:
+            self._canonical_form = tuple(self._canonical_terms(comp) for comp in self._components)
+        return self._canonical_form
+
+    def component_polynomials(self) -> tuple[Polynomial]:
+        """
+        Returns the components as exact polynomials in the coordinate scalars.
+
+        Raises
+        ======
+        ValueError
+            If a component isn't a polynomial with rational coefficients.
+        """
+        scalars = self._C.base_scalars()[:self._dimension]
+        return tuple(Polynomial.from_expr(comp, scalars) for comp in self._components)
@@ -0,0 +1,78 @@
+"""
+Exact integrals of polynomials over polygons with integer vertices.
+
+A triangle with vertices v0, v1, v2 is split using barycentric coordinates l0, l1, l2, so that
+x = l0*x0 + l1*x1 + l2*x2 (and similarly for y). Expanding x^a y^b with the binomial theorem in
+each coordinate reduces the integral to integrals of monomials in the barycentric coordinates,
+which have the closed form
+
+        integral over T of l0^i l1^j l2^k dA = 2*area(T)*i!*j!*k!/(i + j + k + 2)!
+
+A polygon is fanned into triangles from its first vertex. Using the signed area in place of the
+area makes each triangle's contribution follow the orientation of the vertex list, so the
+triangles sum to the integral over the polygon however it is oriented, with the sign of the
+orientation. By Green's theorem, the circulation of a field (P, Q) around the polygon is then the
+integral of dQ/dx - dP/dy computed in this way.
+"""
+from fractions import Fraction
+from math import comb, factorial
+from problem_sheet_generator.core.mathematics.polynomial import Polynomial
+
+def _linear_form_powers(coords: tuple[int], power: int) -> dict[tuple[int], int]:
+    """
+    Expands (l0*c0 + l1*c1 + l2*c2)^power into a dictionary from barycentric exponents (i, j, k)
+    to integer coefficients.
+    """
+    expansion: dict[tuple[int], int] = {}
+    for i in range(power + 1):
+        for j in range(power - i + 1):
+            k = power - i - j
+            multinomial = comb(power, i)*comb(power - i, j)
+            expansion[(i, j, k)] = multinomial*coords[0]**i*coords[1]**j*coords[2]**k
+    return expansion
+
+def triangle_moment(a: int, b: int, vertices: tuple[tuple[int]]) -> Fraction:
+    """
+    Returns the integral of x^a y^b over the triangle with the given vertices, signed by the
+    orientation of the vertices (positive when they are anticlockwise).
+    """
+    (x0, y0), (x1, y1), (x2, y2) = vertices
+    twice_signed_area = (x1 - x0)*(y2 - y0) - (x2 - x0)*(y1 - y0)
+    if twice_signed_area == 0:
+        return Fraction(0)
+
+    x_powers = _linear_form_powers((x0, x1, x2), a)
+    y_powers = _linear_form_powers((y0, y1, y2), b)
+
+    degree = a + b
+    total = 0
+    for (i1, j1, k1), x_coeff in x_powers.items():
+        for (i2, j2, k2), y_coeff in y_powers.items():
+            total += (x_coeff*y_coeff*factorial(i1 + i2)*factorial(j1 + j2)*factorial(k1 + k2))
+
+    return Fraction(twice_signed_area*total, factorial(degree + 2))
+
+def polygon_integral(integrand: Polynomial, vertices: tuple[tuple[int]]) -> Fraction:
+    """
+    Returns the integral of a polynomial in (x, y) over the polygon with the given vertices,
+    signed by their orientation.
+    """
+    if integrand.num_vars != 2:
+        msg = f"Polygon integrals need a polynomial in 2 variables, not {integrand.num_vars}."
+        raise ValueError(msg)
+
+    total = Fraction(0)
+    for i in range(1, len(vertices) - 1):
+        triangle = (vertices[0], vertices[i], vertices[i + 1])
+        for (a, b), coeff in integrand.terms.items():
+            total += coeff*triangle_moment(a, b, triangle)
+    return total
+
+def polygon_circulation(components: tuple[Polynomial], vertices: tuple[tuple[int]]) -> Fraction:
+    """
+    Returns the circulation of the planar field with polynomial components (P, Q) around the
+    polygon, traversed in the order of its vertices, using Green's theorem.
+    """
+    P, Q = components
+    curl = Q.derivative(0) - P.derivative(1)
+    return polygon_integral(curl, vertices)
@@ -0,0 +1,243 @@
+from __future__ import annotations
+from fractions import Fraction
+from sympy import Expr, Mul, Poly, Rational, S, Symbol
+
+
+class Polynomial():
+    """
+    Exact multivariate polynomial with rational coefficients.
+
+    The polynomial is stored as a dictionary mapping exponent tuples to Fraction coefficients, with
+    one entry in each exponent tuple per variable. It exists so that the integrals and evaluations
+    that question generation needs for polynomial fields and curves can be done with plain integer
+    arithmetic rather than through sympy.
+
+    Parameters
+    ==========
+    terms: dict[tuple[int], int | Fraction]
+        Mapping from exponent tuples to coefficients. Zero coefficients are dropped.
+
+    num_vars: int
+        The number of variables. Every exponent tuple should have this length.
+    """
+
+    def __init__(self, terms: dict[tuple[int], int | Fraction], num_vars: int):
+        for exponents in terms:
+            if len(exponents) != num_vars:
+                msg = (f"Exponents {exponents} don't match the number of variables of the "
+                       f"polynomial ({num_vars}).")
+                raise ValueError(msg)
+
+        self._terms: dict[tuple[int], Fraction] = {
+            exponents: Fraction(coeff) for exponents, coeff in terms.items() if coeff != 0
+        }
+        self._num_vars = num_vars
+        self._horner: list | Fraction | None = None
+
+    @classmethod
+    def from_expr(cls, expr: Expr, gens: tuple[Symbol]) -> Polynomial:
+        """
+        Converts a sympy expression that is polynomial in gens with rational coefficients.
+
+        Raises
+        ======
+        ValueError
+            If the expression isn't a polynomial in gens or has irrational coefficients.
+        """
+        expr = S(expr)
+        if not expr.is_polynomial(*gens):
+            msg = f"{expr} is not a polynomial in {gens}."
+            raise ValueError(msg)
+
+        terms: dict[tuple[int], Fraction] = {}
+        for exponents, coeff in Poly(expr, *gens).terms():
+            if not coeff.is_Rational:
+                msg = f"{expr} has the non-rational coefficient {coeff}."
+                raise ValueError(msg)
+            terms[exponents] = Fraction(int(coeff.p), int(coeff.q))
+
+        return cls(terms, len(gens))
+
+    def to_expr(self, gens: tuple[Symbol]) -> Expr:
+        """
+        Converts the polynomial back into a sympy expression in gens.
+        """
+        return sum(
+            (Rational(coeff.numerator, coeff.denominator)*Mul(*(gen**power for gen, power in zip(gens, exponents)))
+             for exponents, coeff in self._terms.items()),
+            S.Zero
+        )
+
+    @property
+    def terms(self) -> dict[tuple[int], Fraction]:
+        return self._terms
+
+    @property
+    def num_vars(self) -> int:
+        return self._num_vars
+
+    @property
+    def degree(self) -> int:
+        """
+        The total degree of the polynomial. The zero polynomial has degree -1.
+        """
+        return max((sum(exponents) for exponents in self._terms), default = -1)
+
+    def is_zero(self) -> bool:
+        return not self._terms
+
+    def derivative(self, var: int) -> Polynomial:
+        """
+        Returns the partial derivative with respect to the variable at index var.
+        """
+        terms: dict[tuple[int], Fraction] = {}
+        for exponents, coeff in self._terms.items():
+            if exponents[var] == 0:
+                continue
+            new_exponents = exponents[:var] + (exponents[var] - 1,) + exponents[var + 1:]
+            terms[new_exponents] = coeff*exponents[var]
+        return Polynomial(terms, self._num_vars)
+
+    def _compile(self, terms: dict[tuple[int], Fraction], var: int) -> list | Fraction:
+        """
+        Nests the terms into Horner form in the variables from index var onwards. The result is
+        a list of coefficients from the highest power of the variable down to the constant term,
+        where each coefficient is itself in Horner form in the remaining variables.
+        """
+        if var == self._num_vars:
+            return sum(terms.values(), Fraction(0))
+
+        grouped: dict[int, dict[tuple[int], Fraction]] = {}
+        for exponents, coeff in terms.items():
+            grouped.setdefault(exponents[var], {})[exponents] = coeff
+
+        degree = max(grouped, default = 0)
+        return [self._compile(grouped[power], var + 1) if power in grouped else None
+                for power in range(degree, -1, -1)]
+
+    def _evaluate_compiled(self, node: list | Fraction | None, point: tuple, var: int) -> Fraction:
+        if node is None:
+            return Fraction(0)
+        if var == self._num_vars:
+            return node
+
+        value = Fraction(0)
+        for coeff in node:
+            value = value*point[var] + self._evaluate_compiled(coeff, point, var + 1)
+        return value
+
+    def evaluate(self, point: tuple[int | Fraction]) -> Fraction:
+        """
+        Evaluates the polynomial exactly at a point with integer or Fraction coordinates, using
+        Horner's scheme in each variable. The Horner form is compiled on the first call and
+        reused afterwards.
+        """
+        if len(point) != self._num_vars:
+            msg = (f"The point {point} doesn't match the number of variables of the polynomial "
+                   f"({self._num_vars}).")
+            raise ValueError(msg)
+
+        if self._horner is None:
+            self._horner = self._compile(self._terms, 0)
+        return self._evaluate_compiled(self._horner, tuple(Fraction(coord) for coord in point), 0)
+
+    def compose(self, substitutions: tuple[Polynomial]) -> Polynomial:
+        """
+        Substitutes a polynomial for each variable, for example a curve's components into a
+        field, and returns the result as a polynomial in the variables of the substitutions.
+        """
+        if len(substitutions) != self._num_vars:
+            msg = (f"{len(substitutions)} substitutions were given for a polynomial in "
+                   f"{self._num_vars} variables.")
+            raise ValueError(msg)
+
+        num_vars = substitutions[0].num_vars
+        one = Polynomial({(0,)*num_vars: 1}, num_vars)
+        powers: dict[tuple[int], Polynomial] = {}
+
+        result = Polynomial({}, num_vars)
+        for exponents, coeff in self._terms.items():
+            term = one*coeff
+            for var, power in enumerate(exponents):
+                if power == 0:
+                    continue
+                if (var, power) not in powers:
+                    powers[(var, power)] = self._power(substitutions[var], power, one)
+                term = term*powers[(var, power)]
+            result = result + term
+        return result
+
+    @staticmethod
+    def _power(base: Polynomial, power: int, one: Polynomial) -> Polynomial:
+        result = one
+        for _ in range(power):
+            result = result*base
+        return result
+
+    def definite_integral(self, lower: int | Fraction, upper: int | Fraction) -> Fraction:
+        """
+        Returns the exact integral of a univariate polynomial between the limits.
+        """
+        if self._num_vars != 1:
+            msg = f"Definite integrals need a polynomial in 1 variable, not {self._num_vars}."
+            raise ValueError(msg)
+
+        lower, upper = Fraction(lower), Fraction(upper)
+        return sum(
+            (coeff*(upper**(power + 1) - lower**(power + 1))/(power + 1)
+             for (power,), coeff in self._terms.items()),
+            Fraction(0)
+        )
+
+    def integral(self, var: int) -> Polynomial:
+        """
+        Returns the antiderivative with respect to the variable at index var, with no constant
+        term.
+        """
+        terms: dict[tuple[int], Fraction] = {}
+        for exponents, coeff in self._terms.items():
+            new_exponents = exponents[:var] + (exponents[var] + 1,) + exponents[var + 1:]
+            terms[new_exponents] = coeff/(exponents[var] + 1)
+        return Polynomial(terms, self._num_vars)
+
+    def _check_compatible(self, other: Polynomial) -> None:
+        if self._num_vars != other.num_vars:
+            msg = (f"Polynomials in {self._num_vars} and {other.num_vars} variables can't be "
+                   "combined.")
+            raise ValueError(msg)
+
+    def __add__(self, other: Polynomial) -> Polynomial:
+        self._check_compatible(other)
+        terms = dict(self._terms)
+        for exponents, coeff in other.terms.items():
+            terms[exponents] = terms.get(exponents, 0) + coeff
+        return Polynomial(terms, self._num_vars)
+
+    def __neg__(self) -> Polynomial:
+        return Polynomial({exponents: -coeff for exponents, coeff in self._terms.items()}, self._num_vars)
+
+    def __sub__(self, other: Polynomial) -> Polynomial:
+        return self + (-other)
+
+    def __mul__(self, other: Polynomial | int | Fraction) -> Polynomial:
+        if not isinstance(other, Polynomial):
+            return Polynomial({exponents: coeff*other for exponents, coeff in self._terms.items()},
+                              self._num_vars)
+
+        self._check_compatible(other)
+        terms: dict[tuple[int], Fraction] = {}
+        for exponents_a, coeff_a in self._terms.items():
+            for exponents_b, coeff_b in other.terms.items():
+                exponents = tuple(a + b for a, b in zip(exponents_a, exponents_b))
+                terms[exponents] = terms.get(exponents, 0) + coeff_a*coeff_b
+        return Polynomial(terms, self._num_vars)
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Polynomial):
+            return NotImplemented
+        return self._num_vars == other.num_vars and self._terms == other.terms
+
+    def __repr__(self):
+        return f"Polynomial({self._terms}, {self._num_vars})"
@@ -0,0 +1,109 @@
+from __future__ import annotations
+from html import escape
+from re import compile as compile_regex
+from problem_sheet_generator.core.question_worker import QuestionRecord
+
+# Matches $$...$$ display math and $...$ inline math, ignoring escaped dollars.
+MATH = compile_regex(r"(?<!\\)\$\$(?P<display>.+?)(?<!\\)\$\$|(?<!\\)\$(?P<inline>.+?)(?<!\\)\$")
+
+MATH_SCRIPTS: dict[str, str] = {
+    "mathjax": '<script defer src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-chtml.js"></script>',
+    "katex": (
+        '<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/katex@0.16/dist/katex.min.css">\n'
+        '<script defer src="https://cdn.jsdelivr.net/npm/katex@0.16/dist/katex.min.js"></script>\n'
+        '<script defer src="https://cdn.jsdelivr.net/npm/katex@0.16/dist/contrib/auto-render.min.js" '
+        'onload="renderMathInElement(document.body)"></script>'
+    )
+}
+
+
+class PreviewSheet():
+    """
+    Renders a sheet to HTML or Markdown from question records without running TeX, for quick
+    previews before the PDF is compiled.
+
+    Math is left as LaTeX for MathJax or KaTeX to typeset in the browser. In HTML the $...$ and
+    $$...$$ delimiters are rewritten as \\(...\\) and \\[...\\], which both libraries recognise by
+    default. Markdown keeps the dollar delimiters, as most Markdown renderers expect.
+
+    Parameters
+    ==========
+    title: str, optional
+        The title of the sheet.
+
+    author: str, optional
+        The author shown under the title.
+
+    date: str, optional
+        The date shown under the title.
+
+    math_renderer: str, optional
+        The library linked in HTML output, "mathjax" or "katex".
+    """
+
+    def __init__(self, title: str = "", author: str = "", date: str = "", math_renderer: str = "mathjax"):
+        if math_renderer not in MATH_SCRIPTS:
+            msg = (f"{math_renderer} is not a supported math renderer. The math renderer should be one "
+                   f"of {list(MATH_SCRIPTS)}.")
+            raise ValueError(msg)
+
+        self._title = title
+        self._author = author
+        self._date = date
+        self._math_renderer = math_renderer
+
+    @staticmethod
+    def _html_text(latex: str) -> str:
+        """
+        Escapes the text of a question for HTML and rewrites its math delimiters. The math itself
+        is only HTML escaped, so the browser passes the original LaTeX to the renderer.
+        """
+        parts: list[str] = []
+        end = 0
+        for match in MATH.finditer(latex):
+            parts.append(escape(latex[end:match.start()].replace(r"\$", "$")))
+            if match.group("display") is not None:
+                parts.append(rf"\[{escape(match.group('display'))}\]")
+            else:
+                parts.append(rf"\({escape(match.group('inline'))}\)")
+            end = match.end()
+        parts.append(escape(latex[end:].replace(r"\$", "$")))
+        return "".join(parts)
+
+    def html(self, records: list[QuestionRecord], answers: bool = False) -> str:
+        """
+        Returns a standalone HTML page listing the questions, or their answers if answers is True.
+        """
+        lines = [
+            "<!DOCTYPE html>",
+            "<html>",
+            "<head>",
+            '<meta charset="utf-8">',
+            f"<title>{escape(self._title)}</title>",
+            MATH_SCRIPTS[self._math_renderer],
+            "</head>",
+            "<body>",
+            f"<h1>{escape(self._title)}</h1>"
+        ]
+        byline = " &middot; ".join(escape(text) for text in (self._author, self._date) if text)
+        if byline:
+            lines.append(f"<p>{byline}</p>")
+
+        lines.append("<ol>")
+        lines += [f"  <li>{self._html_text(record.answer if answers else record.question)}</li>" for record in records]
+        lines += ["</ol>", "</body>", "</html>"]
+        return "\n".join(lines) + "\n"
+
+    def markdown(self, records: list[QuestionRecord], answers: bool = False) -> str:
+        """
+        Returns the questions, or their answers if answers is True, as a Markdown numbered list.
+        """
+        lines = [f"# {self._title}", ""]
+        byline = " · ".join(text for text in (self._author, self._date) if text)
+        if byline:
+            lines += [byline, ""]
+        lines += [
+            f"{number}. {record.answer if answers else record.question}"
+            for number, record in enumerate(records, start = 1)
+        ]
+        return "\n".join(lines) + "\n"
@@ -1,4 +1,4 @@
-from .question import Question
+from .question import Question, QuestionGenerationError
 from .question_registry import (KEYWORD_REGISTRY, QUESTION_REGISTRY, TOPIC_REGISTRY, TOPIC_DISPLAY_REGISTRY,
                                 register_question, register_type, create_question)
 from .multivariable_calculus_question import MultivariableCalculusQuestion
\ No newline at end of file
@@ -1,9 +1,23 @@
 from abc import ABC
-from sympy import Expr, latex
+from fractions import Fraction
+from logging import info
+from random import choice, random
+from sympy import Expr, Rational, latex
+from sympy.abc import x, y, z
 from pylatex.utils import NoEscape
-from problem_sheet_generator.core.question import Question, register_question, register_type
+from typing import Callable
+from problem_sheet_generator.core.question import Question, QuestionGenerationError, register_question, register_type
 from problem_sheet_generator.core.mathematics.multivariable_calculus import ScalarField, VectorField, Field
 from problem_sheet_generator.core.mathematics.geometry import Curve
+from problem_sheet_generator.core.adaptive_sampling import AdaptiveSampler
+from problem_sheet_generator.core.mathematics.polygon_integrals import polygon_circulation
+from problem_sheet_generator.core.mathematics.polynomial import Polynomial
+from problem_sheet_generator.core.mathematics.inverse_generation import (ANSWER_BOUNDS, circulation_basis,
+                                                                       components_from_solution, line_integral_basis,
+                                                                       random_target, reachable_magnitude,
+                                                                       solve_small_combination)
+from problem_sheet_generator.core.mathematics.answer_prediction import (answer_likely_awkward,
+                                                                      estimate_vector_line_integral)
 from problem_sheet_generator.utilities import awkward_number
 
 @register_type()
@@ -11,6 +25,10 @@ class MultivariableCalculusQuestion(Question, ABC):
 
     name: tuple[str] = ("multivariable_calc", "Multivariable calculus")
 
+    # In inverse mode, the number of target answers tried for each curve before a new curve is
+    # generated.
+    TARGETS_PER_CURVE: int = 10
+
     def __init__(
             self, topic: str,
             subtopic: str,
@@ -18,6 +36,57 @@ class MultivariableCalculusQuestion(Question, ABC):
     ):
         super().__init__(topic, subtopic, **kwargs)
 
+    def _inverse_answer_bounds(self, answer_bounds: tuple[int, int] | None) -> tuple[int, int]:
+        if answer_bounds is not None:
+            return answer_bounds
+
+        if self._difficulty not in ANSWER_BOUNDS:
+            msg = (f"{self._difficulty} is not a valid difficulty. The difficulty should be one of "
+                   f"{list(ANSWER_BOUNDS)}.")
+            raise ValueError(msg)
+        return ANSWER_BOUNDS[self._difficulty]
+
+    def _generate_inverse_field(
+            self,
+            curve: Curve,
+            basis_func: Callable[[Curve], list],
+            dimension: int,
+            answer_bounds: tuple[int, int],
+            max_attempts: int,
+            sampler: AdaptiveSampler | None = None
+    ) -> tuple[list[Polynomial], Fraction]:
+        """
+        Picks a target answer within the bounds and solves for small integer field coefficients
+        that give it along the curve (see inverse_generation). A new curve is generated after
+        every TARGETS_PER_CURVE targets without a solution. The curve's draws are reported to the
+        sampler, if there is one, as rejected when the curve is replaced and accepted when it is
+        used.
+
+        Returns the field components as polynomials in the coordinates, and the answer.
+        """
+        for attempt in range(max_attempts):
+            if attempt % self.TARGETS_PER_CURVE == 0:
+                if attempt > 0:
+                    if sampler is not None:
+                        sampler.reject()
+                    curve.regenerate()
+                basis = basis_func(curve)
+                values = [value for _, value in basis]
+                magnitude = reachable_magnitude(values)
+
+            target = random_target(answer_bounds, magnitude)
+            solution = solve_small_combination(values, target)
+            if solution is not None:
+                if sampler is not None:
+                    sampler.accept()
+                return components_from_solution(basis, solution, dimension), target
+
+        if sampler is not None:
+            sampler.reject()
+        msg = (f"Couldn't construct a {self._subtopic} question with an answer within "
+               f"{answer_bounds} in {max_attempts} attempts.")
+        raise QuestionGenerationError(msg)
+
 @register_question()
 class IntegralTheoremsQuestion(MultivariableCalculusQuestion):
 
@@ -27,22 +96,88 @@ class IntegralTheoremsQuestion(MultivariableCalculusQuestion):
         "greens_theorem": "Green's theorem"
     }
 
-    def __init__(self, subtopic, dimension = 3, **kwargs):
+    def __init__(
+            self, subtopic, dimension = 3, verify = False, sampler: AdaptiveSampler | None = None,
+            inverse = False, answer_bounds: tuple[int, int] | None = None, max_attempts = 500, **kwargs
+    ):
         super().__init__(self.topic[0], subtopic, **kwargs)
 
         self._dimension = 2 if subtopic == 'greens_theorem' else dimension
 
-        field: VectorField = VectorField("F", self._dimension)
-
-        region: Curve = Curve(force_closed = subtopic == "greens_theorem")
-
-        answer = field.calculate_line_integral(region)
-
+        bucket = f"{self._topic}/{subtopic}/{self._dimension}"
+        region: Curve = Curve(force_closed = subtopic == "greens_theorem", sampler = sampler, bucket = bucket)
+
+        if inverse:
+            components, target = self._generate_inverse_field(
+                region,
+                lambda curve: circulation_basis(curve.vertices),
+                self._dimension,
+                self._inverse_answer_bounds(answer_bounds),
+                max_attempts,
+                sampler
+            )
+            field: VectorField = VectorField(
+                "F", self._dimension, manual_components = self._add_curl_free_terms(components)
+            )
+            answer = Rational(target.numerator, target.denominator)
+            if verify and self._calculate_circulation(field, region, verify) != answer:
+                msg = f"The field {field} was constructed for the answer {answer} but doesn't give it."
+                raise RuntimeError(msg)
+
+        else:
+            field: VectorField = VectorField("F", self._dimension, sampler = sampler, bucket = bucket)
+            answer = self._calculate_circulation(field, region, verify)
+            if sampler is not None:
+                sampler.accept()
+
+        self._canonical_form: tuple = (self._topic, self._subtopic, field.canonical_form(), region.canonical_form())
         self._answer: str = self._generate_answer_latex(answer)
         self._question: str = self._generate_question_latex(field, region)
 
+    @staticmethod
+    def _add_curl_free_terms(components: list[Polynomial]) -> tuple[Expr]:
+        """
+        Returns the components as expressions in x and y, sometimes with a power of x added to
+        the first component or a power of y added to the second. These terms have no curl, so they
+        vary the look of inversely constructed fields without changing the answer.
+        """
+        P, Q = components
+        if random() < 0.5:
+            P = P + Polynomial({(choice((1, 2)), 0): choice((-3, -2, -1, 1, 2, 3))}, 2)
+        if random() < 0.5:
+            Q = Q + Polynomial({(0, choice((1, 2))): choice((-3, -2, -1, 1, 2, 3))}, 2)
+        return (P.to_expr((x, y)), Q.to_expr((x, y)))
+
+    @staticmethod
+    def _calculate_circulation(field: VectorField, curve: Curve, verify: bool = False) -> Expr:
+        """
+        Calculates the circulation of a polynomial field around a polygon exactly with Green's
+        theorem, falling back to sympy's line integral for fields that aren't polynomial. If
+        verify is True then the exact answer is checked against sympy.
+        """
+        if curve.vertices is None:
+            return field.calculate_line_integral(curve)
+
+        try:
+            components = field.component_polynomials()
+        except ValueError:
+            return field.calculate_line_integral(curve)
+
+        circulation = polygon_circulation(components, curve.vertices)
+        answer = Rational(circulation.numerator, circulation.denominator)
+
+        if verify:
+            expected = field.calculate_line_integral(curve)
+            if answer != expected:
+                msg = (f"Green's theorem gave {answer} for {field} around {curve}, but the line "
+                       f"integral is {expected}.")
+                raise RuntimeError(msg)
+            info(f"Green's theorem answer {answer} verified.")
+
+        return answer
+
     def _generate_question_latex(self, field: Field, curve: Curve):
-        vertices = curve.region.args
+        vertices = curve.vertices
         setup_latex = (f"Let ${field.name_latex}$ be the vector field {field.field_latex} and "
                        f"$C$ the positively oriented triangle with vertices at ${tuple(vertices[0])}, "
                        f"{tuple(vertices[1])}$ and ${tuple(vertices[2])}$. ")
@@ -71,7 +206,11 @@ class LineIntegralQuestion(MultivariableCalculusQuestion):
         "fundamental_theorem": "Fundamental theorem of line integrals"
     }
 
-    def __init__(self, subtopic, dimension = 3, curve_is_parametric = True, curve_is_implicit = False, **kwargs):
+    def __init__(
+            self, subtopic, dimension = 3, curve_is_parametric = True, curve_is_implicit = False,
+            max_attempts = 500, sampler: AdaptiveSampler | None = None, inverse = False,
+            answer_bounds: tuple[int, int] | None = None, curve_is_pythagorean_hodograph = True, **kwargs
+    ):
         super().__init__(self.topic[0], subtopic, **kwargs)
 
         self._dimension = dimension
@@ -81,28 +220,97 @@ class LineIntegralQuestion(MultivariableCalculusQuestion):
                 "line_integral question topic")
             raise ValueError(msg)
 
-        field: VectorField | ScalarField = (
-                VectorField("F", dimension) if subtopic == "vector_field"
-                else ScalarField("phi", dimension)
-        )
+        if inverse and subtopic != "vector_field":
+            msg = ("Inverse generation is only supported for the vector_field subtopic of the "
+                   "line_integral question topic.")
+            raise ValueError(msg)
 
+        bucket = f"{self._topic}/{subtopic}/{dimension}"
         linear_components: bool = subtopic == "scalar_field"
-        curve: Curve = Curve(ambient_dim = dimension, linear_components = linear_components)
-
-        answer_func = field.calculate_line_integral if subtopic != "fundamental_theorem" else field.line_integral_via_fund_thm
-        answer: Expr = answer_func(curve)
+        # Arc-length integrals along Pythagorean-hodograph curves have polynomial integrands, so
+        # scalar field answers are exact rationals rather than surds.
+        curve: Curve = Curve(
+            ambient_dim = dimension, linear_components = linear_components, sampler = sampler, bucket = bucket,
+            pythagorean_hodograph = curve_is_pythagorean_hodograph and subtopic == "scalar_field"
+        )
 
-        answer_is_awkward = awkward_number(answer)
+        if inverse:
+            components, target = self._generate_inverse_field(
+                curve,
+                lambda curve: line_integral_basis(curve.component_polynomials(), curve.limits),
+                dimension,
+                self._inverse_answer_bounds(answer_bounds),
+                max_attempts,
+                sampler
+            )
+            field: VectorField = VectorField(
+                "F", dimension, manual_components = tuple(comp.to_expr((x, y, z)[:dimension]) for comp in components)
+            )
+            answer: Expr = Rational(target.numerator, target.denominator)
+
+        else:
+            field: VectorField | ScalarField = (
+                    VectorField("F", dimension, sampler = sampler, bucket = bucket) if subtopic == "vector_field"
+                    else ScalarField("phi", dimension, sampler = sampler, bucket = bucket)
+            )
+
+            answer_func = field.calculate_line_integral if subtopic != "fundamental_theorem" else field.line_integral_via_fund_thm
+            answer: Expr = self._find_non_awkward_answer(field, curve, answer_func, max_attempts, sampler)
+
+        self._canonical_form: tuple = (self._topic, self._subtopic, field.canonical_form(), curve.canonical_form())
+        self._answer: str = self._generate_answer_latex(answer)
+        self._question: str = self._generate_question_latex(field, curve)
 
-        while answer_is_awkward:
-            field.regenerate()
-            curve.regenerate()
+    def _find_non_awkward_answer(
+            self,
+            field: Field,
+            curve: Curve,
+            answer_func: Callable[[Curve], Expr],
+            max_attempts: int,
+            sampler: AdaptiveSampler | None = None
+    ) -> Expr:
+        """
+        Regenerates the field and curve until the answer isn't awkward. Vector field candidates
+        whose answers are estimated to be far too large are rejected without integrating. Each
+        outcome is reported to the sampler, if there is one, so it can learn which parameters
+        lead to acceptable answers.
+        """
+        for attempt in range(max_attempts):
+            if attempt > 0:
+                field.regenerate()
+                curve.regenerate()
+
+            if self._subtopic == "vector_field" and self._predict_awkward(field, curve):
+                self._integrations_avoided += 1
+                if sampler is not None:
+                    sampler.reject()
+                continue
 
             answer = answer_func(curve)
-            answer_is_awkward = awkward_number(answer)
+            if not awkward_number(answer):
+                if sampler is not None:
+                    sampler.accept()
+                return answer
 
-        self._answer: str = self._generate_answer_latex(answer)
-        self._question: str = self._generate_question_latex(field, curve)
+            if sampler is not None:
+                sampler.reject()
+
+        msg = (f"Couldn't generate a {self._subtopic} question without an awkward answer in "
+               f"{max_attempts} attempts.")
+        raise QuestionGenerationError(msg)
+
+    @staticmethod
+    def _predict_awkward(field: VectorField, curve: Curve) -> bool:
+        curve_polys = curve.component_polynomials()
+        if curve_polys is None:
+            return False
+
+        try:
+            field_polys = field.component_polynomials()
+        except ValueError:
+            return False
+
+        return answer_likely_awkward(estimate_vector_line_integral(field_polys, curve_polys, curve.limits))
 
     def _generate_question_latex(self, field: Field, curve: Curve) -> str:
         setup_latex: str = (f"Let ${field.name_latex}$ be the "
@@ -1,5 +1,13 @@
 import logging
 from abc import ABC, abstractmethod
+from hashlib import blake2b
+
+class QuestionGenerationError(RuntimeError):
+    """
+    Raised when a question can't be generated within its limits, for example when every
+    candidate in the allowed number of attempts had an awkward answer.
+    """
+
 
 # TODO: Populate file with question classes.
 # TODO: Give option for answer to be worked.
@@ -13,6 +21,7 @@ class Question(ABC):
         self._subtopic: str = subtopic
         self._nested: bool = nested
         self._difficulty: str = difficulty
+        self._integrations_avoided: int = 0
 
     @property
     def topic(self) -> str:
@@ -26,6 +35,31 @@ class Question(ABC):
     def question(self) -> str:
         return self._question
 
+    @property
+    def integrations_avoided(self) -> int:
+        """
+        The number of candidates that were rejected without integrating while generating the
+        question.
+        """
+        return self._integrations_avoided
+
+    @property
+    def canonical_form(self) -> tuple:
+        """
+        A hashable description of the mathematical content of the question, built from the
+        objects it was generated from rather than from its LaTeX. Two questions with the same
+        canonical form are the same question, however they are printed.
+        """
+        return self._canonical_form
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        A hex digest of the canonical form. Unlike hash() it is stable between runs, so it can be
+        stored and compared across sessions.
+        """
+        return blake2b(repr(self.canonical_form).encode(), digest_size = 16).hexdigest()
+
     @abstractmethod
     def _generate_question_latex(self, *args, **kwargs):
         pass
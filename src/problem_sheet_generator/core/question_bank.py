@@ -0,0 +1,72 @@
+from __future__ import annotations
+from logging import info, warning
+from os import replace
+from pathlib import Path
+from random import Random
+from problem_sheet_generator.core.question_worker import QuestionRecord, generate_question_record
+from problem_sheet_generator.core.wire_format import WireFormatError, encode_records, iter_record_fields
+
+
+class QuestionBank():
+    """
+    A store of pregenerated questions for each subtopic, used when there isn't time to generate
+    new ones, for example close to a sheet's deadline. Questions are removed from the bank as
+    they are taken so the same sheet doesn't get the same pregenerated question twice.
+
+    Parameters
+    ==========
+    path: str | Path, optional
+        File the bank is loaded from and saved to, in the wire format (see wire_format). If None
+        then the bank only lasts as long as the object.
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self._path: Path | None = Path(path) if path is not None else None
+        self._records: dict[str, list[QuestionRecord]] = {}
+
+        if self._path is not None and self._path.exists():
+            self._load()
+
+    @staticmethod
+    def _key(topic: str, subtopic: str) -> str:
+        return f"{topic}/{subtopic}"
+
+    def count(self, topic: str, subtopic: str) -> int:
+        return len(self._records.get(self._key(topic, subtopic), []))
+
+    def add(self, record: QuestionRecord) -> None:
+        self._records.setdefault(self._key(record.topic, record.subtopic), []).append(record)
+
+    def take(self, topic: str, subtopic: str) -> QuestionRecord | None:
+        """
+        Removes and returns a pregenerated question for the subtopic, or None if there aren't any.
+        """
+        records = self._records.get(self._key(topic, subtopic))
+        return records.pop() if records else None
+
+    def fill(self, topic: str, subtopic: str, count: int, seed: int | None = None) -> None:
+        """
+        Generates questions for the subtopic until the bank holds count of them.
+        """
+        rng = Random(seed)
+        for _ in range(count - self.count(topic, subtopic)):
+            self.add(generate_question_record(topic, subtopic, rng.getrandbits(64)))
+
+    def _load(self) -> None:
+        try:
+            for fields in iter_record_fields(self._path.read_bytes()):
+                self.add(QuestionRecord(**fields))
+        except WireFormatError as e:
+            # Banks written by older versions are regenerated rather than migrated.
+            warning(f"{type(e).__name__}: Couldn't load the question bank {self._path}. {e}")
+            self._records = {}
+            return
+        info(f"Loaded {sum(len(records) for records in self._records.values())} pregenerated questions from {self._path}")
+
+    def save(self) -> None:
+        if self._path is None:
+            return
+
+        temp_path = self._path.with_suffix(self._path.suffix + ".tmp")
+        temp_path.write_bytes(encode_records([record for records in self._records.values() for record in records]))
+        replace(temp_path, self._path)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from sqlite3 import Connection, connect
+from typing import Iterable
+
+
+class QuestionHistory():
+    """
+    Persistent record of the question fingerprints that have been issued to each cohort.
+
+    The history is an append-only SQLite table of (cohort, fingerprint, issued_at) rows with an
+    index on (cohort, fingerprint, issued_at), so a lookup is a single index probe even with
+    hundreds of thousands of entries. Fingerprints are stored as 16 byte blobs rather than hex
+    strings to keep the file compact.
+
+    Parameters
+    ==========
+    path: str | Path, optional
+        Location of the SQLite database. It is created if it doesn't exist. The special value
+        ":memory:" gives a history that only lasts as long as the object.
+
+    expiry_days: int, optional
+        Fingerprints issued more than this many days ago are treated as not issued, so questions
+        can come back after enough time has passed. If None then entries never expire.
+    """
+
+    def __init__(self, path: str | Path = "question_history.sqlite3", expiry_days: int | None = None):
+        if expiry_days is not None and expiry_days <= 0:
+            msg = f"expiry_days should be a positive number of days, not {expiry_days}."
+            raise ValueError(msg)
+        self._expiry_days = expiry_days
+
+        self._connection: Connection = connect(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS issued ("
+            "cohort TEXT NOT NULL, fingerprint BLOB NOT NULL, issued_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS issued_lookup ON issued (cohort, fingerprint, issued_at)"
+        )
+        self._connection.commit()
+
+    @property
+    def expiry_days(self) -> int | None:
+        return self._expiry_days
+
+    def _cutoff(self) -> float:
+        if self._expiry_days is None:
+            return float("-inf")
+        return (datetime.now(timezone.utc) - timedelta(days = self._expiry_days)).timestamp()
+
+    def contains(self, cohort: str, fingerprint: str) -> bool:
+        """
+        Returns True if the fingerprint has been issued to the cohort and hasn't expired.
+        """
+        row = self._connection.execute(
+            "SELECT 1 FROM issued WHERE cohort = ? AND fingerprint = ? AND issued_at >= ? LIMIT 1",
+            (cohort, bytes.fromhex(fingerprint), self._cutoff())
+        ).fetchone()
+        return row is not None
+
+    def record(self, cohort: str, fingerprints: Iterable[str]) -> None:
+        """
+        Appends the fingerprints to the cohort's history with the current time.
+        """
+        issued_at = datetime.now(timezone.utc).timestamp()
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO issued (cohort, fingerprint, issued_at) VALUES (?, ?, ?)",
+                ((cohort, bytes.fromhex(fingerprint), issued_at) for fingerprint in fingerprints)
+            )
+
+    def purge_expired(self) -> int:
+        """
+        Deletes expired entries and returns how many were removed. Expired entries are already
+        ignored by contains(), so this only needs calling to keep the file small.
+        """
+        with self._connection:
+            cursor = self._connection.execute("DELETE FROM issued WHERE issued_at < ?", (self._cutoff(),))
+        return cursor.rowcount
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> QuestionHistory:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,214 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from multiprocessing.connection import Connection
+from random import getstate, seed as seed_random, setstate
+from problem_sheet_generator.core.adaptive_sampling import AdaptiveSampler
+from problem_sheet_generator.core.question import Question, QuestionGenerationError, create_question
+from problem_sheet_generator.core.wire_format import decode_record_fields, encode_record
+
+try:
+    import resource
+except ImportError:
+    # resource is only available on POSIX systems, elsewhere the memory limit isn't enforced.
+    resource = None
+
+
+@dataclass(frozen = True)
+class QuestionRecord():
+    """
+    The parts of a generated question that are needed to build a sheet. Unlike Question objects
+    records only hold strings, integers and tuples of them, so they are cheap to send between
+    processes, and to_bytes gives them a compact binary form (see wire_format).
+    """
+    topic: str
+    subtopic: str
+    question: str
+    answer: str
+    fingerprint: str
+    integrations_avoided: int = 0
+    # The fingerprint is a digest of the canonical form, so it's left out of comparisons.
+    canonical_form: tuple = field(default = (), compare = False, repr = False)
+
+    @classmethod
+    def from_question(cls, topic: str, subtopic: str, question: Question) -> QuestionRecord:
+        return cls(topic, subtopic, question.question, question.answer, question.fingerprint,
+                   question.integrations_avoided, question.canonical_form)
+
+    @classmethod
+    def from_bytes(cls, data: bytes | memoryview) -> QuestionRecord:
+        return cls(**decode_record_fields(data))
+
+    def to_bytes(self) -> bytes:
+        return encode_record(self)
+
+
+class QuestionTimeoutError(QuestionGenerationError):
+    """
+    Raised when a question isn't generated within its time limit.
+    """
+
+
+def generate_question_record(
+        topic: str,
+        subtopic: str,
+        seed: int,
+        sampler: AdaptiveSampler | None = None,
+        **kwargs
+) -> QuestionRecord:
+    """
+    Seeds the random module and creates a question, so the same seed always gives the same
+    question. The random module's state is restored afterwards, so the caller's random numbers
+    don't depend on the questions generated.
+    """
+    if sampler is not None:
+        kwargs["sampler"] = sampler
+
+    state = getstate()
+    seed_random(seed)
+    try:
+        return QuestionRecord.from_question(topic, subtopic, create_question(topic, subtopic, **kwargs))
+    finally:
+        setstate(state)
+
+
+def generate_encoded_record(topic: str, subtopic: str, seed: int, **kwargs) -> bytes:
+    """
+    The same as generate_question_record but returns the record in the wire format, which is
+    quicker to send back from a worker process than a pickled record.
+    """
+    return generate_question_record(topic, subtopic, seed, **kwargs).to_bytes()
+
+
+def _worker_loop(connection: Connection, memory_limit: int | None) -> None:
+    if memory_limit is not None and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+
+        topic, subtopic, seed, sampler, kwargs = job
+        try:
+            record = generate_question_record(topic, subtopic, seed, sampler, **kwargs)
+            connection.send((record.to_bytes(), sampler.stats if sampler is not None else None, None))
+        except Exception as e:
+            connection.send((None, None, e))
+
+
+class QuestionWorker():
+    """
+    Generates questions in a separate process under a wall-clock and memory budget.
+
+    The process is kept between questions so that imports and caches stay warm. If a question
+    runs over the time limit the process is killed, and a new one is started for the next
+    question. Since the worker has its own copy of any sampler it is given, the statistics it
+    learns are copied back into the sampler after each question.
+
+    Parameters
+    ==========
+    time_limit: float, optional
+        The number of seconds a question may take before the worker is killed.
+
+    memory_limit: int, optional
+        The address space limit of the worker process in bytes. It is only enforced on POSIX
+        systems. If None then there is no limit.
+    """
+
+    def __init__(self, time_limit: float = 10.0, memory_limit: int | None = None):
+        if time_limit <= 0:
+            msg = f"time_limit should be a positive number of seconds, not {time_limit}."
+            raise ValueError(msg)
+        self._time_limit = time_limit
+        self._memory_limit = memory_limit
+
+        self._context = get_context()
+        self._process = None
+        self._connection: Connection | None = None
+
+    @property
+    def time_limit(self) -> float:
+        return self._time_limit
+
+    def _start(self) -> None:
+        self._connection, child_connection = self._context.Pipe()
+        self._process = self._context.Process(
+            target = _worker_loop, args = (child_connection, self._memory_limit), daemon = True
+        )
+        self._process.start()
+        child_connection.close()
+
+    def kill(self) -> None:
+        if self._process is None:
+            return
+
+        self._process.kill()
+        self._process.join()
+        self._connection.close()
+        self._process = None
+        self._connection = None
+
+    def close(self) -> None:
+        if self._process is not None and self._process.is_alive():
+            try:
+                self._connection.send(None)
+                self._process.join(1)
+            except (BrokenPipeError, OSError):
+                pass
+        self.kill()
+
+    def generate(
+            self,
+            topic: str,
+            subtopic: str,
+            seed: int,
+            sampler: AdaptiveSampler | None = None,
+            time_limit: float | None = None,
+            **kwargs
+    ) -> QuestionRecord:
+        """
+        Generates a question in the worker process, see generate_question_record. If time_limit
+        is given then it is used instead of the worker's time limit for this question.
+
+        Raises
+        ======
+        QuestionTimeoutError
+            If the question isn't generated within the time limit.
+
+        QuestionGenerationError
+            If the worker process dies, for example by running out of memory.
+        """
+        if self._process is None or not self._process.is_alive():
+            self.kill()
+            self._start()
+
+        time_limit = self._time_limit if time_limit is None else time_limit
+        self._connection.send((topic, subtopic, seed, sampler, kwargs))
+        if not self._connection.poll(time_limit):
+            self.kill()
+            msg = (f"Generating a {subtopic} question with seed {seed} took longer than "
+                   f"{time_limit} seconds.")
+            raise QuestionTimeoutError(msg)
+
+        try:
+            record, sampler_stats, exception = self._connection.recv()
+        except EOFError:
+            self.kill()
+            msg = f"The worker process died while generating a {subtopic} question with seed {seed}."
+            raise QuestionGenerationError(msg)
+
+        if exception is not None:
+            raise exception
+        if sampler is not None:
+            sampler.update_stats(sampler_stats)
+        return QuestionRecord.from_bytes(record)
+
+    def __enter__(self) -> QuestionWorker:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -3,127 +3,554 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from problem_sheet_generator.app.ui import SheetConfig
     from problem_sheet_generator.app.ui import QuestionConfig
-from logging import error, info
-from os import remove
-from os.path import exists
+from dataclasses import dataclass, field
+from datetime import datetime
+from logging import error, info, warning
 from pathlib import Path
-from subprocess import CalledProcessError
-from random import choice
-from pylatex import Document, Enumerate
+from random import Random
+from time import monotonic
+from typing import Callable, Collection
+from uuid import uuid4
+from pylatex import Document, Enumerate, Package
+from problem_sheet_generator.core.artefact_store import ArtefactStore, StoredSheet, sheet_key
+from problem_sheet_generator.core.fragment_cache import FragmentCache
+from problem_sheet_generator.core.compile_service import (CompileJob, CompileResult, CompileService,
+                                                          shared_compile_service)
 from problem_sheet_generator.core.sheet import Sheet
-from problem_sheet_generator.core.question import create_question, TOPIC_REGISTRY, Question
+from problem_sheet_generator.core.question_history import QuestionHistory
+from problem_sheet_generator.core.adaptive_sampling import AdaptiveSampler
+from problem_sheet_generator.core.mathematics.integral_cache import get_integral_cache
+from problem_sheet_generator.utilities import validate_latex
+from problem_sheet_generator.core.question import KEYWORD_REGISTRY, TOPIC_REGISTRY, QuestionGenerationError
+from problem_sheet_generator.core.question_bank import QuestionBank
+from problem_sheet_generator.core.question_worker import (QuestionRecord, QuestionTimeoutError, QuestionWorker,
+                                                          generate_question_record)
+
+
+@dataclass
+class GenerationStats():
+    questions_generated: int = 0
+    duplicates_rejected: int = 0
+    repeats_rejected: int = 0
+    integrations_avoided: int = 0
+    # Timeouts are counted per "topic/subtopic" to show which parts of the parameter space are slow.
+    timeouts: dict[str, int] = field(default_factory = dict)
+    fallbacks_used: int = 0
+    invalid_latex_rejected: int = 0
+
+
+@dataclass
+class GenerationResult():
+    stats: GenerationStats
+    deadline: float | None = None
+    records: list[QuestionRecord] = field(default_factory = list)
+    # Maps the number of each degraded question on the sheet to how it was degraded:
+    # "reduced_retries", "pregenerated", "fallback" or "over_deadline".
+    degraded: dict[int, str] = field(default_factory = dict)
+    compiled: bool = False
+    cleaned: bool = False
+    # True if the sheets were taken from the artefact store rather than built.
+    cached: bool = False
+    output_files: list[Path] = field(default_factory = list)
+    # The files written for each of SheetGenerator.SHEETS that compiled.
+    sheet_files: dict[str, list[Path]] = field(default_factory = dict)
+    generation_time: float = 0.0
+    # The part of generation_time spent validating LaTeX.
+    validation_time: float = 0.0
+    compile_time: float = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return self.generation_time + self.compile_time
+
+    @property
+    def met_deadline(self) -> bool:
+        return self.deadline is None or self.elapsed <= self.deadline
 
 
 # TODO: Include docstrings
-# TODO: Update name of files to delete based on inputted filenames
 class SheetGenerator():
 
+    # Small subtopics can run out of distinct questions, after this many duplicates in a row the
+    # duplicate is accepted rather than looping forever.
+    MAX_DUPLICATE_ATTEMPTS: int = 20
+
+    # Without a deadline, after this many timeouts in a row for one question the fallback is used,
+    # if there is one. With a deadline a question is retried for as long as the budget lasts, and
+    # this many times more past the deadline if there is nothing to fall back on.
+    MAX_TIMEOUTS: int = 3
+
+    MAX_INVALID_LATEX_ATTEMPTS: int = 3
+
+    # Deadline scheduling. The estimated number of seconds needed to compile both sheets is
+    # reserved from the deadline, and the rest is the budget for generating questions.
+    COMPILE_TIME_ESTIMATE: float = 3.0
+    REDUCED_RETRIES_FRACTION: float = 0.5
+    REDUCED_DUPLICATE_ATTEMPTS: int = 3
+    REDUCED_MAX_ATTEMPTS: int = 50
+    MIN_TIME_LIMIT: float = 0.5
+
+    SHEETS: tuple[str] = ("questions", "answers")
+
+    def __init__(
+            self,
+            config: SheetConfig,
+            history: QuestionHistory | None = None,
+            sampler: AdaptiveSampler | None = None,
+            seed: int | None = None,
+            time_limit: float | None = None,
+            memory_limit: int | None = None,
+            fallback: Callable[[str, str], QuestionRecord] | None = None,
+            bank: QuestionBank | None = None,
+            compile_service: CompileService | None = None,
+            store: ArtefactStore | None = None,
+            fragment_cache: FragmentCache | None = None
+    ):
+        self._config: SheetConfig = config
 
-    def __init__(self, config: SheetConfig):
-        self._question_sheet: Sheet = Sheet(
-            title = config.problem_title,
-            file_name = config.problem_filename,
-            author = config.author,
-            date = config.date,
-            margin = (config.margin_left, config.margin_right)
+        self._output_dir: Path = Path(config.output_dir)
+        self._filename_format: str = config.filename_format
+        try:
+            self._output_name("sheet")
+        except (KeyError, IndexError, ValueError) as e:
+            msg = (f"{config.filename_format} is not a valid filename format. It can only use the "
+                   "fields {name}, {date} and {run}.")
+            raise ValueError(msg) from e
+
+        self._seed: int | None = seed
+        self._store: ArtefactStore | None = store
+        # With a fragment cache each question and answer is compiled on its own and the sheets
+        # only include the fragments.
+        self._fragment_cache: FragmentCache | None = fragment_cache
+
+        self._history: QuestionHistory | None = history
+        self._cohort: str = config.cohort
+        self._sampler: AdaptiveSampler | None = sampler
+
+        # Topics left to chance and the seed of every attempt at a question are drawn from this
+        # generator, so a sheet can be reproduced from its seed and a question that timed out is
+        # retried with a fresh seed.
+        self._rng: Random = Random(seed)
+
+        # Without a time limit questions are generated in this process and can't be interrupted.
+        self._worker: QuestionWorker | None = (
+            QuestionWorker(time_limit, memory_limit) if time_limit is not None else None
         )
-        self._answer_sheet: Sheet = Sheet(
-            title = config.answer_title,
-            file_name = config.answer_filename,
-            author = config.author,
-            date = config.date,
-            margin = (config.margin_left, config.margin_right)
+        self._memory_limit = memory_limit
+        self._fallback = fallback
+        self._bank: QuestionBank | None = bank
+        self._deadline_end: float | None = None
+        self._validation_time: float = 0.0
+
+        self._compile_service: CompileService = (
+            compile_service if compile_service is not None else shared_compile_service()
+        )
+
+        self._fingerprints: set[str] = set()
+        self._stats: GenerationStats = GenerationStats()
+
+    @property
+    def stats(self) -> GenerationStats:
+        return self._stats
+
+    def _new_sheets(self) -> tuple[Sheet, Sheet]:
+        config = self._config
+        return tuple(
+            Sheet(title = title, file_name = file_name, author = config.author, date = config.date,
+                  margin = (config.margin_left, config.margin_right))
+            for title, file_name in ((config.problem_title, config.problem_filename),
+                                     (config.answer_title, config.answer_filename))
         )
 
     def _choose_random_topic_and_subtopic(self, question_type: str) -> tuple[str]:
         topics: dict[str, list[str]] = TOPIC_REGISTRY[question_type]
-        topic = choice(list(topics.keys()))
-        return topic, choice(topics[topic])
+        topic = self._rng.choice(list(topics.keys()))
+        return topic, self._rng.choice(topics[topic])
 
-    # TODO: Change the names of the output files to include the creation date.
-    def generate(
+    def resolve_topics(self, question_config: QuestionConfig) -> tuple[str]:
+        topics = [topic for topic in question_config.topics]
+
+        if topics[1] is None:
+            topics[1], topics[2] = self._choose_random_topic_and_subtopic(topics[0])
+
+        elif topics[2] is None:
+            topics[2] = self._rng.choice(TOPIC_REGISTRY[topics[0]][topics[1]])
+
+        else:
+            # When the subtopic comes from the QuestionConfig then it has the topic tacked
+            # to the front to avoid conflicts in the question selection tree, so needs to
+            # be removed.
+            topics[2] = topics[2].replace(f"{topics[1]}_", "")
+
+        return topics[1], topics[2]
+
+    def _generation_time_left(self) -> float | None:
+        """
+        The number of seconds left for generating questions before the time reserved for
+        compiling the sheets, or None if there is no deadline.
+        """
+        if self._deadline_end is None:
+            return None
+        return self._deadline_end - self.COMPILE_TIME_ESTIMATE - monotonic()
+
+    def _choose_strategy(self, generation_budget: float) -> str:
+        """
+        Picks how the next question is generated from the time left before the deadline: normally
+        while more than REDUCED_RETRIES_FRACTION of the generation budget is left, then with fewer
+        retries, then from the question bank once the budget has run out.
+        """
+        time_left = self._generation_time_left()
+        if time_left is None or time_left > self.REDUCED_RETRIES_FRACTION*generation_budget:
+            return "normal"
+        if time_left > 0:
+            return "reduced_retries"
+        return "pregenerated"
+
+    def _attempt_time_limit(self) -> float | None:
+        """
+        The time limit of the next attempt at a question: the worker's own limit, capped by the
+        generation time left if there is a deadline. None means the worker's limit is used.
+        """
+        time_left = self._generation_time_left()
+        if time_left is None or self._worker is None:
+            return None
+        return min(self._worker.time_limit, max(time_left, self.MIN_TIME_LIMIT))
+
+    def _out_of_time(self) -> bool:
+        """
+        True if there is a deadline and too little of the generation budget is left for another
+        attempt at a question.
+        """
+        time_left = self._generation_time_left()
+        return time_left is not None and time_left < self.MIN_TIME_LIMIT
+
+    def _generate_record(self, topic: str, subtopic: str, time_limit: float | None = None, **kwargs) -> QuestionRecord:
+        seed = self._rng.getrandbits(64)
+        if self._worker is None:
+            return generate_question_record(topic, subtopic, seed, self._sampler, **kwargs)
+        return self._worker.generate(topic, subtopic, seed, self._sampler, time_limit, **kwargs)
+
+    def _use_fallback(self, topic: str, subtopic: str) -> QuestionRecord:
+        self._stats.fallbacks_used += 1
+        return self._fallback(topic, subtopic)
+
+    def _create_question(
             self,
-            selected_questions: list[QuestionConfig],
-            generate_tex: bool = True
-    ) -> None:
-        questions_doc = self._question_sheet.document
-
-        answers_list = []
-        with questions_doc.create(Enumerate()) as enum:
-            for selected_q in selected_questions:
-                for _ in range(selected_q.num_questions):
-                    topics = [topic for topic in selected_q.topics]
-
-                    if topics[1] is None:
-                        topics[1], topics[2] = self._choose_random_topic_and_subtopic(topics[0])
-
-                    elif topics[2] is None:
-                        topics[2] = choice(TOPIC_REGISTRY[topics[0]][topics[1]])
-
-                    else:
-                        # When the subtopic comes from the QuestionConfig then it has the topic tacked
-                        # to the front to avoid conflicts in the question selection tree, so needs to
-                        # be removed.
-                        topics[2] = topics[2].replace(f"{topics[1]}_", "")
-
-                    question: Question = create_question(
-                        topics[1],
-                        topics[2]
-                    )
-                    enum.add_item(question.question)
-                    answers_list.append(question.answer)
-                    info(f"Answer: {question.answer}")
-
-        answers_doc = self._answer_sheet.document
-
-        with answers_doc.create(Enumerate()) as enum:
-            for answer in answers_list:
-                enum.add_item(answer)
+            topic: str,
+            subtopic: str,
+            strategy: str = "normal"
+    ) -> tuple[QuestionRecord, str | None]:
+        """
+        Generates a question, retrying with a fresh seed when it times out. Without a deadline it
+        gives up after MAX_TIMEOUTS timeouts in a row. With a deadline every attempt is limited to
+        the generation time left, and it gives up once that runs out (or after one timeout with
+        reduced retries). On giving up a pregenerated question from the bank is used, then the
+        fallback. If there is neither then the timeout is raised, unless there is a deadline, in
+        which case the question is generated "over_deadline": past the deadline, with the worker's
+        own time limit and up to MAX_TIMEOUTS timeouts, so a slow sheet is late rather than lost.
 
-        try:
-            self._generate_output_files(questions_doc, self._question_sheet.file_name, not generate_tex)
-            self._generate_output_files(answers_doc, self._answer_sheet.file_name, not generate_tex)
-        except CalledProcessError as e:
-            msg = (
-                " LaTeX failed to process. This is most likely due to a mistake in the LaTeX syntax,"
-                " the output files can't be overwritten or an issue with your LaTeX installation"
-                " (such as not having Perl installed). See the log file for more details.\n\nAn"
-                " attempt will now be made to delete the output files to prevent issues when"
-                " rerunning the code."
-            )
-            error(f"{type(e).__name__}:{msg}")
-
-            self._delete_files()
-
-        info("Generation complete.")
-
-    @staticmethod
-    def _generate_output_files(document: Document, name: str, clean_tex: bool = False) -> None:
-        if exists("output"):
-            document.generate_pdf(f"output/{name}", clean_tex = clean_tex)
-            return
-
-        path = Path("output")
-        path.mkdir(exist_ok = True)
-        document.generate_pdf(f"output/{name}", clean_tex = clean_tex)
-
-    # TODO: Files to delete need to reference output files name. Currently hardcoded.
-    @staticmethod
-    def _delete_files():
-        files = [
-            "output/questions.fdb_latexmk", "output/questions.pdf", "output/questions.tex",
-            "output/answers.fdb_latexmk", "output/answers.pdf", "output/answers.tex"
-        ]
-        for file in files:
+        Returns the question and the way it was degraded, or None if it wasn't.
+        """
+        if strategy == "pregenerated":
+            record = self._bank.take(topic, subtopic) if self._bank is not None else None
+            if record is not None:
+                return record, strategy
+            if self._fallback is not None:
+                return self._use_fallback(topic, subtopic), "fallback"
+            # With nothing pregenerated there's no choice but to generate past the deadline.
+            strategy = "over_deadline"
+
+        kwargs = {}
+        if strategy != "normal" and "max_attempts" in KEYWORD_REGISTRY.get(topic, {}):
+            kwargs["max_attempts"] = self.REDUCED_MAX_ATTEMPTS
+        max_timeouts = 1 if strategy == "reduced_retries" else self.MAX_TIMEOUTS
+
+        timeouts = 0
+        while True:
+            time_limit = None if strategy == "over_deadline" else self._attempt_time_limit()
             try:
-                remove(file)
-            except PermissionError as e:
-                msg = (
-                    " is being used by other processes and cannot be deleted. Close it before"
-                    " attempting to rerun the problem sheet generation process."
+                record: QuestionRecord = self._generate_record(topic, subtopic, time_limit, **kwargs)
+                break
+            except QuestionTimeoutError as e:
+                key = f"{topic}/{subtopic}"
+                self._stats.timeouts[key] = self._stats.timeouts.get(key, 0) + 1
+                timeouts += 1
+                warning(f"{type(e).__name__}: {e}")
+
+                within_deadline = self._deadline_end is not None and strategy != "over_deadline"
+                if within_deadline and strategy == "normal":
+                    give_up = self._out_of_time()
+                else:
+                    give_up = timeouts >= max_timeouts
+
+                if give_up:
+                    record = self._bank.take(topic, subtopic) if self._bank is not None else None
+                    if record is not None:
+                        return record, "pregenerated"
+                    if self._fallback is not None:
+                        return self._use_fallback(topic, subtopic), "fallback"
+                    if not within_deadline:
+                        raise
+
+                    strategy, max_timeouts, timeouts = "over_deadline", self.MAX_TIMEOUTS, 0
+
+        self._stats.integrations_avoided += record.integrations_avoided
+        return record, strategy if strategy != "normal" else None
+
+    def _create_valid_question(
+            self,
+            topic: str,
+            subtopic: str,
+            strategy: str = "normal"
+    ) -> tuple[QuestionRecord, str | None]:
+        """
+        Creates a question whose question and answer LaTeX pass validate_latex, so that mistakes
+        are caught and regenerated before anything is compiled.
+        """
+        for _ in range(self.MAX_INVALID_LATEX_ATTEMPTS):
+            question, degraded = self._create_question(topic, subtopic, strategy)
+
+            start = monotonic()
+            problems = validate_latex(question.question) + validate_latex(question.answer)
+            self._validation_time += monotonic() - start
+
+            if not problems:
+                return question, degraded
+
+            self._stats.invalid_latex_rejected += 1
+            warning(f"Generated {subtopic} question has invalid LaTeX and will be regenerated: {problems}")
+
+        msg = (f"Couldn't generate a {subtopic} question with valid LaTeX in "
+               f"{self.MAX_INVALID_LATEX_ATTEMPTS} attempts.")
+        raise QuestionGenerationError(msg)
+
+    def _is_repeat(self, fingerprint: str) -> bool:
+        if fingerprint in self._fingerprints:
+            self._stats.duplicates_rejected += 1
+            return True
+
+        if self._history is not None and self._history.contains(self._cohort, fingerprint):
+            self._stats.repeats_rejected += 1
+            return True
+
+        return False
+
+    def _create_unique_question(
+            self,
+            topic: str,
+            subtopic: str,
+            strategy: str = "normal"
+    ) -> tuple[QuestionRecord, str | None]:
+        """
+        Creates a question whose fingerprint hasn't already been used on this sheet, or issued to
+        the cohort in a previous run if a question history is being used. Fewer duplicates are
+        tried when the strategy isn't "normal", and none once the generation budget runs out.
+
+        Returns the question and the way it was degraded, or None if it wasn't.
+        """
+        max_attempts = self.MAX_DUPLICATE_ATTEMPTS if strategy == "normal" else self.REDUCED_DUPLICATE_ATTEMPTS
+
+        question, degraded = self._create_valid_question(topic, subtopic, strategy)
+        attempts = 1
+        while self._is_repeat(question.fingerprint):
+
+            if attempts >= max_attempts or self._out_of_time():
+                warning((f"Couldn't find a distinct {subtopic} question after {attempts} attempts, "
+                         "a duplicate question will be used."))
+                break
+
+            question, degraded = self._create_valid_question(topic, subtopic, strategy)
+            attempts += 1
+
+        self._fingerprints.add(question.fingerprint)
+        self._stats.questions_generated += 1
+        return question, degraded
+
+    def generate_question(self, question_config: QuestionConfig) -> QuestionRecord:
+        """
+        Generates one question for the selection that is distinct from the others this generator
+        has produced, for changing a sheet a question at a time. There's no deadline, so any
+        deadline left from generating a whole sheet is dropped.
+        """
+        self._deadline_end = None
+        record, _ = self._create_unique_question(*self.resolve_topics(question_config))
+        return record
+
+    def release(self, record: QuestionRecord) -> None:
+        """
+        Forgets a question that was taken off the sheet, so it can be generated again.
+        """
+        self._fingerprints.discard(record.fingerprint)
+
+    def generate_records(
+            self,
+            selected_questions: list[QuestionConfig],
+            deadline: float | None = None
+    ) -> GenerationResult:
+        """
+        Generates the questions for the sheet without building or compiling any documents, the
+        first stage of generate. The questions are returned in the records of the result.
+
+        Every sheet starts from the generator's seed with no questions used yet, so a seeded
+        generator gives the same sheet each time and the seed is enough to identify it.
+        """
+        start = monotonic()
+        self._rng = Random(self._seed)
+        self._fingerprints = set()
+        self._deadline_end = start + deadline if deadline is not None else None
+        result = GenerationResult(self._stats, deadline = deadline)
+        self._validation_time = 0.0
+
+        # Questions can only be interrupted in a worker process, so a deadline needs one.
+        temporary_worker = deadline is not None and self._worker is None
+        if temporary_worker:
+            self._worker = QuestionWorker(deadline, self._memory_limit)
+        generation_budget = deadline - self.COMPILE_TIME_ESTIMATE if deadline is not None else None
+
+        for selected_q in selected_questions:
+            for _ in range(selected_q.num_questions):
+                question, degraded = self._create_unique_question(
+                    *self.resolve_topics(selected_q),
+                    self._choose_strategy(generation_budget)
                 )
-                error(f"{type(e).__name__}: {file}{msg}")
-            except FileNotFoundError:
+                result.records.append(question)
+                if degraded is not None:
+                    result.degraded[len(result.records)] = degraded
+                info(f"Answer: {question.answer}")
+
+        if self._worker is not None:
+            self._worker.close()
+        if temporary_worker:
+            self._worker = None
+
+        if self._sampler is not None:
+            self._sampler.save()
+
+        result.generation_time = monotonic() - start
+        result.validation_time = self._validation_time
+        return result
+
+    def _output_name(self, name: str, date: datetime | None = None, run: str = "") -> str:
+        return self._filename_format.format(name = name, date = date or datetime.now(), run = run)
+
+    def build_sheets(self, records: list[QuestionRecord]) -> tuple[Sheet, Sheet]:
+        """
+        Builds new question and answer sheets from the records and the current config, so the
+        generator can build sheets more than once. If there is a fragment cache then the
+        fragments of the records are compiled first and the sheets include them.
+        """
+        sheets = self._new_sheets()
+        items = ([record.question for record in records], [record.answer for record in records])
+
+        for sheet, sheet_items in zip(sheets, items):
+            if self._fragment_cache is not None:
+                sheet_items = self._fragment_cache.includes(sheet_items)
+                sheet.document.packages.append(Package("graphicx"))
+
+            with sheet.document.create(Enumerate()) as enum:
+                for item in sheet_items:
+                    enum.add_item(item)
+
+        return sheets
+
+    def build_documents(self, records: list[QuestionRecord]) -> tuple[Document, Document]:
+        return tuple(sheet.document for sheet in self.build_sheets(records))
+
+    def compile(
+            self,
+            result: GenerationResult,
+            generate_tex: bool = True,
+            sheets: Collection[str] | None = None
+    ) -> GenerationResult:
+        """
+        Builds the question and answer sheets from the records of the result and compiles them,
+        the second stage of generate. If sheets is given then only those of SHEETS are compiled.
+        """
+        start = monotonic()
+        built = dict(zip(self.SHEETS, self.build_sheets(result.records)))
+        sheets = self.SHEETS if sheets is None else tuple(sheet for sheet in self.SHEETS if sheet in sheets)
+
+        # When less than the estimated compile time is left the compile directories are removed in
+        # the background rather than waited for.
+        clean = self._deadline_end is None or self._deadline_end - monotonic() > self.COMPILE_TIME_ESTIMATE
+        result.cleaned = clean
+
+        date, run = datetime.now(), uuid4().hex[:8]
+        futures = {
+            sheet: self._compile_service.submit(CompileJob(
+                self._output_name(built[sheet].file_name, date, run), built[sheet].document.dumps(), self._output_dir,
+                generate_tex, clean
+            ))
+            for sheet in sheets
+        }
+        compile_results: dict[str, CompileResult] = {sheet: future.result() for sheet, future in futures.items()}
+
+        for sheet, compile_result in compile_results.items():
+            if not compile_result.success:
+                errors = "\n".join(f"    {e}" for e in compile_result.errors)
+                error(f"LaTeX failed to compile {compile_result.job.name}:\n{errors}")
                 continue
 
+            job = compile_result.job
+            result.sheet_files[sheet] = [compile_result.pdf_path]
+            if job.keep_tex:
+                result.sheet_files[sheet].append(job.output_dir / f"{job.name}.tex")
+            result.output_files += result.sheet_files[sheet]
+
+        result.compiled = all(compile_result.success for compile_result in compile_results.values())
+        if result.compiled and self._history is not None:
+            self._history.record(self._cohort, (record.fingerprint for record in result.records))
+
+        result.compile_time = monotonic() - start
+        info(f"Generation complete. {result.stats}")
+        if result.degraded:
+            warning(f"Degraded questions to meet the deadline: {result.degraded}")
+        info(f"Integral cache: {get_integral_cache()}")
+        return result
+
+    def _publish_stored(self, stored: StoredSheet) -> GenerationResult:
+        date, run = datetime.now(), uuid4().hex[:8]
+        result = GenerationResult(self._stats, records = stored.records, compiled = True, cached = True)
+        for path in stored.files:
+            destination = self._output_dir / f"{self._output_name(path.stem, date, run)}{path.suffix}"
+            result.output_files.append(self._store.publish(path, destination))
+
+        info(f"Reused the sheets stored as {stored.key}: {result.output_files}")
+        return result
+
+    def generate(
+            self,
+            selected_questions: list[QuestionConfig],
+            generate_tex: bool = True,
+            deadline: float | None = None,
+            rebuild: bool = False
+    ) -> GenerationResult:
+        """
+        Generates the question and answer sheets.
+
+        If a deadline in seconds is given then generation and compilation are budgeted to finish
+        within it. As the deadline approaches questions are generated with fewer retries, then
+        taken from the question bank, and the clean up of LaTeX's auxiliary files is skipped. The
+        questions that were degraded are listed in the returned GenerationResult.
+
+        If the generator has an artefact store and a seed then sheets that were built before are
+        taken from the store rather than generated again, unless rebuild is True. A question
+        history or adaptive sampler changes the questions a seed gives, so sheets aren't stored
+        when either is used.
+        """
+        key = None
+        if self._store is not None and self._seed is not None and self._history is None and self._sampler is None:
+            key = sheet_key(self._config, selected_questions, self._seed, generate_tex)
+            stored = self._store.get(key) if not rebuild else None
+            if stored is not None:
+                return self._publish_stored(stored)
+
+        result = self.compile(self.generate_records(selected_questions, deadline), generate_tex)
 
+        # Degraded sheets depend on timing rather than just the seed, so they aren't reused.
+        if key is not None and result.compiled and not result.degraded:
+            file_names = dict(zip(self.SHEETS, (sheet.file_name for sheet in self._new_sheets())))
+            files = {f"{file_names[sheet]}{path.suffix}": path
+                     for sheet, paths in result.sheet_files.items() for path in paths}
+            self._store.put(key, files, result.records)
+        return result
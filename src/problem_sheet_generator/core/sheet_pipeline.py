@@ -0,0 +1,179 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from problem_sheet_generator.app.ui import SheetConfig
+    from problem_sheet_generator.app.ui import QuestionConfig
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from logging import error, info
+from multiprocessing import get_context
+from os import cpu_count
+from queue import Queue
+from threading import Lock, Semaphore, Thread
+from time import monotonic
+from problem_sheet_generator.core.compile_service import CompileService
+from problem_sheet_generator.core.sheet_generator import GenerationResult, SheetGenerator
+
+
+@dataclass
+class SheetJob():
+    config: SheetConfig
+    selected_questions: list[QuestionConfig]
+    seed: int | None = None
+    generate_tex: bool = True
+
+
+@dataclass
+class PipelineMetrics():
+    generation_workers: int
+    compile_workers: int
+    wall_time: float = 0.0
+    # The total time each stage spent working, summed over its workers.
+    generation_busy: float = 0.0
+    # The part of generation_busy spent validating LaTeX.
+    validation_busy: float = 0.0
+    compile_busy: float = 0.0
+    # The time the generation stage spent waiting for the compile stage to take sheets.
+    backpressure_wait: float = 0.0
+    max_queue_depth: int = 0
+
+    @property
+    def generation_utilisation(self) -> float:
+        return self.generation_busy/(self.wall_time*self.generation_workers) if self.wall_time else 0.0
+
+    @property
+    def compile_utilisation(self) -> float:
+        return self.compile_busy/(self.wall_time*self.compile_workers) if self.wall_time else 0.0
+
+
+def _generate_sheet_records(job: SheetJob) -> GenerationResult:
+    return SheetGenerator(job.config, seed = job.seed).generate_records(job.selected_questions)
+
+
+class SheetPipeline():
+    """
+    Generates and compiles many sheets at once, overlapping the CPU bound question generation of
+    some sheets with the LaTeX compilation of others, which mostly waits on subprocesses.
+
+    Questions are generated in a pool of worker processes and the generated sheets are passed
+    through a bounded queue to a pool of compile threads. Once queue_size sheets are waiting to
+    be compiled no more sheets are started, so a slow compile stage holds generation back rather
+    than letting finished sheets pile up.
+
+    Jobs in a pipeline are independent, so they don't share a question history or sampler.
+
+    Parameters
+    ==========
+    generation_workers: int, optional
+        The number of processes generating questions. If None then the number of CPUs is used.
+
+    compile_workers: int, optional
+        The number of sheets compiled at once.
+
+    queue_size: int, optional
+        The number of generated sheets that can wait to be compiled.
+
+    compile_service: CompileService, optional
+        The service the sheets are compiled with. If None then one with two workers for each
+        compile worker is used, so a sheet's question and answer documents compile together.
+    """
+
+    def __init__(
+            self,
+            generation_workers: int | None = None,
+            compile_workers: int = 2,
+            queue_size: int = 2,
+            compile_service: CompileService | None = None
+    ):
+        self._generation_workers = generation_workers or cpu_count() or 1
+        if compile_workers < 1 or queue_size < 1:
+            msg = ("compile_workers and queue_size should be at least 1, not "
+                   f"compile_workers = {compile_workers} and queue_size = {queue_size}.")
+            raise ValueError(msg)
+        self._compile_workers = compile_workers
+        self._queue_size = queue_size
+        self._compile_service = compile_service if compile_service is not None else CompileService(2*compile_workers)
+
+    def run(self, jobs: list[SheetJob]) -> tuple[list[GenerationResult | None], PipelineMetrics]:
+        """
+        Generates and compiles the sheets for the jobs.
+
+        Returns the result of each job in the order of the jobs, with None for jobs whose
+        questions couldn't be generated, and the metrics of the run.
+        """
+        metrics = PipelineMetrics(self._generation_workers, self._compile_workers)
+        results: list[GenerationResult | None] = [None]*len(jobs)
+        start = monotonic()
+
+        # Each slot is a sheet that has been started but not yet taken by the compile stage. The
+        # queue holds at most every slot, so putting a finished sheet into it never blocks.
+        slots = Semaphore(self._generation_workers + self._queue_size)
+        queue: Queue[tuple[int, Future] | None] = Queue(self._generation_workers + self._queue_size)
+        lock = Lock()
+
+        compile_threads = [
+            Thread(target = self._compile_loop, args = (jobs, queue, slots, results, metrics, lock))
+            for _ in range(self._compile_workers)
+        ]
+        for thread in compile_threads:
+            thread.start()
+
+        # Worker processes are spawned rather than forked since the compile threads are running.
+        with ProcessPoolExecutor(self._generation_workers, mp_context = get_context("spawn")) as pool:
+            for index, job in enumerate(jobs):
+                wait_start = monotonic()
+                slots.acquire()
+                metrics.backpressure_wait += monotonic() - wait_start
+
+                future = pool.submit(_generate_sheet_records, job)
+                future.add_done_callback(lambda future, index = index: queue.put((index, future)))
+
+        for _ in compile_threads:
+            queue.put(None)
+        for thread in compile_threads:
+            thread.join()
+
+        metrics.wall_time = monotonic() - start
+        info((f"Pipeline finished {len(jobs)} sheets in {metrics.wall_time:.2f}s, generation "
+              f"utilisation {metrics.generation_utilisation:.0%}, compile utilisation "
+              f"{metrics.compile_utilisation:.0%}."))
+        return results, metrics
+
+    def _compile_loop(
+            self,
+            jobs: list[SheetJob],
+            queue: Queue,
+            slots: Semaphore,
+            results: list[GenerationResult | None],
+            metrics: PipelineMetrics,
+            lock: Lock
+    ) -> None:
+        while True:
+            with lock:
+                metrics.max_queue_depth = max(metrics.max_queue_depth, queue.qsize())
+
+            item = queue.get()
+            if item is None:
+                return
+
+            index, future = item
+            slots.release()
+
+            try:
+                result: GenerationResult = future.result()
+            except Exception as e:
+                error(f"{type(e).__name__}: Generating sheet {index} failed. {e}")
+                continue
+
+            start = monotonic()
+            job = jobs[index]
+            results[index] = result
+            try:
+                SheetGenerator(job.config, compile_service = self._compile_service).compile(result, job.generate_tex)
+            except Exception as e:
+                error(f"{type(e).__name__}: Compiling sheet {index} failed. {e}")
+
+            with lock:
+                metrics.generation_busy += result.generation_time
+                metrics.validation_busy += result.validation_time
+                metrics.compile_busy += monotonic() - start
@@ -0,0 +1,114 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from problem_sheet_generator.app.ui import QuestionConfig
+from logging import info
+from pathlib import Path
+from problem_sheet_generator.core.question_worker import QuestionRecord
+from problem_sheet_generator.core.sheet_generator import GenerationResult, SheetGenerator
+
+
+class SheetSession():
+    """
+    Keeps the questions of the sheet being edited, so that changing the selection only generates
+    the questions that were added and only recompiles the sheets whose LaTeX changed.
+
+    Questions are kept for each QuestionConfig by its id. Raising a config's count generates the
+    extra questions, lowering it drops the last ones, and removing a config drops all of its
+    questions. A single question can be regenerated with reroll.
+
+    Parameters
+    ==========
+    generator: SheetGenerator
+        The generator questions are generated and compiled with. It's kept for the whole session
+        so questions stay distinct across edits.
+    """
+
+    def __init__(self, generator: SheetGenerator):
+        self._generator = generator
+        self._selection: list[str] = []
+        self._records: dict[str, list[QuestionRecord]] = {}
+
+        # The LaTeX, file name and generate_tex option of each sheet when it was last compiled, and
+        # the files it was compiled to.
+        self._sources: dict[str, tuple[str, str, bool]] = {}
+        self._files: dict[str, list[Path]] = {}
+
+    @property
+    def records(self) -> list[QuestionRecord]:
+        """
+        The questions of the sheet in the order they appear on it.
+        """
+        return [record for config_id in self._selection for record in self._records[config_id]]
+
+    def records_for(self, config_id: str) -> list[QuestionRecord]:
+        return list(self._records.get(config_id, []))
+
+    def _drop(self, records: list[QuestionRecord]) -> None:
+        for record in records:
+            self._generator.release(record)
+
+    def update(self, selected_questions: list[QuestionConfig]) -> int:
+        """
+        Brings the sheet in line with the selected questions, keeping every question that is
+        still selected. Returns the number of questions generated.
+        """
+        selected_ids = {config.id for config in selected_questions}
+        for config_id in list(self._records):
+            if config_id not in selected_ids:
+                self._drop(self._records.pop(config_id))
+
+        generated = 0
+        for config in selected_questions:
+            records = self._records.setdefault(config.id, [])
+            if len(records) > config.num_questions:
+                self._drop(records[config.num_questions:])
+                del records[config.num_questions:]
+
+            while len(records) < config.num_questions:
+                records.append(self._generator.generate_question(config))
+                generated += 1
+
+        self._selection = [config.id for config in selected_questions]
+        return generated
+
+    def reroll(self, config: QuestionConfig, index: int) -> QuestionRecord:
+        """
+        Replaces the question at index among those of the config with a new one.
+        """
+        records = self._records.get(config.id, [])
+        if not 0 <= index < len(records):
+            msg = f"{config.id} has {len(records)} questions, so there's no question {index} to reroll."
+            raise IndexError(msg)
+
+        # The new question is generated before the old one is released so they can't be the same.
+        record = self._generator.generate_question(config)
+        self._drop([records[index]])
+        records[index] = record
+        return record
+
+    def compile(self, generate_tex: bool = True) -> GenerationResult:
+        """
+        Compiles the sheets whose LaTeX has changed since they were last compiled. The files of
+        the sheets that didn't change are carried over into the result.
+        """
+        result = GenerationResult(self._generator.stats, records = self.records)
+
+        sheets = dict(zip(SheetGenerator.SHEETS, self._generator.build_sheets(result.records)))
+        sources = {name: (sheet.document.dumps(), sheet.file_name, generate_tex) for name, sheet in sheets.items()}
+        changed = {sheet for sheet, source in sources.items() if self._sources.get(sheet) != source}
+
+        if changed:
+            self._generator.compile(result, generate_tex, changed)
+            for sheet in changed & result.sheet_files.keys():
+                self._sources[sheet] = sources[sheet]
+                self._files[sheet] = result.sheet_files[sheet]
+        else:
+            result.compiled = True
+
+        for sheet in set(SheetGenerator.SHEETS) - changed:
+            result.sheet_files[sheet] = self._files[sheet]
+            result.output_files += self._files[sheet]
+
+        info(f"Recompiled {sorted(changed)}, kept {sorted(set(SheetGenerator.SHEETS) - changed)}")
+        return result
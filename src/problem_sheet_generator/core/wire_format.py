@@ -0,0 +1,180 @@
+"""
+A compact binary format for question records, used to move generated questions between
+processes and to store them on disk.
+
+A record is a fixed size header followed by its strings and canonical form:
+
+    magic "PSQ" | version u8 | topic length u8 | subtopic length u8 | fingerprint 16 bytes |
+    integrations avoided u32 | question length u32 | answer length u32 |
+    topic | subtopic | question | answer (UTF-8) | canonical form
+
+The canonical form is the integer coefficients, limits and vertices a question was built from.
+It is written as tagged values: "t" count u32 followed by the items of a tuple, "i" for an
+integer that fits in an i64, "I" length u32 followed by the little endian bytes of a larger
+integer, and "s" length u32 followed by a UTF-8 string. All numbers are little endian.
+
+Encoding is deterministic, so equal records always give equal bytes, and decoding reads
+straight from a memoryview so a buffer holding many records is never copied.
+"""
+from __future__ import annotations
+from typing import Any, Iterator, TYPE_CHECKING
+if TYPE_CHECKING:
+    from problem_sheet_generator.core.question_worker import QuestionRecord
+from struct import Struct
+from pylatex.utils import NoEscape
+
+MAGIC: bytes = b"PSQ"
+WIRE_FORMAT_VERSION: int = 1
+
+RECORD_HEADER = Struct("<3sBBB16sIII")
+RECORDS_HEADER = Struct("<3sBI")
+LENGTH = Struct("<I")
+INTEGER = Struct("<q")
+TAG = Struct("<c")
+
+
+class WireFormatError(ValueError):
+    """
+    Raised when bytes aren't a record in a wire format version this code can read, or when a
+    record can't be written in the wire format.
+    """
+
+
+def _encode_value(value: Any, parts: list[bytes]) -> None:
+    if isinstance(value, tuple):
+        parts += [b"t", LENGTH.pack(len(value))]
+        for item in value:
+            _encode_value(item, parts)
+
+    elif isinstance(value, bool) or not isinstance(value, (int, str)):
+        msg = f"Canonical forms can only hold tuples, integers and strings, not {type(value).__name__}."
+        raise WireFormatError(msg)
+
+    elif isinstance(value, str):
+        encoded = value.encode()
+        parts += [b"s", LENGTH.pack(len(encoded)), encoded]
+
+    elif -2**63 <= value < 2**63:
+        parts += [b"i", INTEGER.pack(value)]
+
+    else:
+        encoded = value.to_bytes((value.bit_length() + 8)//8, "little", signed = True)
+        parts += [b"I", LENGTH.pack(len(encoded)), encoded]
+
+
+def _decode_value(view: memoryview, offset: int) -> tuple[Any, int]:
+    """
+    Returns the value at the offset and the offset after it.
+    """
+    tag, = TAG.unpack_from(view, offset)
+    offset += TAG.size
+
+    if tag == b"i":
+        return INTEGER.unpack_from(view, offset)[0], offset + INTEGER.size
+
+    length, = LENGTH.unpack_from(view, offset)
+    offset += LENGTH.size
+    if tag == b"t":
+        items = []
+        for _ in range(length):
+            item, offset = _decode_value(view, offset)
+            items.append(item)
+        return tuple(items), offset
+    if tag == b"s":
+        return str(view[offset:offset + length], "utf-8"), offset + length
+    if tag == b"I":
+        return int.from_bytes(view[offset:offset + length], "little", signed = True), offset + length
+
+    msg = f"Unknown canonical form tag {tag!r} at byte {offset - LENGTH.size - TAG.size}."
+    raise WireFormatError(msg)
+
+
+def encode_record(record: QuestionRecord) -> bytes:
+    try:
+        fingerprint = bytes.fromhex(record.fingerprint)
+    except ValueError:
+        fingerprint = b""
+    if len(fingerprint) != 16:
+        msg = f"The fingerprint should be 32 hex digits, not {record.fingerprint!r}."
+        raise WireFormatError(msg)
+
+    topic, subtopic = record.topic.encode(), record.subtopic.encode()
+    question, answer = record.question.encode(), record.answer.encode()
+    parts = [
+        RECORD_HEADER.pack(MAGIC, WIRE_FORMAT_VERSION, len(topic), len(subtopic), fingerprint,
+                           record.integrations_avoided, len(question), len(answer)),
+        topic, subtopic, question, answer
+    ]
+    _encode_value(record.canonical_form, parts)
+    return b"".join(parts)
+
+
+def decode_record_fields(data: bytes | memoryview) -> dict[str, Any]:
+    """
+    Returns the fields of an encoded record as keyword arguments for QuestionRecord. The question
+    and answer are NoEscape strings, as they are when the record is generated.
+    """
+    view = memoryview(data)
+    if len(view) < RECORD_HEADER.size:
+        msg = f"A record needs at least {RECORD_HEADER.size} bytes, not {len(view)}."
+        raise WireFormatError(msg)
+
+    (magic, version, topic_length, subtopic_length, fingerprint, integrations_avoided,
+     question_length, answer_length) = RECORD_HEADER.unpack_from(view)
+    if magic != MAGIC:
+        msg = "The bytes don't start with a question record."
+        raise WireFormatError(msg)
+    if version != WIRE_FORMAT_VERSION:
+        msg = f"Wire format version {version} can't be read, only version {WIRE_FORMAT_VERSION}."
+        raise WireFormatError(msg)
+
+    offset = RECORD_HEADER.size
+    strings = []
+    for length in (topic_length, subtopic_length, question_length, answer_length):
+        strings.append(str(view[offset:offset + length], "utf-8"))
+        offset += length
+    topic, subtopic, question, answer = strings
+
+    canonical_form, _ = _decode_value(view, offset)
+    return {
+        "topic": topic,
+        "subtopic": subtopic,
+        "question": NoEscape(question),
+        "answer": NoEscape(answer),
+        "fingerprint": fingerprint.hex(),
+        "integrations_avoided": integrations_avoided,
+        "canonical_form": canonical_form
+    }
+
+
+def encode_records(records: list[QuestionRecord]) -> bytes:
+    """
+    Encodes a list of records as one buffer, each record prefixed by its length.
+    """
+    parts = [RECORDS_HEADER.pack(MAGIC, WIRE_FORMAT_VERSION, len(records))]
+    for record in records:
+        encoded = encode_record(record)
+        parts += [LENGTH.pack(len(encoded)), encoded]
+    return b"".join(parts)
+
+
+def iter_record_fields(data: bytes | memoryview) -> Iterator[dict[str, Any]]:
+    """
+    Yields the fields of each record in a buffer written by encode_records.
+    """
+    view = memoryview(data)
+    if len(view) < RECORDS_HEADER.size:
+        msg = f"A record list needs at least {RECORDS_HEADER.size} bytes, not {len(view)}."
+        raise WireFormatError(msg)
+
+    magic, version, count = RECORDS_HEADER.unpack_from(view)
+    if magic != MAGIC or version != WIRE_FORMAT_VERSION:
+        msg = f"The bytes aren't a list of question records in wire format version {WIRE_FORMAT_VERSION}."
+        raise WireFormatError(msg)
+
+    offset = RECORDS_HEADER.size
+    for _ in range(count):
+        length, = LENGTH.unpack_from(view, offset)
+        offset += LENGTH.size
+        yield decode_record_fields(view[offset:offset + length])
+        offset += length
@@ -0,0 +1,26 @@
+from argparse import ArgumentParser
+from asyncio import run
+from problem_sheet_generator.core.generation_service import GenerationService
+from problem_sheet_generator.utilities import configure_log
+
+# Runs the generation service, so sheets can be generated by sending JSON requests to a socket
+# rather than starting a new process for each one.
+if __name__ == "__main__":
+    configure_log()
+
+    parser = ArgumentParser(description = "Serve problem sheet generation requests.")
+    parser.add_argument("--socket", help = "Listen on this Unix socket rather than TCP.")
+    parser.add_argument("--host", default = "127.0.0.1")
+    parser.add_argument("--port", type = int, default = 8765)
+    parser.add_argument("--workers", type = int, help = "The number of worker processes.")
+    parser.add_argument("--time-limit", type = float, default = 10.0,
+                        help = "The number of seconds a question may take before its worker is replaced.")
+    args = parser.parse_args()
+
+    service = GenerationService(args.workers, time_limit = args.time_limit)
+    try:
+        run(service.serve(args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
@@ -1,4 +1,5 @@
 from .symbol_manipulation import scalar_expr_from_expr, symbol_from_coord_scalar
-from .mathematics import polynomial_from_coeffs, random_weighted_coefficients, random_limits, awkward_number, generate_random_pairs, weak_compositions
+from .mathematics import polynomial_from_coeffs, random_weighted_coefficients, random_limits, awkward_number, generate_random_pairs, weak_compositions, random_triangle, non_degenerate_triangles
 from .misc import timing, configure_log
-from .latex_formatting import CleanVectorLatexPrinter, ParametricRegionLatexPrinter
\ No newline at end of file
+from .latex_formatting import CleanVectorLatexPrinter, ParametricRegionLatexPrinter
+from .latex_validation import validate_latex, KNOWN_COMMANDS, KNOWN_ENVIRONMENTS
@@ -0,0 +1,143 @@
+from re import compile as compile_regex
+
+# The commands that generated questions and answers may use. Anything else is most likely a typo
+# or a printer bug that would only show up when TeX runs.
+KNOWN_COMMANDS: frozenset[str] = frozenset({
+    # Structure and text
+    "begin", "end", "item", "text", "textbf", "textit", "emph", "quad", "qquad", "ldots", "cdots",
+    # Fonts and accents
+    "mathbf", "mathrm", "mathit", "mathcal", "mathbb", "boldsymbol", "hat", "vec", "bar", "tilde",
+    "dot", "ddot", "overline",
+    # Operators and relations
+    "frac", "dfrac", "tfrac", "sqrt", "cdot", "times", "pm", "mp", "le", "leq", "ge", "geq", "ne",
+    "neq", "approx", "equiv", "in", "to", "mapsto", "infty", "partial", "nabla", "circ",
+    # Calculus
+    "int", "iint", "iiint", "oint", "sum", "prod", "lim", "displaystyle", "textstyle", "limits",
+    # Delimiters
+    "left", "right", "big", "Big", "bigg", "Bigg", "langle", "rangle", "lvert", "rvert", "lVert",
+    "rVert", "vert", "Vert",
+    # Functions
+    "sin", "cos", "tan", "sec", "csc", "cot", "arcsin", "arccos", "arctan", "sinh", "cosh", "tanh",
+    "log", "ln", "exp", "det", "min", "max",
+    # Greek letters
+    "alpha", "beta", "gamma", "delta", "epsilon", "varepsilon", "zeta", "eta", "theta", "vartheta",
+    "iota", "kappa", "lambda", "mu", "nu", "xi", "pi", "varpi", "rho", "sigma", "tau", "upsilon",
+    "phi", "varphi", "chi", "psi", "omega", "Gamma", "Delta", "Theta", "Lambda", "Xi", "Pi",
+    "Sigma", "Phi", "Psi", "Omega"
+})
+
+KNOWN_ENVIRONMENTS: frozenset[str] = frozenset({
+    "enumerate", "itemize", "align", "align*", "equation", "equation*", "cases", "matrix",
+    "pmatrix", "bmatrix", "vmatrix", "array"
+})
+
+# Control symbols, a backslash followed by a single non-letter, are all valid.
+COMMAND = compile_regex(r"\\([A-Za-z]+|.)")
+ENVIRONMENT = compile_regex(r"\\(begin|end)\{([^{}]*)\}")
+
+
+def _strip_escapes(latex: str) -> str:
+    """
+    Replaces control symbols such as \\{ and \\$ with spaces, so that the characters they escape
+    aren't mistaken for delimiters. The length of the string is kept.
+    """
+    return COMMAND.sub(lambda match: match.group(0) if match.group(1).isalpha() else "  ", latex)
+
+
+def _check_braces(latex: str) -> list[str]:
+    depth = 0
+    for i, char in enumerate(latex):
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth < 0:
+                return [f"Unmatched }} at position {i}."]
+    return [f"{depth} unclosed {{."] if depth else []
+
+
+def _math_spans(latex: str) -> tuple[list[str], list[str]]:
+    """
+    Splits the string on $ and $$ delimiters. Returns the contents of the math spans, and any
+    problems with the delimiters.
+    """
+    spans: list[str] = []
+    problems: list[str] = []
+    i, start, delimiter = 0, None, None
+    while i < len(latex):
+        if latex[i] != "$":
+            i += 1
+            continue
+
+        token = "$$" if latex.startswith("$$", i) else "$"
+        if delimiter is None:
+            start, delimiter = i + len(token), token
+        elif token == delimiter or (delimiter == "$" and token == "$$"):
+            # An inline $ directly followed by another $ closes the span then opens a new one.
+            token = delimiter
+            if not latex[start:i].strip():
+                problems.append(f"Empty math at position {start}.")
+            spans.append(latex[start:i])
+            delimiter = None
+        else:
+            problems.append(f"$ at position {i} inside $$ math.")
+        i += len(token)
+
+    if delimiter is not None:
+        problems.append(f"Unclosed {delimiter} math starting at position {start - len(delimiter)}.")
+    return spans, problems
+
+
+def _check_left_right(math: str) -> list[str]:
+    depth = 0
+    for match in COMMAND.finditer(math):
+        if match.group(1) == "left":
+            depth += 1
+        elif match.group(1) == "right":
+            depth -= 1
+            if depth < 0:
+                return [rf"\right without a \left in ${math}$."]
+    return [rf"{depth} \left without a \right in ${math}$."] if depth else []
+
+
+def _check_environments(latex: str) -> list[str]:
+    problems: list[str] = []
+    stack: list[str] = []
+    for kind, name in ENVIRONMENT.findall(latex):
+        if name not in KNOWN_ENVIRONMENTS:
+            problems.append(f"Unknown environment {name}.")
+        if kind == "begin":
+            stack.append(name)
+        elif not stack or stack.pop() != name:
+            problems.append(rf"\end{{{name}}} doesn't match the open environment.")
+    problems.extend(rf"\begin{{{name}}} is never ended." for name in stack)
+    return problems
+
+
+def validate_latex(latex: str) -> list[str]:
+    """
+    Checks a question or answer string for LaTeX mistakes that would stop it compiling, without
+    running TeX. The braces must balance, $ and $$ math must be closed and not empty, \\left and
+    \\right must pair up within each math span, environments must be known and properly nested,
+    and every command must be in KNOWN_COMMANDS.
+
+    Returns a list of the problems found, which is empty if the string is valid.
+    """
+    stripped = _strip_escapes(latex)
+
+    problems = _check_braces(stripped)
+
+    spans, math_problems = _math_spans(stripped)
+    problems.extend(math_problems)
+    for math in spans:
+        problems.extend(_check_left_right(math))
+
+    problems.extend(_check_environments(stripped))
+
+    unknown = sorted({
+        match.group(1) for match in COMMAND.finditer(stripped)
+        if match.group(1).isalpha() and match.group(1) not in KNOWN_COMMANDS
+    })
+    problems.extend(rf"Unknown command \{command}." for command in unknown)
+
+    return problems
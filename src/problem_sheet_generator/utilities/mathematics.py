@@ -1,4 +1,6 @@
-from random import choices, randint
+from functools import cache
+from itertools import combinations, product
+from random import choice, choices, randint, randrange
 from more_itertools import distinct_permutations
 from sympy import Expr, Rational, Symbol
 from sympy.combinatorics import IntegerPartition
@@ -197,3 +199,48 @@ def _awkward_rational(rat: Rational) -> bool:
 def generate_random_pairs(num: int, inf: int, sup: int) -> list[tuple[int]]:
     return [(randint(inf, sup), randint(inf, sup)) for _ in range(num)]
 
+
+# Grids with at most this many points have all of their triangles enumerated once and cached.
+MAX_TRIANGLE_TABLE_POINTS = 49
+
+def orientation(p: tuple[int], q: tuple[int], r: tuple[int]) -> int:
+    """
+    Returns twice the signed area of the triangle pqr, which is positive if the vertices are
+    anticlockwise, negative if they are clockwise and 0 if they are collinear.
+    """
+    return (q[0] - p[0])*(r[1] - p[1]) - (r[0] - p[0])*(q[1] - p[1])
+
+@cache
+def non_degenerate_triangles(inf: int, sup: int) -> tuple[tuple[tuple[int]]]:
+    """
+    Returns every non-degenerate triangle with vertices in the integer grid [inf, sup]^2, each
+    listed once with its vertices in anticlockwise order.
+    """
+    points = list(product(range(inf, sup + 1), repeat = 2))
+    triangles = []
+    for p, q, r in combinations(points, 3):
+        area = orientation(p, q, r)
+        if area > 0:
+            triangles.append((p, q, r))
+        elif area < 0:
+            triangles.append((p, r, q))
+    return tuple(triangles)
+
+def random_triangle(inf: int, sup: int) -> tuple[tuple[int]]:
+    """
+    Returns a uniformly random non-degenerate triangle with vertices in the integer grid
+    [inf, sup]^2, with its vertices in anticlockwise order and a random starting vertex.
+
+    Small grids sample from the cached table of non_degenerate_triangles, larger ones draw vertex
+    triples and reject the collinear ones with a determinant check.
+    """
+    if (sup - inf + 1)**2 <= MAX_TRIANGLE_TABLE_POINTS:
+        triangle = choice(non_degenerate_triangles(inf, sup))
+    else:
+        p, q, r = generate_random_pairs(3, inf, sup)
+        while orientation(p, q, r) == 0:
+            p, q, r = generate_random_pairs(3, inf, sup)
+        triangle = (p, q, r) if orientation(p, q, r) > 0 else (p, r, q)
+
+    start = randrange(3)
+    return triangle[start:] + triangle[:start]
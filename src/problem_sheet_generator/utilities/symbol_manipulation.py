@@ -10,6 +10,9 @@ def _scalar_from_symbol(sym: Symbol, C: CoordSys3D) -> BaseScalar:
                 return scalar
 
 def _scalar_expr_from_mul(expr: Expr, C: CoordSys3D) -> Expr:
+    if isinstance(expr, Number):
+        return expr
+
     args = expr.args
     if isinstance(expr, Pow):
         return _scalar_from_symbol(args[0], C)**args[1]
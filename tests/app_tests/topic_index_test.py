@@ -0,0 +1,50 @@
+from problem_sheet_generator.app.ui.sheet_creation.topic_index import TopicIndex
+
+TOPICS = {
+    "calculus": {"line_integral": ["scalar_field", "vector_field"], "limits": ["sequences"]},
+    "algebra": {"matrices": ["scalar_field"]}
+}
+DISPLAY = {
+    "calculus": "Calculus", "algebra": "Algebra", "line_integral": "Line Integrals",
+    "limits": "Limits", "matrices": "Matrices", "scalar_field": "Scalar Fields",
+    "vector_field": "Vector Fields", "sequences": "Sequences"
+}
+
+def test_topic_index(subtests):
+    index = TopicIndex(TOPICS, DISPLAY)
+
+    index_test_cases = [
+        (index.roots, ["algebra", "calculus"]),
+        (index.parents("line_integral_vector_field"), ["line_integral", "calculus"]),
+        (index.children("line_integral"), ["line_integral_scalar_field", "line_integral_vector_field"]),
+        (index.topics("line_integral_scalar_field"), ["calculus", "line_integral", "line_integral_scalar_field"]),
+        (index.topics("limits"), ["calculus", "limits", None]),
+        (index.topics("algebra"), ["algebra", None, None]),
+        (index.subtree("calculus"), ["calculus", "line_integral", "line_integral_scalar_field",
+                                     "line_integral_vector_field", "limits", "limits_sequences"]),
+        (index.leaf_count("calculus"), 3),
+        (index.leaf_count("matrices_scalar_field"), 1),
+        (index.text("matrices_scalar_field"), "Scalar Fields"),
+        (len(index), 9)
+    ]
+
+    for i, (value, expected) in enumerate(index_test_cases):
+        with subtests.test("Index test cases", i = i):
+            assert value == expected
+
+def test_search(subtests):
+    index = TopicIndex(TOPICS, DISPLAY)
+
+    search_test_cases = [
+        ("scal", ["matrices_scalar_field", "line_integral_scalar_field"]),
+        ("FIELDS", ["matrices_scalar_field", "line_integral_scalar_field", "line_integral_vector_field"]),
+        ("line  int", ["line_integral"]),
+        ("integrals", ["line_integral"]),
+        ("l", ["line_integral", "limits"]),
+        ("fields scalar", []),
+        ("   ", [])
+    ]
+
+    for i, (query, expected) in enumerate(search_test_cases):
+        with subtests.test("Search test cases", i = i):
+            assert index.search(query) == expected
@@ -0,0 +1,34 @@
+import pytest
+from problem_sheet_generator.core.adaptive_sampling import AdaptiveSampler
+
+BASE_TABLES = ([0.6, 0.4], [1, 1, 1, 1], [1, 1, 1])
+
+def draw(sampler, coeffs, accepted):
+    sampler.weight_tables("bucket", "curve", *BASE_TABLES)
+    sampler.observe("bucket", "curve", coeffs, (1, 2), (-2, 2))
+    sampler.accept() if accepted else sampler.reject()
+
+def test_weights_follow_acceptance_within_bounds():
+    sampler = AdaptiveSampler(min_factor = 0.5, max_factor = 2.0)
+    for _ in range(200):
+        draw(sampler, [0, 1, 0], True)
+        draw(sampler, [-2, 0, 2], False)
+
+    non_zero, values, indices = sampler.weight_tables("bucket", "curve", *BASE_TABLES)
+
+    assert non_zero[0] > 0.6 and non_zero[1] < 0.4
+    assert non_zero[0] <= 0.6*2.0 and non_zero[1] >= 0.4*0.5
+    assert values[2] > 1 > values[0]
+    assert indices[1] > 1 > indices[0]
+
+def test_statistics_persist_between_runs(tmp_path):
+    path = tmp_path / "sampler.json"
+    sampler = AdaptiveSampler(path)
+    draw(sampler, [0, 1, 0], True)
+    sampler.save()
+
+    assert AdaptiveSampler(path).stats == sampler.stats
+
+def test_invalid_bounds():
+    with pytest.raises(ValueError):
+        AdaptiveSampler(min_factor = 1.5)
@@ -0,0 +1,39 @@
+from fractions import Fraction
+from sympy.abc import t, x, y
+from problem_sheet_generator.core.mathematics.answer_prediction import (answer_likely_awkward,
+                                                                      estimate_vector_line_integral)
+from problem_sheet_generator.core.mathematics.polynomial import Polynomial
+
+def polys(exprs, gens):
+    return tuple(Polynomial.from_expr(expr, gens) for expr in exprs)
+
+def test_estimate_is_exact_for_monomial_integrands():
+    # F = (y, 0) along r(t) = (t, t^2) has integrand t^2.
+    estimate = estimate_vector_line_integral(polys((y, 0), (x, y)), polys((t, t**2), (t,)), (0, 3))
+
+    assert estimate == Fraction(9)
+
+def test_estimate_uses_leading_terms():
+    # F = (x*y, 4*x) along r(t) = (2t, -t^3 + 1) has integrand -12t^3 - 4t^4 + 4t, which is
+    # dominated by -4t^4.
+    estimate = estimate_vector_line_integral(polys((x*y, 4*x), (x, y)), polys((2*t, -t**3 + 1), (t,)), (-1, 3))
+
+    assert estimate == Fraction(-4*(3**5 + 1), 5)
+
+def test_cancelling_leading_terms_give_no_estimate():
+    # F = (y, -x) along r(t) = (t, t) has integrand 0.
+    assert estimate_vector_line_integral(polys((y, -x), (x, y)), polys((t, t), (t,)), (0, 2)) is None
+
+def test_answer_likely_awkward(subtests):
+    awkward_test_cases = {
+        None: False,
+        Fraction(0): False,
+        Fraction(999): False,
+        Fraction(-4999): False,
+        Fraction(5000): True,
+        Fraction(-123456, 7): True
+    }
+
+    for i, (estimate, awkward) in enumerate(awkward_test_cases.items()):
+        with subtests.test("Awkward estimate test cases", i = i):
+            assert answer_likely_awkward(estimate) == awkward
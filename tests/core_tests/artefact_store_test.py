@@ -0,0 +1,64 @@
+from os import utime
+from time import time
+from problem_sheet_generator.app.ui import QuestionConfig, SheetConfig
+from problem_sheet_generator.core.artefact_store import ArtefactStore, sheet_key
+from problem_sheet_generator.core.question_worker import generate_question_record
+from problem_sheet_generator.core.sheet_generator import SheetGenerator
+
+SELECTED = [QuestionConfig(["multivariable_calc", "line_integral", "line_integral_fundamental_theorem"], 2)]
+
+def _put(store, key, tmp_path, size = 10):
+    path = tmp_path / f"{key}.pdf"
+    path.write_bytes(b"%PDF" + b"0"*size)
+    return store.put(key, {"Problem_Sheet.pdf": path}, [generate_question_record("line_integral", "scalar_field", 1)])
+
+def test_sheet_key(subtests):
+    key = sheet_key(SheetConfig(), SELECTED, 1)
+    changed_test_cases = [
+        sheet_key(SheetConfig(problem_title = "Week 2"), SELECTED, 1),
+        sheet_key(SheetConfig(), SELECTED, 2),
+        sheet_key(SheetConfig(), [QuestionConfig(SELECTED[0].topics, 3)], 1),
+        sheet_key(SheetConfig(), SELECTED, 1, generate_tex = False)
+    ]
+
+    assert sheet_key(SheetConfig(), SELECTED, 1) == key
+    for i, changed in enumerate(changed_test_cases):
+        with subtests.test("Changed spec test cases", i = i):
+            assert changed != key
+
+def test_store_round_trip(tmp_path):
+    store = ArtefactStore(tmp_path / "store")
+    stored = _put(store, "ab"*16, tmp_path)
+
+    found = store.get("ab"*16)
+    assert found.records == stored.records
+    assert [path.read_bytes() for path in found.files] == [(tmp_path / f"{'ab'*16}.pdf").read_bytes()]
+    assert store.get("cd"*16) is None
+
+    published = store.publish(found.files[0], tmp_path / "out" / "sheet.pdf")
+    assert published.read_bytes() == found.files[0].read_bytes()
+
+def test_collect_garbage(tmp_path):
+    store = ArtefactStore(tmp_path / "store")
+    keys = ["aa"*16, "bb"*16, "cc"*16]
+    for age, key in zip([3000, 2000, 10], keys):
+        stored = _put(store, key, tmp_path, size = 1000)
+        utime(stored.files[0].parent / ArtefactStore.MANIFEST, (time() - age, time() - age))
+
+    assert store.collect_garbage(max_age = 2500) == 1
+    assert store.get(keys[0]) is None
+
+    assert store.collect_garbage(max_bytes = store.size() - 1) == 1
+    assert store.get(keys[1]) is None and store.get(keys[2]) is not None
+
+def test_generator_reuses_stored_sheets(tmp_path):
+    config = SheetConfig(output_dir = str(tmp_path / "output"))
+    store = ArtefactStore(tmp_path / "store")
+    stored = _put(store, sheet_key(config, SELECTED, 5, generate_tex = False), tmp_path)
+
+    result = SheetGenerator(config, seed = 5, store = store).generate(SELECTED, generate_tex = False)
+
+    assert result.cached and result.compiled
+    assert result.records == stored.records
+    assert [path.read_bytes() for path in result.output_files] == [stored.files[0].read_bytes()]
+    assert result.output_files[0].parent == tmp_path / "output"
@@ -0,0 +1,61 @@
+from random import seed
+from sympy.abc import t, x, y
+from problem_sheet_generator.core.mathematics.geometry import Curve
+from problem_sheet_generator.core.mathematics.multivariable_calculus import ScalarField, VectorField
+from problem_sheet_generator.core.question.multivariable_calculus_question import IntegralTheoremsQuestion
+
+def test_scalar_field_canonical_form(subtests):
+    equivalent_cases = [
+        (x*y + x, x*(y + 1)),
+        ((x + y)**2, x**2 + 2*x*y + y**2),
+        (2*x - x, x)
+    ]
+
+    for i, (expr_a, expr_b) in enumerate(equivalent_cases):
+        with subtests.test("Equivalent scalar fields", i = i):
+            field_a = ScalarField(manual_field_expr = expr_a)
+            field_b = ScalarField(manual_field_expr = expr_b)
+            assert field_a.canonical_form() == field_b.canonical_form()
+
+    assert (ScalarField(manual_field_expr = x).canonical_form()
+            != ScalarField(manual_field_expr = y).canonical_form())
+
+def test_vector_field_canonical_form():
+    coeffs = [[[0, 1, 0], [0, 0, 2], [0, 0, 0]], [[0, 0, 1], [1, 0, 0], [0, 0, 0]]]
+    by_sum = VectorField(component_coeffs = coeffs, gen_by_sum = True)
+    by_product = VectorField(component_coeffs = coeffs, gen_by_sum = False)
+
+    assert by_sum.canonical_form() == VectorField(component_coeffs = coeffs, gen_by_sum = True).canonical_form()
+    assert by_sum.canonical_form() != by_product.canonical_form()
+
+def test_curve_canonical_form(subtests):
+    curve_cases = [
+        ((Curve(components = (t, t**2), limits = (0, 1)),
+          Curve(components = (t, t*t), limits = (0, 1))), True),
+        ((Curve(components = (t, t**2), limits = (0, 1)),
+          Curve(components = (t, t**2), limits = (0, 2))), False),
+        ((Curve(components = (2*(t + 1), t), limits = (-1, 1)),
+          Curve(components = (2*t + 2, t), limits = (-1, 1))), True)
+    ]
+
+    for i, ((curve_a, curve_b), equal) in enumerate(curve_cases):
+        with subtests.test("Curve canonical form", i = i):
+            assert (curve_a.canonical_form() == curve_b.canonical_form()) == equal
+
+def test_polygon_canonical_form_is_rotation_invariant(monkeypatch):
+    triangle = [(0, 0), (2, 0), (1, 2)]
+    rotations = [tuple(triangle[i:] + triangle[:i]) for i in range(3)]
+
+    forms, fingerprints = [], []
+    for vertices in [*rotations, tuple(reversed(triangle))]:
+        monkeypatch.setattr(Curve, "_generate_random_closed_curve", lambda self, vertices = vertices: vertices)
+        forms.append(Curve(force_closed = True).canonical_form())
+        # The field is drawn after the curve, so with the same seed only the vertex order differs.
+        seed(0)
+        fingerprints.append(IntegralTheoremsQuestion("greens_theorem").fingerprint)
+
+    assert forms[0] == ("polygon", ((0, 0), (2, 0), (1, 2)))
+    assert forms[0] == forms[1] == forms[2]
+    assert fingerprints[0] == fingerprints[1] == fingerprints[2]
+    assert forms[3] != forms[0]
+    assert fingerprints[3] != fingerprints[0]
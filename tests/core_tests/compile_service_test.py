@@ -0,0 +1,49 @@
+import pytest
+from problem_sheet_generator.app.ui import SheetConfig
+from problem_sheet_generator.core.compile_service import (CompileJob, CompileService, LatexError, parse_latex_log,
+                                                          shared_compile_service)
+from problem_sheet_generator.core.fragment_cache import FragmentCache
+from problem_sheet_generator.core.sheet_generator import SheetGenerator
+
+LOG = r"""
+This is pdfTeX, Version 3.141592653-2.6-1.40.25 (TeX Live 2023) (preloaded format=pdflatex)
+(./questions.tex
+./questions.tex:14: Undefined control sequence.
+l.14 \item $\intt
+                 _C \phi\, ds$
+! Missing $ inserted.
+<inserted text>
+                $
+l.20 \end{enumerate}
+
+! Emergency stop.
+"""
+
+def test_parse_latex_log():
+    assert parse_latex_log(LOG) == [
+        LatexError("Undefined control sequence.", 14, "./questions.tex", r"\item $\intt"),
+        LatexError("Missing $ inserted.", 20, context = r"\end{enumerate}"),
+        LatexError("Emergency stop.")
+    ]
+
+def test_invalid_options(subtests):
+    for i, kwargs in enumerate([{"engine": "tex"}, {"interaction": "quiet"}]):
+        with subtests.test("Invalid option test cases", i = i):
+            with pytest.raises(ValueError):
+                CompileService(**kwargs)
+
+def test_failed_job_leaves_no_output(tmp_path):
+    job = CompileJob("broken", r"\documentclass{article}\begin{document}\undefined\end{document}", tmp_path)
+
+    with CompileService(timeout = 30) as service:
+        result = service.compile(job)
+
+    assert not result.success and result.errors
+    assert list(tmp_path.iterdir()) == []
+
+def test_default_service_is_shared():
+    service = shared_compile_service()
+
+    assert shared_compile_service() is service
+    assert SheetGenerator(SheetConfig())._compile_service is service
+    assert FragmentCache()._compile_service is service
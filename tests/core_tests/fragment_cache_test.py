@@ -0,0 +1,35 @@
+from problem_sheet_generator.app.ui import SheetConfig
+from problem_sheet_generator.core.compile_service import CompileService
+from problem_sheet_generator.core.fragment_cache import FragmentCache
+from problem_sheet_generator.core.question_worker import generate_question_record
+from problem_sheet_generator.core.sheet_generator import SheetGenerator
+
+def test_fragment_keys(subtests):
+    cache = FragmentCache()
+    key = cache.key(r"$\int_C \phi\, ds$")
+
+    key_test_cases = [
+        (cache.key(r"$\int_C \phi\, ds$"), True),
+        (cache.key(r"$\int_C \psi\, ds$"), False),
+        (FragmentCache(width = "10cm").key(r"$\int_C \phi\, ds$"), False)
+    ]
+
+    for i, (other, same) in enumerate(key_test_cases):
+        with subtests.test("Fragment key test cases", i = i):
+            assert (other == key) == same
+
+def test_sheets_include_cached_fragments(tmp_path):
+    record = generate_question_record("line_integral", "scalar_field", 4)
+    with CompileService() as service:
+        cache = FragmentCache(tmp_path / "fragments", service)
+        cache.path(record.question).parent.mkdir(parents = True)
+        cache.path(record.question).write_bytes(b"%PDF")
+
+        generator = SheetGenerator(SheetConfig(), compile_service = service, fragment_cache = cache)
+        questions_doc, answers_doc = generator.build_documents([record])
+
+    assert cache.path(record.question).as_posix() in questions_doc.dumps()
+    assert r"\usepackage{graphicx}" in questions_doc.dumps()
+    # The answer is included from its fragment, or typeset inline if its fragment didn't compile.
+    answers = answers_doc.dumps()
+    assert cache.path(record.answer).as_posix() in answers or record.answer in answers
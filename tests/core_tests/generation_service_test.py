@@ -0,0 +1,98 @@
+import pytest
+from asyncio import create_task, gather, open_unix_connection, run, sleep, wait_for
+from time import monotonic, sleep as sleep_blocking
+from json import dumps, loads
+from problem_sheet_generator.core import generation_service
+from problem_sheet_generator.core.generation_service import GenerationService
+
+async def _request(path, request):
+    reader, writer = await open_unix_connection(str(path))
+    writer.write((dumps(request) + "\n").encode())
+    await writer.drain()
+
+    events = [loads(await wait_for(reader.readline(), 120))]
+    while events[-1]["event"] == "progress":
+        events.append(loads(await wait_for(reader.readline(), 120)))
+    writer.close()
+    await writer.wait_closed()
+    return events
+
+async def _serve(path, requests):
+    service = GenerationService(workers = 2)
+    server = create_task(service.serve(str(path)))
+    try:
+        while not path.exists():
+            await sleep(0.05)
+        return await gather(*(_request(path, request) for request in requests))
+    finally:
+        server.cancel()
+        service.close()
+
+def test_generation_service(tmp_path):
+    question = {"topics": ["multivariable_calc", "line_integral", "line_integral_fundamental_theorem"],
+                "num_questions": 3}
+    a, b, c = run(_serve(tmp_path / "service.sock", [
+        {"id": "a", "questions": [question], "seed": 1, "compile": False},
+        {"id": "b", "questions": [question], "seed": 1, "compile": False},
+        {"id": "c", "questions": [{"topics": ["not_a_topic", None, None]}], "compile": False}
+    ]))
+
+    assert sorted(event["completed"] for event in a[:-1]) == [1, 2, 3]
+    assert a[-1]["event"] == "done" and a[-1]["id"] == "a"
+    assert len({record["fingerprint"] for record in a[-1]["records"]}) == 3
+    assert a[-1]["records"] == b[-1]["records"]
+    assert c[-1]["event"] == "error" and c[-1]["id"] == "c"
+
+async def _send_lines(path, lines):
+    service = GenerationService(workers = 1)
+    server = create_task(service.serve(str(path)))
+    try:
+        while not path.exists():
+            await sleep(0.05)
+
+        reader, writer = await open_unix_connection(str(path))
+        events = []
+        for line in lines:
+            writer.write(line.encode() + b"\n")
+            await writer.drain()
+            events.append(loads(await wait_for(reader.readline(), 120)))
+            while events[-1]["event"] == "progress":
+                events.append(loads(await wait_for(reader.readline(), 120)))
+        writer.close()
+        await writer.wait_closed()
+        return events
+    finally:
+        server.cancel()
+        service.close()
+
+def test_bad_requests_keep_the_connection(tmp_path):
+    question = {"topics": ["multivariable_calc", "line_integral", "line_integral_fundamental_theorem"]}
+    events = run(_send_lines(tmp_path / "service.sock", [
+        "[1]", "not json", dumps({"id": "a", "questions": [question], "seed": 1, "compile": False})
+    ]))
+
+    assert [event["event"] for event in events if event["event"] != "progress"] == ["error", "error", "done"]
+    assert "JSON object" in events[0]["message"]
+    assert events[-1]["id"] == "a" and len(events[-1]["records"]) == 1
+
+def hanging_record(topic, subtopic, seed):
+    sleep_blocking(60)
+
+def test_hanging_questions_time_out(monkeypatch):
+    question = {"topics": ["multivariable_calc", "line_integral", "line_integral_fundamental_theorem"]}
+    service = GenerationService(workers = 1, time_limit = 0.5)
+    service.MAX_ATTEMPTS = 2
+    try:
+        monkeypatch.setattr(generation_service, "generate_encoded_record", hanging_record)
+        start = monotonic()
+        with pytest.raises(RuntimeError):
+            run(service.generate({"questions": [question], "compile": False}))
+        assert monotonic() - start < 10
+
+        # The pool the question hung in was replaced, so the service still works.
+        monkeypatch.undo()
+        result = run(service.generate({"questions": [question], "seed": 1, "compile": False}))
+        assert len(result.records) == 1
+        assert sum(result.stats.timeouts.values()) == 0
+    finally:
+        service.close()
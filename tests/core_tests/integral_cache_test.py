@@ -0,0 +1,43 @@
+from sympy import Rational, sqrt
+from sympy.abc import t, x, y
+from problem_sheet_generator.core.mathematics.geometry import Curve
+from problem_sheet_generator.core.mathematics.integral_cache import (IntegralCache, get_integral_cache,
+                                                                     set_integral_cache)
+from problem_sheet_generator.core.mathematics.multivariable_calculus import ScalarField
+
+def test_least_recently_used_entry_is_evicted():
+    cache = IntegralCache(maxsize = 2)
+    cache.put(("a",), Rational(1, 2))
+    cache.put(("b",), Rational(3))
+    cache.get(("a",))
+    cache.put(("c",), sqrt(2))
+
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == Rational(1, 2)
+    assert cache.get(("c",)) == sqrt(2)
+    assert (cache.hits, cache.misses) == (3, 1)
+
+def test_disk_tier_is_shared_between_caches(tmp_path):
+    path = tmp_path / "integrals.sqlite3"
+    writer = IntegralCache(path = path)
+    writer.put(("key",), 3*sqrt(5)/2)
+    writer.close()
+
+    reader = IntegralCache(path = path)
+    assert reader.get(("key",)) == 3*sqrt(5)/2
+    assert reader.disk_hits == 1
+    reader.close()
+
+def test_equivalent_integrands_share_an_entry():
+    previous_cache = get_integral_cache()
+    cache = IntegralCache()
+    set_integral_cache(cache)
+    try:
+        curve = Curve(components = (t, t**2), limits = (0, 1))
+        first = ScalarField(manual_field_expr = x*(y + 1)).line_integral_via_fund_thm(curve)
+        second = ScalarField(manual_field_expr = x*y + x).line_integral_via_fund_thm(curve)
+    finally:
+        set_integral_cache(previous_cache)
+
+    assert first == second == 2
+    assert (cache.hits, cache.misses) == (1, 1)
@@ -0,0 +1,75 @@
+from fractions import Fraction
+from random import seed
+from sympy import Rational, latex
+from sympy.abc import t
+from sympy.vector import CoordSys3D, ParametricRegion, vector_integrate
+from problem_sheet_generator.core.adaptive_sampling import AdaptiveSampler
+from problem_sheet_generator.core.mathematics.inverse_generation import solve_pair, solve_small_combination
+from problem_sheet_generator.core.question.multivariable_calculus_question import (IntegralTheoremsQuestion,
+                                                                                   LineIntegralQuestion)
+
+def test_solve_pair(subtests):
+    pair_test_cases = {
+        (Fraction(3), Fraction(5), Fraction(1)): (2, -1),
+        (Fraction(1, 2), Fraction(1, 3), Fraction(7, 6)): (1, 2),
+        (Fraction(2), Fraction(4), Fraction(1)): None,
+        (Fraction(7), Fraction(11), Fraction(100)): None
+    }
+
+    for i, ((a, b, target), solution) in enumerate(pair_test_cases.items()):
+        with subtests.test("Pair test cases", i = i):
+            assert solve_pair(a, b, target, 4) == solution
+
+def test_solve_small_combination():
+    values = [Fraction(0), Fraction(64, 5), Fraction(-27, 2), Fraction(3)]
+    solution = solve_small_combination(values, Fraction(-27, 1))
+
+    assert solution is not None
+    assert all(abs(coeff) <= 4 for coeff in solution.values())
+    assert sum(values[i]*coeff for i, coeff in solution.items()) == -27
+
+def integral_from_canonical_form(canonical_form: tuple) -> Rational:
+    """
+    Rebuilds the field and curve of a line integral question from its canonical form and
+    integrates with sympy.
+    """
+    _, _, field_terms, (_, curve_coeffs, limits) = canonical_form
+    C = CoordSys3D("C")
+    scalars = C.base_scalars()
+    field = sum(
+        (sum((Rational(p, q)*scalars[0]**monom[0]*scalars[1]**monom[1]*(scalars[2]**monom[2] if len(monom) == 3 else 1)
+              for monom, (p, q) in terms if (p, q) != (0, 1)), Rational(0))*vect
+         for terms, vect in zip(field_terms, C.base_vectors())),
+        C.i*0
+    )
+    components = tuple(
+        sum((Rational(p, q)*t**(len(coeffs) - 1 - power) for power, (p, q) in enumerate(coeffs)), Rational(0))
+        for coeffs in curve_coeffs
+    )
+    return vector_integrate(field, ParametricRegion(components, (t, *limits)))
+
+def test_inverse_questions_have_their_target_answers(subtests):
+    seed(0)
+    for i in range(5):
+        with subtests.test("Inverse Green's theorem", i = i):
+            IntegralTheoremsQuestion("greens_theorem", inverse = True, verify = True)
+
+        with subtests.test("Inverse line integral", i = i):
+            question = LineIntegralQuestion("vector_field", inverse = True, difficulty = "medium")
+            answer = integral_from_canonical_form(question.canonical_form)
+            assert question.answer == f"${latex(answer)}$"
+            assert abs(answer.p) <= 100 and answer.q <= 12
+
+def test_inverse_questions_resolve_their_sampler_draws(subtests):
+    seed(0)
+    sampler = AdaptiveSampler()
+    for i in range(3):
+        with subtests.test("Inverse Green's theorem", i = i):
+            IntegralTheoremsQuestion("greens_theorem", inverse = True, sampler = sampler)
+            assert not sampler._pending
+
+        with subtests.test("Inverse line integral", i = i):
+            LineIntegralQuestion("vector_field", inverse = True, sampler = sampler)
+            assert not sampler._pending
+
+    assert any(sum(table["drawn"]) for table in sampler.stats.values())
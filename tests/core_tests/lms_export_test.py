@@ -0,0 +1,49 @@
+from json import loads
+from random import Random
+from xml.etree.ElementTree import parse
+import pytest
+from problem_sheet_generator.core import lms_export
+from problem_sheet_generator.core.question import QuestionGenerationError
+from problem_sheet_generator.core.lms_export import JSONLinesExporter, MoodleXMLExporter, export_questions
+from problem_sheet_generator.core.question_worker import QuestionRecord, generate_question_record
+
+def test_json_lines_export(tmp_path):
+    path = tmp_path / "questions.jsonl"
+    with JSONLinesExporter(path) as exporter:
+        written = export_questions(exporter, "line_integral", "fundamental_theorem", 5, seed = 3, workers = 2)
+
+    lines = path.read_text().splitlines()
+    assert written == len(lines) == 5
+    assert QuestionRecord(**loads(lines[0])) == generate_question_record(
+        "line_integral", "fundamental_theorem", Random(3).getrandbits(64)
+    )
+
+def three_distinct_records(topic, subtopic, seed):
+    return QuestionRecord(topic, subtopic, f"Question {seed % 3}", "$1$", f"{seed % 3:032x}").to_bytes()
+
+def test_unique_export_replaces_repeats(tmp_path, monkeypatch):
+    monkeypatch.setattr(lms_export, "generate_encoded_record", three_distinct_records)
+
+    path = tmp_path / "questions.jsonl"
+    with JSONLinesExporter(path) as exporter:
+        written = export_questions(exporter, "t", "s", 3, seed = 1, workers = 2, unique = True)
+
+    fingerprints = [loads(line)["fingerprint"] for line in path.read_text().splitlines()]
+    assert written == 3
+    assert sorted(fingerprints) == [f"{i:032x}" for i in range(3)]
+
+    with JSONLinesExporter(tmp_path / "too_many.jsonl") as exporter:
+        with pytest.raises(QuestionGenerationError):
+            export_questions(exporter, "t", "s", 4, seed = 1, workers = 2, unique = True)
+
+def test_moodle_xml_export(tmp_path):
+    path = tmp_path / "quiz.xml"
+    with MoodleXMLExporter(path) as exporter:
+        exporter.write(QuestionRecord("t", "s", r"Find $x<y$ & $\phi$", r"$- \frac{8}{3}$", "0"*32))
+        exporter.write(QuestionRecord("t", "s", "Find $x$", r"$\sqrt{2}$", "1"*32))
+
+    questions = parse(path).getroot().findall("question")
+    assert [question.get("type") for question in questions] == ["numerical", "shortanswer"]
+    assert questions[0].find("questiontext/text").text == r"Find \(x<y\) & \(\phi\)"
+    assert float(questions[0].find("answer/text").text) == -8/3
+    assert questions[1].find("answer/text").text == r"\(\sqrt{2}\)"
@@ -0,0 +1,46 @@
+from fractions import Fraction
+from sympy import Polygon
+from sympy.vector import CoordSys3D, vector_integrate
+from problem_sheet_generator.core.mathematics.polygon_integrals import (polygon_circulation, polygon_integral,
+                                                                        triangle_moment)
+from problem_sheet_generator.core.mathematics.polynomial import Polynomial
+
+UNIT_TRIANGLE = ((0, 0), (1, 0), (0, 1))
+
+def test_triangle_moment(subtests):
+    moment_test_cases = {
+        (0, 0, UNIT_TRIANGLE): Fraction(1, 2),
+        (1, 0, UNIT_TRIANGLE): Fraction(1, 6),
+        (1, 1, UNIT_TRIANGLE): Fraction(1, 24),
+        (2, 0, UNIT_TRIANGLE): Fraction(1, 12),
+        (0, 0, ((0, 0), (0, 1), (1, 0))): Fraction(-1, 2),
+        (0, 0, ((0, 0), (1, 1), (2, 2))): Fraction(0),
+        (1, 2, ((-2, 1), (2, -1), (1, 2))): Fraction(5, 6)
+    }
+
+    for i, ((a, b, vertices), moment) in enumerate(moment_test_cases.items()):
+        with subtests.test("Triangle moment test cases", i = i):
+            assert triangle_moment(a, b, vertices) == moment
+
+def test_polygon_integral_of_square():
+    square = ((0, 0), (2, 0), (2, 2), (0, 2))
+    x_squared_y = Polynomial({(2, 1): 1}, 2)
+
+    # The integral of x^2 y over [0, 2]^2 is (8/3)*2.
+    assert polygon_integral(x_squared_y, square) == Fraction(16, 3)
+
+def test_polygon_circulation_matches_line_integral(subtests):
+    C = CoordSys3D("C")
+    field_test_cases = [
+        (-3*C.y**2, 2*C.x**3 + C.x*C.y),
+        (C.x*C.y**2 - 4, -C.x**2*C.y),
+        (2*C.y, 5*C.x)
+    ]
+    triangles = [((-2, 1), (2, -1), (1, 2)), ((0, -2), (-1, 0), (2, 2))]
+
+    for i, (P, Q) in enumerate(field_test_cases):
+        components = (Polynomial.from_expr(P, (C.x, C.y)), Polynomial.from_expr(Q, (C.x, C.y)))
+        for triangle in triangles:
+            with subtests.test("Circulation test cases", i = i):
+                expected = vector_integrate(P*C.i + Q*C.j, Polygon(*triangle))
+                assert polygon_circulation(components, triangle) == Fraction(int(expected.p), int(expected.q))
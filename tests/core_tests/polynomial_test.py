@@ -0,0 +1,42 @@
+from fractions import Fraction
+import pytest
+from sympy import Rational, sin, sqrt
+from sympy.abc import t, x, y, z
+from problem_sheet_generator.core.mathematics.geometry import Curve
+from problem_sheet_generator.core.mathematics.polynomial import Polynomial
+
+def test_evaluate_matches_sympy(subtests):
+    expr_test_cases = [
+        x**3 - 2*x*y + 4,
+        Rational(1, 2)*x**2*y*z - 3*z**4 + y,
+        (x + y + z)**3,
+        x*0 + 7
+    ]
+    points = [(0, 0, 0), (1, -2, 3), (Fraction(1, 2), 2, -Fraction(3, 4))]
+
+    for i, expr in enumerate(expr_test_cases):
+        poly = Polynomial.from_expr(expr, (x, y, z))
+        for point in points:
+            with subtests.test("Evaluation test cases", i = i):
+                expected = expr.subs(dict(zip((x, y, z), (Rational(c.numerator, c.denominator)
+                                                          if isinstance(c, Fraction) else c for c in point))))
+                assert poly.evaluate(point) == Fraction(int(expected.p), int(expected.q))
+
+def test_derivative():
+    poly = Polynomial.from_expr(3*x**2*y - y**3 + x, (x, y))
+
+    assert poly.derivative(0) == Polynomial.from_expr(6*x*y + 1, (x, y))
+    assert poly.derivative(1) == Polynomial.from_expr(3*x**2 - 3*y**2, (x, y))
+
+def test_from_expr_rejects_non_polynomials(subtests):
+    for i, expr in enumerate([sin(x), 1/x, sqrt(2)*x]):
+        with subtests.test("Non-polynomial test cases", i = i):
+            with pytest.raises(ValueError):
+                Polynomial.from_expr(expr, (x,))
+
+def test_curve_endpoints():
+    curve = Curve(components = (t**2, t**3 - t), limits = (-1, 1))
+
+    assert curve.endpoints() == ((1, 0), (1, 0))
+    assert curve._is_closed
+    assert Curve(components = (t, t**2), limits = (0, 2)).endpoints() == ((0, 0), (2, 4))
@@ -0,0 +1,27 @@
+import pytest
+from problem_sheet_generator.core.preview_sheet import PreviewSheet
+from problem_sheet_generator.core.question_worker import QuestionRecord
+
+def make_record(question, answer = "$1$"):
+    return QuestionRecord("topic", "subtopic", question, answer, "")
+
+def test_html_math_delimiters(subtests):
+    html_test_cases = {
+        r"Find $x<y$ & $$\frac{1}{2}$$": r"Find \(x&lt;y\) &amp; \[\frac{1}{2}\]",
+        r"Green's \$5 and $\phi$": r"Green&#x27;s $5 and \(\phi\)",
+        r"No math": r"No math"
+    }
+
+    for i, (latex, html) in enumerate(html_test_cases.items()):
+        with subtests.test("HTML test cases", i = i):
+            assert f"<li>{html}</li>" in PreviewSheet("Sheet").html([make_record(latex)])
+
+def test_markdown():
+    records = [make_record(r"Find $\phi$", "$2$"), make_record("Find $x$", "$-3$")]
+    preview = PreviewSheet("Answers", author = "A. Author")
+
+    assert preview.markdown(records, answers = True) == "# Answers\n\nA. Author\n\n1. $2$\n2. $-3$\n"
+
+def test_invalid_math_renderer():
+    with pytest.raises(ValueError):
+        PreviewSheet(math_renderer = "mathml")
@@ -0,0 +1,35 @@
+from sympy import Rational, diff, expand, integrate
+from sympy.abc import t, x, y, z
+from problem_sheet_generator.core.mathematics.geometry import Curve
+from problem_sheet_generator.core.mathematics.integral_cache import (IntegralCache, get_integral_cache,
+                                                                   set_integral_cache)
+from problem_sheet_generator.core.mathematics.multivariable_calculus import ScalarField
+
+def test_hodograph_speed_is_polynomial(subtests):
+    for i, (dimension, linear) in enumerate([(2, False), (3, False), (2, True), (3, True)]):
+        for _ in range(5):
+            curve = Curve(ambient_dim = dimension, linear_components = linear, pythagorean_hodograph = True)
+            with subtests.test("Hodograph test cases", i = i):
+                speed = curve.speed_polynomial.to_expr((t,))
+                hodograph = [diff(comp, t) for comp in curve.region.definition]
+                assert expand(sum(comp**2 for comp in hodograph) - speed**2) == 0
+                assert all(comp.is_polynomial(t) for comp in curve.region.definition)
+
+def test_exact_arc_length_integral_matches_sympy(subtests):
+    previous_cache = get_integral_cache()
+    set_integral_cache(IntegralCache())
+    try:
+        expr_test_cases = [(x*y + 2, 2), (x - 3*y**2, 2), (x*z + y, 3)]
+
+        for i, (expr, dimension) in enumerate(expr_test_cases):
+            field = ScalarField(dimension = dimension, manual_field_expr = expr)
+            curve = Curve(ambient_dim = dimension, pythagorean_hodograph = True, limits = (0, 2))
+            with subtests.test("Arc length test cases", i = i):
+                # The speed itself is checked against the hodograph in test_hodograph_speed_is_polynomial.
+                speed = curve.speed_polynomial.to_expr((t,))
+                expected = integrate(expand(expr.subs(dict(zip((x, y, z), curve.region.definition)))*speed), (t, 0, 2))
+                answer = field.calculate_line_integral(curve)
+                assert isinstance(answer, Rational)
+                assert answer == expected
+    finally:
+        set_integral_cache(previous_cache)
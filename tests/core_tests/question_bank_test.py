@@ -0,0 +1,26 @@
+from pylatex.utils import NoEscape
+from problem_sheet_generator.core.question_bank import QuestionBank
+
+def test_take_removes_questions():
+    bank = QuestionBank()
+    bank.fill("line_integral", "fundamental_theorem", 2, seed = 1)
+
+    first = bank.take("line_integral", "fundamental_theorem")
+    second = bank.take("line_integral", "fundamental_theorem")
+
+    assert first != second
+    assert bank.take("line_integral", "fundamental_theorem") is None
+    assert bank.take("integral_theorems", "greens_theorem") is None
+
+def test_bank_persists_between_runs(tmp_path):
+    path = tmp_path / "bank.bin"
+    bank = QuestionBank(path)
+    bank.fill("integral_theorems", "greens_theorem", 3, seed = 2)
+    bank.save()
+
+    loaded = QuestionBank(path)
+    assert loaded.count("integral_theorems", "greens_theorem") == 3
+
+    record = loaded.take("integral_theorems", "greens_theorem")
+    assert record == bank.take("integral_theorems", "greens_theorem")
+    assert isinstance(record.question, NoEscape) and isinstance(record.answer, NoEscape)
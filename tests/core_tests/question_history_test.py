@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta, timezone
+from problem_sheet_generator.core.question_history import QuestionHistory
+
+FINGERPRINT = "15e3ead7e6488d5253df56bb597d2fa8"
+OTHER_FINGERPRINT = "00000000000000000000000000000001"
+
+def test_history_is_namespaced_by_cohort():
+    with QuestionHistory(":memory:") as history:
+        history.record("2026-autumn", [FINGERPRINT])
+
+        assert history.contains("2026-autumn", FINGERPRINT)
+        assert not history.contains("2026-autumn", OTHER_FINGERPRINT)
+        assert not history.contains("2027-spring", FINGERPRINT)
+
+def test_history_persists_between_runs(tmp_path):
+    path = tmp_path / "history.sqlite3"
+    with QuestionHistory(path) as history:
+        history.record("cohort", [FINGERPRINT, OTHER_FINGERPRINT])
+
+    with QuestionHistory(path) as history:
+        assert history.contains("cohort", FINGERPRINT)
+        assert history.contains("cohort", OTHER_FINGERPRINT)
+
+def test_expired_entries_are_ignored_and_purged():
+    with QuestionHistory(":memory:", expiry_days = 7) as history:
+        issued_at = (datetime.now(timezone.utc) - timedelta(days = 8)).timestamp()
+        history._connection.execute(
+            "INSERT INTO issued (cohort, fingerprint, issued_at) VALUES (?, ?, ?)",
+            ("cohort", bytes.fromhex(FINGERPRINT), issued_at)
+        )
+        history.record("cohort", [OTHER_FINGERPRINT])
+
+        assert not history.contains("cohort", FINGERPRINT)
+        assert history.contains("cohort", OTHER_FINGERPRINT)
+        assert history.purge_expired() == 1
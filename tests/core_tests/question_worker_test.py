@@ -0,0 +1,36 @@
+import random
+import pytest
+from problem_sheet_generator.core.question_worker import (QuestionTimeoutError, QuestionWorker,
+                                                          generate_question_record)
+
+def test_same_seed_gives_same_question(subtests):
+    subtopic_test_cases = [("line_integral", "vector_field"), ("integral_theorems", "greens_theorem")]
+
+    for i, (topic, subtopic) in enumerate(subtopic_test_cases):
+        with subtests.test("Seed test cases", i = i):
+            first = generate_question_record(topic, subtopic, 1234)
+            second = generate_question_record(topic, subtopic, 1234)
+            assert first == second
+
+def test_generation_keeps_the_global_random_state():
+    random.seed(99)
+    expected = random.random()
+
+    random.seed(99)
+    generate_question_record("line_integral", "fundamental_theorem", 1234)
+    assert random.random() == expected
+
+def test_worker_matches_in_process_generation():
+    with QuestionWorker(time_limit = 60) as worker:
+        record = worker.generate("line_integral", "fundamental_theorem", 42)
+        assert record == generate_question_record("line_integral", "fundamental_theorem", 42)
+
+        with pytest.raises(ValueError):
+            worker.generate("line_integral", "not_a_subtopic", 42)
+
+def test_worker_is_killed_on_timeout():
+    worker = QuestionWorker(time_limit = 1e-3)
+
+    with pytest.raises(QuestionTimeoutError):
+        worker.generate("line_integral", "vector_field", 7)
+    worker.close()
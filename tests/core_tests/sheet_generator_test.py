@@ -0,0 +1,107 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+import sys
+from time import sleep
+import pytest
+from problem_sheet_generator.app.ui import QuestionConfig, SheetConfig
+from problem_sheet_generator.core.compile_service import CompileService
+from problem_sheet_generator.core.question_worker import QuestionRecord, QuestionTimeoutError
+from problem_sheet_generator.core.sheet_generator import GenerationResult, GenerationStats, SheetGenerator
+
+def test_invalid_filename_format(subtests):
+    for i, filename_format in enumerate(["{name}_{cohort}", "{name}_{0}", "{date:%Y-%m-%d"]):
+        with subtests.test("Invalid format test cases", i = i):
+            with pytest.raises(ValueError):
+                SheetGenerator(SheetConfig(filename_format = filename_format))
+
+def test_seed_reproduces_random_topics():
+    selected = [QuestionConfig(["multivariable_calc", None, None], 4)]
+
+    generator = SheetGenerator(SheetConfig(), seed = 5)
+    first = generator.generate_records(selected).records
+    second = SheetGenerator(SheetConfig(), seed = 5).generate_records(selected).records
+
+    assert first == second
+    # Generating again with the same generator starts from the seed rather than carrying on.
+    assert generator.generate_records(selected).records == first
+
+class SlowGenerator(SheetGenerator):
+    """
+    Every question runs until its time limit and times out, as a hanging integration would.
+    """
+
+    def _generate_record(self, topic, subtopic, time_limit = None, **kwargs):
+        time_limit = self._worker.time_limit if time_limit is None else time_limit
+        sleep(time_limit)
+        msg = f"Generating a {subtopic} question took longer than {time_limit} seconds."
+        raise QuestionTimeoutError(msg)
+
+def test_slow_questions_stay_within_the_deadline():
+    fingerprints = count()
+    def fallback(topic, subtopic):
+        return QuestionRecord(topic, subtopic, "Question", "Answer", f"{next(fingerprints):032x}")
+
+    deadline = SheetGenerator.COMPILE_TIME_ESTIMATE + 1
+    generator = SlowGenerator(SheetConfig(), seed = 1, fallback = fallback)
+    result = generator.generate_records([QuestionConfig(["multivariable_calc", None, None], 4)], deadline)
+
+    assert result.generation_time < deadline - SheetGenerator.COMPILE_TIME_ESTIMATE + 0.5
+    assert list(result.degraded.values()) == ["fallback"]*4
+    assert len(result.records) == 4
+
+class SteadyGenerator(SheetGenerator):
+    """
+    Every question takes the same time to generate, and times out if its time limit is shorter.
+    """
+    QUESTION_TIME: float = 0.8
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._question_numbers = count()
+
+    def _generate_record(self, topic, subtopic, time_limit = None, **kwargs):
+        if time_limit is not None and time_limit < self.QUESTION_TIME:
+            sleep(time_limit)
+            msg = f"Generating a {subtopic} question took longer than {time_limit} seconds."
+            raise QuestionTimeoutError(msg)
+
+        sleep(self.QUESTION_TIME)
+        return QuestionRecord(topic, subtopic, "Question", "Answer", f"{next(self._question_numbers):032x}")
+
+def test_questions_past_the_deadline_without_a_fallback():
+    deadline = SheetGenerator.COMPILE_TIME_ESTIMATE + 1
+    generator = SteadyGenerator(SheetConfig(), seed = 1)
+    result = generator.generate_records([QuestionConfig(["multivariable_calc", None, None], 3)], deadline)
+
+    assert len(result.records) == 3
+    assert result.degraded
+    assert set(result.degraded.values()) == {"over_deadline"}
+
+class CopyingCompileService(CompileService):
+    """
+    "Compiles" a document by copying its source to the PDF, so tests can check which document
+    each published file came from without LaTeX installed.
+    """
+
+    def _command(self, name):
+        return [sys.executable, "-c", f"import shutil; shutil.copy('{name}.tex', '{name}.pdf')"]
+
+def test_concurrent_runs_keep_their_files(tmp_path):
+    config = SheetConfig(output_dir = str(tmp_path))
+    results = [
+        GenerationResult(GenerationStats(), records = [
+            QuestionRecord("line_integral", "vector_field", f"Question {run}", f"Answer {run}", f"{run:032x}")
+        ])
+        for run in range(2)
+    ]
+
+    with CopyingCompileService() as service, ThreadPoolExecutor(2) as executor:
+        generator = SheetGenerator(config, compile_service = service)
+        results = list(executor.map(lambda result: generator.compile(result, generate_tex = False), results))
+
+    assert len(list(tmp_path.glob("*.pdf"))) == 4
+    for run, result in enumerate(results):
+        questions, answers = (result.sheet_files[sheet][0] for sheet in SheetGenerator.SHEETS)
+        assert f"Question {run}" in questions.read_text()
+        assert f"Answer {run}" in answers.read_text()
+        assert questions.stem.split("_")[-1] == answers.stem.split("_")[-1]
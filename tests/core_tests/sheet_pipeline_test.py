@@ -0,0 +1,17 @@
+from problem_sheet_generator.app.ui import QuestionConfig, SheetConfig
+from problem_sheet_generator.core.sheet_pipeline import SheetJob, SheetPipeline
+
+def test_pipeline_generates_every_sheet(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    selected = [QuestionConfig(["multivariable_calc", "line_integral", "line_integral_fundamental_theorem"], 2)]
+    jobs = [
+        SheetJob(SheetConfig(problem_filename = f"questions_{i}", answer_filename = f"answers_{i}"), selected, seed = i)
+        for i in range(3)
+    ]
+
+    results, metrics = SheetPipeline(generation_workers = 2, compile_workers = 1, queue_size = 1).run(jobs)
+
+    assert all(len(result.records) == 2 for result in results)
+    assert results[0].records != results[1].records
+    assert metrics.generation_busy > 0 and metrics.wall_time > 0
+    assert metrics.max_queue_depth <= 2 + 1
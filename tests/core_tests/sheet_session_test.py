@@ -0,0 +1,39 @@
+import pytest
+from problem_sheet_generator.app.ui import QuestionConfig, SheetConfig
+from problem_sheet_generator.core.sheet_generator import SheetGenerator
+from problem_sheet_generator.core.sheet_session import SheetSession
+
+def _session():
+    return SheetSession(SheetGenerator(SheetConfig(), seed = 3))
+
+def test_update_keeps_selected_questions():
+    scalar = QuestionConfig(["multivariable_calc", "line_integral", "line_integral_scalar_field"], 2)
+    greens = QuestionConfig(["multivariable_calc", "integral_theorems", "integral_theorems_greens_theorem"], 1)
+    session = _session()
+
+    assert session.update([scalar, greens]) == 3
+    first = session.records
+
+    scalar.num_questions = 3
+    assert session.update([scalar, greens]) == 1
+    assert session.records[:2] == first[:2] and session.records[3] == first[2]
+
+    scalar.num_questions = 1
+    assert session.update([greens, scalar]) == 0
+    assert session.records == [first[2], first[0]]
+
+    assert session.update([scalar]) == 0
+    assert session.records_for(greens.id) == []
+
+def test_reroll_replaces_one_question():
+    config = QuestionConfig(["multivariable_calc", "line_integral", "line_integral_vector_field"], 3)
+    session = _session()
+    session.update([config])
+    before = session.records
+
+    rerolled = session.reroll(config, 1)
+
+    assert session.records == [before[0], rerolled, before[2]]
+    assert rerolled.fingerprint not in {record.fingerprint for record in before}
+    with pytest.raises(IndexError):
+        session.reroll(config, 3)
@@ -0,0 +1,45 @@
+import pytest
+from pylatex.utils import NoEscape
+from problem_sheet_generator.core.question_worker import QuestionRecord, generate_question_record
+from problem_sheet_generator.core.wire_format import WireFormatError, encode_records, iter_record_fields
+
+def test_records_round_trip(subtests):
+    subtopic_test_cases = [("line_integral", "scalar_field"), ("line_integral", "vector_field"),
+                           ("line_integral", "fundamental_theorem"), ("integral_theorems", "greens_theorem")]
+
+    for i, (topic, subtopic) in enumerate(subtopic_test_cases):
+        with subtests.test("Round trip test cases", i = i):
+            record = generate_question_record(topic, subtopic, 5)
+            decoded = QuestionRecord.from_bytes(record.to_bytes())
+
+            assert decoded == record
+            assert decoded.canonical_form == record.canonical_form
+            assert isinstance(decoded.question, NoEscape) and isinstance(decoded.answer, NoEscape)
+            assert generate_question_record(topic, subtopic, 5).to_bytes() == record.to_bytes()
+
+def test_canonical_values():
+    canonical_form = ("polygon", ((-2, 0), (2**70, -2**70)), (), ("é", 0))
+    record = QuestionRecord("t", "s", "q", "a", "ab"*16, 3, canonical_form)
+
+    data = encode_records([record, record])
+    decoded = [QuestionRecord(**fields) for fields in iter_record_fields(memoryview(data))]
+
+    assert [r.canonical_form for r in decoded] == [canonical_form, canonical_form]
+    assert decoded[0].integrations_avoided == 3
+
+def test_invalid_records(subtests):
+    record = QuestionRecord("t", "s", "q", "a", "ab"*16)
+    data = bytearray(record.to_bytes())
+    data[3] += 1
+
+    invalid_test_cases = [
+        lambda: QuestionRecord.from_bytes(bytes(data)),
+        lambda: QuestionRecord.from_bytes(b"PSQ"),
+        lambda: QuestionRecord("t", "s", "q", "a", "not a digest").to_bytes(),
+        lambda: QuestionRecord("t", "s", "q", "a", "ab"*16, 0, (1.5,)).to_bytes()
+    ]
+
+    for i, invalid in enumerate(invalid_test_cases):
+        with subtests.test("Invalid record test cases", i = i):
+            with pytest.raises(WireFormatError):
+                invalid()
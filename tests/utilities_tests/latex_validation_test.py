@@ -0,0 +1,44 @@
+from problem_sheet_generator.core.question_worker import generate_question_record
+from problem_sheet_generator.utilities import validate_latex
+
+def test_valid_latex(subtests):
+    valid_test_cases = [
+        r"Let $\mathbf{F}(x, y)=2 \left(y + 1\right)\mathbf{\hat{i}}$ and $C$ the curve.",
+        r"$\displaystyle\int_C\phi\, ds$ costs \$5 and $$\left\{ x \right.$$",
+        r"\begin{enumerate}\item $\frac{1}{2}$\end{enumerate}",
+        r"$1\le t\le 2$$-3$"
+    ]
+
+    for i, latex in enumerate(valid_test_cases):
+        with subtests.test("Valid LaTeX test cases", i = i):
+            assert validate_latex(latex) == []
+
+def test_invalid_latex(subtests):
+    invalid_test_cases = [
+        r"$\frac{1}{2$",
+        r"$x}$",
+        r"The answer is $x",
+        r"$$ $x$ $$",
+        r"$ $",
+        r"$\left( x$",
+        r"$x \right)$",
+        r"\begin{enumerate}\item x\end{itemize}",
+        r"\begin{tikzpicture}\end{tikzpicture}",
+        r"$\intt_C \phi$"
+    ]
+
+    for i, latex in enumerate(invalid_test_cases):
+        with subtests.test("Invalid LaTeX test cases", i = i):
+            assert validate_latex(latex)
+
+def test_generated_questions_are_valid(subtests):
+    subtopic_test_cases = [
+        ("line_integral", "vector_field"), ("line_integral", "scalar_field"),
+        ("line_integral", "fundamental_theorem"), ("integral_theorems", "greens_theorem")
+    ]
+
+    for i, (topic, subtopic) in enumerate(subtopic_test_cases):
+        for seed in range(3):
+            record = generate_question_record(topic, subtopic, seed)
+            with subtests.test("Generated question test cases", i = i):
+                assert validate_latex(record.question) == [] and validate_latex(record.answer) == []
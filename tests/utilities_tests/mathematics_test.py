@@ -1,5 +1,6 @@
 from sympy import Rational, S, pi, sqrt
-from problem_sheet_generator.utilities import weak_compositions, awkward_number
+from problem_sheet_generator.utilities import weak_compositions, awkward_number, non_degenerate_triangles, random_triangle
+from problem_sheet_generator.utilities.mathematics import orientation
 
 def test_weak_compositions(subtests):
     weak_comps_test_cases = {
@@ -40,4 +41,21 @@ def test_awkward_number(subtests):
     for i, (input, output) in enumerate(awkward_test_cases.items()):
         with subtests.test("Awkward number test cases", i = i):
             print((input, output))
-            assert awkward_number(input) == output
\ No newline at end of file
+            assert awkward_number(input) == output
+
+def test_non_degenerate_triangles():
+    triangles = non_degenerate_triangles(-2, 2)
+
+    # C(25, 3) vertex triples in the 5x5 grid, minus the 152 collinear ones.
+    assert len(triangles) == 2148
+    assert all(orientation(*triangle) > 0 for triangle in triangles)
+
+def test_random_triangle_is_anticlockwise(subtests):
+    grids = [(-2, 2), (0, 1), (-10, 10)]
+
+    for i, grid in enumerate(grids):
+        with subtests.test("Random triangle test cases", i = i):
+            for _ in range(50):
+                triangle = random_triangle(*grid)
+                assert orientation(*triangle) > 0
+                assert all(grid[0] <= coord <= grid[1] for vertex in triangle for coord in vertex)
@@ -61,7 +61,9 @@ scalar_expr_from_exp_test_cases = {
     x - y: C.x - C.y,
     -3*z**2 + x*y: -3*C.z**2 + C.x*C.y,
     x*(x + y): C.x*(C.x + C.y),
-    (x**2 + y**2*z)*(z**2 - 3*y): (C.x**2 + C.y**2*C.z)*(C.z**2 - 3*C.y)
+    (x**2 + y**2*z)*(z**2 - 3*y): (C.x**2 + C.y**2*C.z)*(C.z**2 - 3*C.y),
+    x**2 - 3: C.x**2 - 3,
+    2*y + z**2 + 1: 2*C.y + C.z**2 + 1
 }
 
 def test_scalar_from_symbol(subtests):